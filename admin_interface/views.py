@@ -4,6 +4,7 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Count, Q, Sum, Avg
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from datetime import datetime, timedelta
 from app.models import CustomUser, Post, Comment, ChatHistory, EnvironmentalData
@@ -434,24 +435,27 @@ def chat_analytics(request):
     # Conversations récentes
     recent_chats = ChatHistory.objects.order_by('-timestamp')[:20]
     
-    # Statistiques par jour (derniers 30 jours)
+    # Statistiques par jour (derniers 30 jours) : une seule requête bornée
+    # sur la plage de dates, servie par l'index sur timestamp
+    today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    period_start = today_start - timedelta(days=29)
+    counts_by_day = {
+        row['day']: row['count']
+        for row in ChatHistory.objects.filter(timestamp__gte=period_start)
+        .annotate(day=TruncDate('timestamp'))
+        .values('day')
+        .annotate(count=Count('id'))
+        .order_by()
+    }
+    
     daily_chats = []
     for i in range(30):
-        date = timezone.now() - timedelta(days=i)
-        start_date = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_date = start_date + timedelta(days=1)
-        
-        chats_count = ChatHistory.objects.filter(
-            timestamp__range=[start_date, end_date]
-        ).count()
-        
+        start_date = period_start + timedelta(days=i)
         daily_chats.append({
             'date': start_date.strftime('%Y-%m-%d'),
-            'count': chats_count
+            'count': counts_by_day.get(start_date.date(), 0)
         })
     
-    daily_chats.reverse()
-    
     context = {
         'total_conversations': total_conversations,
         'categories': categories,
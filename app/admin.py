@@ -38,8 +38,8 @@ class EnvironmentalDataAdmin(admin.ModelAdmin):
     )
 
 class ChatHistoryAdmin(admin.ModelAdmin):
-    list_display = ('session_id', 'user_message', 'category', 'timestamp')
-    list_filter = ('category', 'timestamp')
+    list_display = ('session_id', 'user_message', 'category', 'source', 'timestamp')
+    list_filter = ('category', 'source', 'timestamp')
     search_fields = ('user_message', 'bot_response', 'session_id')
     readonly_fields = ('timestamp',)
     fieldsets = (
@@ -47,7 +47,7 @@ class ChatHistoryAdmin(admin.ModelAdmin):
             'fields': ('session_id', 'user_message', 'bot_response')
         }),
         ('Métadonnées', {
-            'fields': ('category', 'timestamp'),
+            'fields': ('category', 'source', 'timestamp'),
             'classes': ('collapse',)
         }),
     )
@@ -1,18 +1,37 @@
 """
 Module d'intelligence avancée pour BiaSavia
 """
-from .intelligent_processor import intelligent_processor
-from .nlp_processor import nlp_processor
+from .learning_store import learning_store
 from typing import Dict, Any, List
 import json
-import random
+import re
+import zlib
+
+EXPERTISE_LEVELS = ('beginner', 'intermediate', 'expert')
+
+# Termes techniques expliqués aux débutants
+TECHNICAL_TERMS = {
+    'biodiversité': 'la variété des espèces vivantes',
+    'écosystème': 'un ensemble d\'organismes vivants et leur environnement',
+    'carbone': 'un élément chimique présent dans le CO2',
+    'photosynthèse': 'le processus par lequel les plantes produisent de l\'oxygène'
+}
 
 class AdvancedIntelligence:
     """Système d'intelligence avancée pour des réponses personnalisées"""
     
     def __init__(self):
-        self.learning_database = {}  # Stockage des patterns d'apprentissage
+        self.learning_store = learning_store  # Stockage borné des patterns d'apprentissage
         self.response_templates = self._initialize_response_templates()
+        self.preambles = self._initialize_preambles()
+        # Une seule alternative compilée pour tous les termes (les plus longs d'abord) ;
+        # l'anticipation sur la première lettre écarte vite les autres mots
+        first_letters = ''.join(sorted({c for term in TECHNICAL_TERMS for c in (term[0].lower(), term[0].upper())}))
+        self.technical_terms_pattern = re.compile(
+            r'\b(?=[' + re.escape(first_letters) + r'])(?:'
+            + '|'.join(re.escape(term) for term in sorted(TECHNICAL_TERMS, key=len, reverse=True)) + r')\b',
+            re.IGNORECASE
+        )
         
     def _initialize_response_templates(self) -> Dict[str, List[str]]:
         """
@@ -41,13 +60,31 @@ class AdvancedIntelligence:
             ]
         }
     
+    def _initialize_preambles(self) -> Dict[tuple, tuple]:
+        """
+        Précalcule les préambules par (niveau d'expertise, tranche de confiance)
+        """
+        preambles = {}
+        for level in EXPERTISE_LEVELS:
+            preambles[(level, 'high')] = tuple(f"{template}\n\n" for template in self.response_templates['complex_question'])
+            preambles[(level, 'low')] = tuple(f"{template}\n\n" for template in self.response_templates['uncertainty'])
+        return preambles
+    
     def generate_intelligent_response(self, question: str, session_id: str = None, 
-                                    user_profile: Dict = None) -> Dict[str, Any]:
+                                    user_profile: Dict = None, remember: bool = True,
+                                    analysis=None, search_results: List[Dict] = None,
+                                    learn: bool = True) -> Dict[str, Any]:
         """
         Génère une réponse intelligente et personnalisée
+        learn=False n'alimente pas l'apprentissage (rejeux, préchauffage du cache)
         """
+        # Import différé : la pile de recherche n'est chargée qu'à la première question
+        from .intelligent_processor import intelligent_processor
+        
         # Traitement initial de la question
-        base_result = intelligent_processor.process_question(question, session_id)
+        base_result = intelligent_processor.process_question(
+            question, session_id, remember=remember, analysis=analysis, search_results=search_results
+        )
         
         # Analyse du contexte utilisateur
         user_context = self._analyze_user_context(session_id, user_profile)
@@ -77,8 +114,9 @@ class AdvancedIntelligence:
             'response_quality': self._assess_response_quality(base_result)
         }
         
-        # Apprentissage et amélioration
-        self._learn_from_interaction(question, enhanced_result, session_id)
+        # Apprentissage et amélioration (questions réellement posées uniquement)
+        if learn:
+            self._learn_from_interaction(question, enhanced_result, session_id)
         
         return enhanced_result
     
@@ -94,6 +132,8 @@ class AdvancedIntelligence:
         }
         
         if session_id:
+            from .intelligent_processor import intelligent_processor
+            
             # Analyse des tendances de conversation
             trends = intelligent_processor.analyze_conversation_trends(session_id)
             context['session_history'] = trends
@@ -128,34 +168,25 @@ class AdvancedIntelligence:
         else:
             personalized = base_answer
         
-        # Ajouter un préambule approprié
-        if base_result.get('confidence', 0) > 0.8:
-            template = random.choice(self.response_templates['complex_question'])
-        else:
-            template = random.choice(self.response_templates['uncertainty'])
+        # Ajouter un préambule approprié, choisi de façon stable pour une même
+        # question afin que la réponse complète reste mise en cache
+        band = 'high' if base_result.get('confidence', 0) > 0.8 else 'low'
+        preambles = self.preambles.get((expertise_level, band)) or self.preambles[('beginner', band)]
+        preamble = preambles[zlib.crc32(question.encode('utf-8')) % len(preambles)]
         
-        return f"{template}\n\n{personalized}"
+        return preamble + personalized
     
     def _simplify_response(self, response: str) -> str:
         """
         Simplifie une réponse pour les débutants
         """
-        # Ajouter des explications de base
-        simplified = response
-        
-        # Remplacer les termes techniques par des explications simples
-        technical_terms = {
-            'biodiversité': 'la variété des espèces vivantes',
-            'écosystème': 'un ensemble d\'organismes vivants et leur environnement',
-            'carbone': 'un élément chimique présent dans le CO2',
-            'photosynthèse': 'le processus par lequel les plantes produisent de l\'oxygène'
-        }
-        
-        for term, explanation in technical_terms.items():
-            if term in simplified.lower():
-                simplified = simplified.replace(term, f"{term} ({explanation})")
-        
-        return simplified
+        # Expliquer les termes techniques en un seul passage, sur des mots entiers
+        return self.technical_terms_pattern.sub(self._explain_term, response)
+    
+    @staticmethod
+    def _explain_term(match) -> str:
+        term = match.group(0)
+        return f"{term} ({TECHNICAL_TERMS[term.lower()]})"
     
     def _add_technical_details(self, response: str, category: str) -> str:
         """
@@ -315,21 +346,12 @@ class AdvancedIntelligence:
         # Stockage des patterns d'apprentissage
         pattern_key = result.get('category', 'general')
         
-        if pattern_key not in self.learning_database:
-            self.learning_database[pattern_key] = {
-                'frequent_questions': {},
-                'successful_responses': [],
-                'user_feedback': []
-            }
-        
-        # Enregistrer la question fréquente
-        question_lower = question.lower()
-        freq_questions = self.learning_database[pattern_key]['frequent_questions']
-        freq_questions[question_lower] = freq_questions.get(question_lower, 0) + 1
+        # Enregistrer la question fréquente (top-k borné)
+        self.learning_store.record_question(pattern_key, question)
         
-        # Enregistrer la réponse si elle est de bonne qualité
+        # Enregistrer la réponse si elle est de bonne qualité (échantillon borné)
         if result.get('response_quality', {}).get('score', 0) > 0.7:
-            self.learning_database[pattern_key]['successful_responses'].append({
+            self.learning_store.record_success(pattern_key, {
                 'question': question,
                 'answer': result.get('answer', ''),
                 'confidence': result.get('confidence', 0)
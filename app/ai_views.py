@@ -4,13 +4,26 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.core.files.storage import default_storage
 from django.conf import settings
+import hashlib
 import os
 import tempfile
 import logging
-from .simple_environmental_ai import environmental_classifier
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Classifications en cours, regroupées par empreinte SHA-256 du contenu de l'image
+classification_flight = SingleFlight('classify_image')
+
+
+def _get_classifier():
+    """
+    Classifieur d'images, importé au premier usage : numpy et PIL ne sont pas
+    chargés au démarrage de Django ni par les commandes de gestion
+    """
+    from .simple_environmental_ai import environmental_classifier
+    return environmental_classifier
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def classify_image(request):
@@ -45,15 +58,21 @@ def classify_image(request):
                 'error': 'Fichier trop volumineux. Maximum 10MB.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Sauvegarder temporairement l'image
+        # Sauvegarder temporairement l'image (et calculer son empreinte)
+        digest = hashlib.sha256()
         with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
             for chunk in image_file.chunks():
+                digest.update(chunk)
                 temp_file.write(chunk)
             temp_file_path = temp_file.name
 
         try:
-            # Classifier l'image (utiliser run pour les fonctions async)
-            result = asyncio.run(environmental_classifier.classify_image(temp_file_path))
+            # Classifier l'image (utiliser run pour les fonctions async) ; les envois
+            # simultanés d'une même image partagent une seule classification
+            result = classification_flight.do(
+                digest.hexdigest(),
+                lambda: asyncio.run(_get_classifier().classify_image(temp_file_path))
+            )
             
             # Nettoyer le fichier temporaire
             os.unlink(temp_file_path)
@@ -136,7 +155,7 @@ def classify_batch(request):
 
             # Classifier toutes les images valides
             if temp_files:
-                batch_result = asyncio.run(environmental_classifier.batch_classify(temp_files))
+                batch_result = asyncio.run(_get_classifier().batch_classify(temp_files))
                 
                 # Formater les résultats
                 for i, detail in enumerate(batch_result['details']):
@@ -187,7 +206,7 @@ def ai_status(request):
     try:
         return Response({
             'success': True,
-            'ai_ready': environmental_classifier.is_loaded,
+            'ai_ready': _get_classifier().is_loaded,
             'model_info': {
                 'name': 'MobileNetV2',
                 'source': 'TensorFlow Hub',
@@ -219,12 +238,12 @@ def initialize_ai(request):
     import asyncio
     
     try:
-        success = asyncio.run(environmental_classifier.load_model())
+        success = asyncio.run(_get_classifier().load_model())
         
         return Response({
             'success': success,
             'message': 'Modèle chargé avec succès' if success else 'Échec du chargement du modèle',
-            'ai_ready': environmental_classifier.is_loaded
+            'ai_ready': _get_classifier().is_loaded
         }, status=status.HTTP_200_OK if success else status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     except Exception as e:
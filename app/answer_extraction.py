@@ -0,0 +1,191 @@
+"""
+Module d'extraction de réponses pour BiaSavia
+
+Résumé extractif des extraits de recherche : les extraits sont découpés en
+phrases, chaque phrase est comparée à la question (similarité cosinus entre
+vecteurs TF-IDF, calculée en bloc avec numpy, combinée à celle de son
+résultat d'origine, titre compris), puis les meilleures phrases sont retenues
+par pertinence marginale maximale (MMR) pour éviter les redites, dans la
+limite de ANSWER_MAX_SENTENCES phrases et ANSWER_MAX_CHARS caractères.
+
+Un seul mot commun ne suffit pas : une phrase n'est candidate que si elle et
+le titre de son résultat couvrent au moins deux termes de la question (tous
+s'il n'y en a qu'un). Une phrase qui commence par un pronom de reprise
+(« Elles émettent... ») n'est retenue que juste après la phrase qui la précède
+dans le même extrait.
+"""
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .nlp_engines import STOP_WORDS
+from .nlp_processor import nlp_processor
+
+# Fin de phrase suivie d'une majuscule, d'un chiffre ou d'un guillemet ouvrant
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-ZÀ-ÖØ-Þ0-9«"])')
+# Points de suspension des extraits tronqués : les morceaux sont traités séparément
+ELLIPSIS = re.compile(r'\s*(?:…|\.\.\.)\s*')
+COMPLETE_SENTENCE = re.compile(r'^[A-ZÀ-ÖØ-Þ0-9«"].*[.!?»"]$')
+# Date en tête d'extrait de moteur de recherche (« 12 sept. 2024 — »)
+SNIPPET_DATE_PREFIX = re.compile(r'^\s*\d{1,2}\s+\w+\.?\s+\d{4}\s+[—-]\s+')
+# Pronom de reprise en tête de phrase : la phrase n'a pas de sens isolée
+ANAPHORIC_START = re.compile(r"^(?:Il|Elle|Ils|Elles|Cela|Ce)\b")
+
+MIN_SENTENCE_LENGTH = 25
+# Part de la similarité du résultat d'origine dans la pertinence d'une phrase
+RESULT_WEIGHT = 0.3
+# Termes distincts de la question à couvrir (phrase et titre de son résultat)
+MIN_QUESTION_TERMS = 2
+
+NO_ANSWER = "Je n'ai pas trouvé d'informations pertinentes pour répondre à votre question."
+
+
+class ExtractiveSummarizer:
+    """Sélection des phrases d'extraits les plus proches de la question, sans redondance"""
+
+    def __init__(self, max_sentences: int = 3, max_chars: int = 500, diversity: float = 0.3):
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+        # Poids de la redondance dans le score MMR (0 : pertinence seule)
+        self.diversity = diversity
+        self.stop_words = {nlp_processor.fold(word) for word in STOP_WORDS}
+
+    @classmethod
+    def from_settings(cls) -> 'ExtractiveSummarizer':
+        return cls(
+            max_sentences=getattr(settings, 'ANSWER_MAX_SENTENCES', 3),
+            max_chars=getattr(settings, 'ANSWER_MAX_CHARS', 500),
+            diversity=getattr(settings, 'ANSWER_DIVERSITY', 0.3),
+        )
+
+    def split_sentences(self, results: List[Dict]) -> Tuple[List[str], List[int], List[int]]:
+        """
+        Phrases distinctes des extraits, dans l'ordre des résultats, avec l'indice
+        du résultat d'origine et celui de la phrase qui la précède dans le même
+        morceau d'extrait (-1 si elle ouvre le morceau ou si la précédente a été
+        écartée). Les fragments d'extraits tronqués ne sont gardés qu'à défaut de
+        phrase complète.
+        """
+        complete = ([], [], [])
+        partial = ([], [], [])
+        seen = set()
+        for index, result in enumerate(results):
+            snippet = SNIPPET_DATE_PREFIX.sub('', ' '.join((result.get('snippet') or '').split()))
+            for chunk in ELLIPSIS.split(snippet):
+                previous = None
+                for sentence in SENTENCE_BOUNDARY.split(chunk.strip()):
+                    key = sentence.lower()
+                    if len(sentence) < MIN_SENTENCE_LENGTH or key in seen:
+                        previous = None
+                        continue
+                    seen.add(key)
+                    target = complete if COMPLETE_SENTENCE.match(sentence) else partial
+                    sentences, owners, antecedents = target
+                    antecedents.append(previous[1] if previous and previous[0] is target else -1)
+                    previous = (target, len(sentences))
+                    sentences.append(sentence)
+                    owners.append(index)
+        return complete if complete[0] else partial
+
+    def _terms(self, text: str) -> List[str]:
+        return [token for token in nlp_processor.tokenize(text) if len(token) > 2 and token not in self.stop_words]
+
+    @staticmethod
+    def _tfidf(rows: List[List[int]], size: int, idf: np.ndarray) -> np.ndarray:
+        """Vecteurs TF-IDF normalisés (le cosinus devient un produit scalaire)"""
+        matrix = np.zeros((len(rows), size), dtype=np.float32)
+        for row, term_ids in enumerate(rows):
+            np.add.at(matrix[row], term_ids, 1)
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def rank_sentences(self, sentences: List[str], owners: List[int], results: List[Dict],
+                       question: str, antecedents: List[int] = None) -> List[int]:
+        """Indices des phrases retenues, de la plus utile à la moins utile"""
+        vocabulary = {}
+
+        def term_ids(text):
+            return [vocabulary.setdefault(term, len(vocabulary)) for term in self._terms(text)]
+
+        sentence_terms = [term_ids(sentence) for sentence in sentences]
+        result_terms = [term_ids(f"{result.get('title', '')} {result.get('snippet', '')}") for result in results]
+        question_terms = [vocabulary[term] for term in self._terms(question) if term in vocabulary]
+        if not question_terms:
+            return []
+
+        # Fréquence documentaire calculée sur les phrases
+        document_frequency = np.zeros(len(vocabulary), dtype=np.float32)
+        for term_id_list in sentence_terms:
+            document_frequency[list(set(term_id_list))] += 1
+        idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+
+        tfidf = self._tfidf(sentence_terms, len(vocabulary), idf)
+        query = self._tfidf([question_terms], len(vocabulary), idf)[0]
+        result_relevance = self._tfidf(result_terms, len(vocabulary), idf) @ query
+
+        relevance = (1 - RESULT_WEIGHT) * (tfidf @ query) + RESULT_WEIGHT * result_relevance[owners]
+        relevance[tfidf @ query == 0] = 0  # une phrase sans terme de la question n'est jamais retenue
+
+        # Termes de la question couverts par la phrase et le titre de son résultat
+        # (comptés sur toute la question : un terme absent des extraits manque aussi)
+        wanted = set(question_terms)
+        required = min(MIN_QUESTION_TERMS, len(set(self._terms(question))))
+        title_terms = [wanted.intersection(term_ids(result.get('title', ''))) for result in results]
+        for index, term_id_list in enumerate(sentence_terms):
+            if len(wanted.intersection(term_id_list) | title_terms[owners[index]]) < required:
+                relevance[index] = 0
+        similarity = tfidf @ tfidf.T
+
+        # Phrase à pronom de reprise : candidate seulement une fois sa précédente retenue
+        antecedents = antecedents if antecedents is not None else [-1] * len(sentences)
+        waiting = np.array([bool(ANAPHORIC_START.match(sentence)) for sentence in sentences])
+
+        # Pertinence marginale maximale : pertinence moins proximité aux phrases déjà choisies
+        selected = []
+        redundancy = np.zeros(len(sentences), dtype=np.float32)
+        available = relevance > 0
+        length = 0
+        while (available & ~waiting).any() and len(selected) < self.max_sentences:
+            scores = np.where(available & ~waiting,
+                              (1 - self.diversity) * relevance - self.diversity * redundancy, -np.inf)
+            best = int(np.argmax(scores))
+            available[best] = False
+            if selected and length + len(sentences[best]) + 1 > self.max_chars:
+                continue
+            selected.append(best)
+            length += len(sentences[best]) + 1
+            redundancy = np.maximum(redundancy, similarity[best])
+            for index, antecedent in enumerate(antecedents):
+                if antecedent == best:
+                    waiting[index] = False
+        return selected
+
+    @staticmethod
+    def _reading_order(sentences: List[str], selected: List[int], antecedents: List[int]) -> List[int]:
+        """Ordre de sélection, chaque phrase de reprise placée juste après sa précédente"""
+        followers = {
+            antecedents[index]: index for index in selected if ANAPHORIC_START.match(sentences[index])
+        }
+        order = []
+        for index in selected:
+            if index in followers.values():
+                continue
+            while index is not None:
+                order.append(index)
+                index = followers.get(index)
+        return order
+
+    def summarize(self, results: List[Dict], question: str) -> str:
+        sentences, owners, antecedents = self.split_sentences(results)
+        selected = self.rank_sentences(sentences, owners, results, question, antecedents) if sentences else []
+        if not selected:
+            return ''
+        answer = ' '.join(sentences[index] for index in self._reading_order(sentences, selected, antecedents))
+        return answer[:self.max_chars] + "..." if len(answer) > self.max_chars else answer
+
+
+# Instance globale du résumé extractif
+extractive_summarizer = ExtractiveSummarizer.from_settings()
@@ -0,0 +1,161 @@
+"""
+Module d'orchestration des sources de réponse du chatbot pour BiaSavia
+
+Une réponse se construit en deux étapes : l'appelant fait d'abord la
+recherche (étape séquentielle, la plus lente), puis l'orchestrateur interroge
+en parallèle les sources de réponse qui exploitent ses résultats.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+
+
+class AnswerSource:
+    """Source de réponse candidate (plus la priorité est basse, meilleure est la réponse)"""
+
+    def __init__(self, name: str, priority: int, handler: Callable[..., Optional[Dict]]):
+        self.name = name
+        self.priority = priority
+        self.handler = handler
+
+
+class ChatbotOrchestrator:
+    """
+    Interroge les sources de réponse en parallèle sous une échéance commune
+    et retient la meilleure réponse arrivée à temps
+
+    Les sources ne doivent pas refaire les mêmes calculs : ce qui leur est
+    commun (analyse, recherche) est fait une fois par l'appelant et transmis
+    par answer(..., **shared).
+
+    Le pool compte une place par source pour chacune des requêtes traitées en
+    même temps (CHATBOT_CONCURRENT_REQUESTS). Une source hors délai continue de
+    tourner et garde sa place ; quand le pool n'a plus de place pour toutes les
+    sources d'une requête, celle-ci reçoit directement la réponse de repli
+    plutôt que d'attendre en file jusqu'à l'échéance.
+    """
+
+    def __init__(self, sources: List[AnswerSource], fallback: Callable[..., Dict], max_workers: int = None):
+        self.sources = sorted(sources, key=lambda source: source.priority)
+        self.fallback = fallback
+        self.max_workers = (
+            max_workers
+            or getattr(settings, 'CHATBOT_SOURCE_WORKERS', 0)
+            or getattr(settings, 'CHATBOT_CONCURRENT_REQUESTS', 4) * len(self.sources)
+        )
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='chatbot-source')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = {'requests': 0, 'saturated': 0}
+
+    def _reserve(self) -> bool:
+        """Réserve une place par source, ou refuse si le pool est saturé"""
+        with self._lock:
+            self.stats['requests'] += 1
+            if self._in_flight + len(self.sources) > self.max_workers:
+                self.stats['saturated'] += 1
+                return False
+            self._in_flight += len(self.sources)
+            return True
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def answer(self, message: str, session_id: str = None, deadline: float = None,
+               **shared: Any) -> Dict[str, Any]:
+        """
+        Retourne la meilleure réponse disponible avant l'échéance
+        {'response', 'category', 'sources', 'source', 'latencies'}
+        shared (analyse NLP, résultats de recherche...) est calculé une seule fois
+        par l'appelant et transmis tel quel à chaque source et à la réponse de repli
+        """
+        budget = deadline if deadline is not None else getattr(settings, 'CHATBOT_RESPONSE_DEADLINE', 8.0)
+        started = time.perf_counter()
+        end = started + budget
+
+        futures = {}
+        latencies = {}
+        if self._reserve():
+            for source in self.sources:
+                future = self.executor.submit(self._run_source, source, message, session_id, shared)
+                # Place libérée à la fin réelle de la source (ou à son annulation)
+                future.add_done_callback(self._release)
+                futures[future] = source
+        else:
+            print("⚠️ Sources du chatbot saturées : réponse de repli immédiate")
+            for source in self.sources:
+                latencies[source.name] = {'status': 'saturated', 'elapsed_ms': 0.0}
+        pending = set(futures)
+        best, best_source = None, None
+        skipped = False
+
+        while pending:
+            # Inutile d'attendre des sources moins prioritaires que la meilleure réponse reçue
+            if best_source and all(futures[f].priority > best_source.priority for f in pending):
+                skipped = True
+                break
+            remaining = end - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = futures[future]
+                result, elapsed, error = future.result()
+                latencies[source.name] = {
+                    'status': 'error' if error else ('answered' if result else 'empty'),
+                    'elapsed_ms': round(elapsed * 1000, 1),
+                }
+                if error:
+                    latencies[source.name]['error'] = error
+                if result and (best_source is None or source.priority < best_source.priority):
+                    best, best_source = result, source
+
+        # Les sources non démarrées sont annulées ; celles déjà en cours ne
+        # peuvent pas être interrompues et leur résultat est ignoré. Une source
+        # écartée par une réponse plus prioritaire n'a pas dépassé l'échéance.
+        for future in pending:
+            cancelled = future.cancel()
+            if skipped:
+                status = 'skipped'
+            else:
+                status = 'cancelled' if cancelled else 'timeout'
+            latencies[futures[future].name] = {
+                'status': status,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            }
+
+        source_name = best_source.name if best_source else 'fallback'
+        if best is None:
+            fallback_started = time.perf_counter()
+            best = self.fallback(message, **shared)
+            latencies['fallback'] = {
+                'status': 'answered',
+                'elapsed_ms': round((time.perf_counter() - fallback_started) * 1000, 1),
+            }
+
+        return {
+            'response': best['response'],
+            'category': best.get('category', source_name),
+            'sources': best.get('sources', []),
+            'source': source_name,
+            'latencies': latencies,
+            'total_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'max_workers': self.max_workers, 'in_flight': self._in_flight, **self.stats}
+
+    def _run_source(self, source: AnswerSource, message: str, session_id: str = None, shared: Dict = None):
+        """Exécute une source en mesurant sa latence ; les erreurs ne remontent pas"""
+        started = time.perf_counter()
+        try:
+            result = source.handler(message, session_id, **(shared or {}))
+            return result, time.perf_counter() - started, None
+        except Exception as e:
+            print(f"❌ Erreur de la source {source.name} : {e}")
+            return None, time.perf_counter() - started, str(e)
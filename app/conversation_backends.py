@@ -0,0 +1,538 @@
+"""
+Backends de stockage de la mémoire conversationnelle pour BiaSavia
+
+- inprocess : dictionnaire LRU borné propre à chaque worker (par défaut)
+- cache     : cache Django partagé (Redis, Memcached...) entre workers
+- database  : tampon circulaire en base (SQLite ou autre) partagé entre workers
+
+Chaque backend ne conserve que les max_history_length derniers messages d'une
+session et ne lit jamais plus que ces derniers messages.
+
+Les messages portent un horodatage ISO (affichage) et un horodatage numérique
+'ts' (secondes epoch) utilisé pour les calculs de durée sans analyse de texte.
+"""
+from typing import Dict, List, Any, Optional
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from itertools import islice
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+RECENT_TOPICS_LIMIT = 3
+
+
+def summarize_messages(messages: List[Dict[str, Any]], created_ts: float, last_ts: float) -> Dict[str, Any]:
+    """Résumé d'une session calculé à partir de la fenêtre de messages conservée"""
+    topics = {}
+    for message in messages:
+        category = message.get('category')
+        if category:
+            topics[category] = topics.get(category, 0) + 1
+    return {
+        'topics': topics,
+        'recent_topics': recent_topics(messages),
+        'conversation_length': len(messages),
+        'created_ts': created_ts,
+        'last_ts': last_ts,
+    }
+
+
+def recent_topics(messages: List[Dict[str, Any]], limit: int = RECENT_TOPICS_LIMIT) -> List[str]:
+    """Sujets distincts des `limit` derniers messages, les plus récents en premier"""
+    topics = []
+    for message in reversed(messages[-limit:]):
+        category = message.get('category')
+        if category and category not in topics:
+            topics.append(category)
+    return topics
+
+
+class BaseConversationBackend:
+    """Interface commune des backends de mémoire conversationnelle"""
+
+    def __init__(self, max_history_length: int = 10, idle_ttl: float = 3600):
+        self.max_history_length = max_history_length
+        self.idle_ttl = idle_ttl
+
+    def append(self, session_id: str, message_data: Dict[str, Any]):
+        """Ajoute un message à la session de façon atomique"""
+        raise NotImplementedError
+
+    def load(self, session_id: str, limit: int = None) -> Optional[Dict[str, Any]]:
+        """
+        Retourne {'messages', 'created_at', 'created_ts', 'last_activity'} pour
+        la session, ou None si elle n'existe pas (ou a expiré)
+        """
+        raise NotImplementedError
+
+    def summarize(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne {'topics', 'recent_topics', 'conversation_length', 'created_ts',
+        'last_ts'} pour la session, ou None si elle n'existe pas
+
+        Par défaut le résumé est dérivé de la fenêtre de messages (bornée à
+        max_history_length) ; le backend inprocess le tient à jour à chaque ajout.
+        """
+        conversation = self.load(session_id)
+        if conversation is None or not conversation['messages']:
+            return None
+        messages = conversation['messages']
+        return summarize_messages(messages, conversation['created_ts'], messages[-1]['ts'])
+
+    def clear(self, session_id: str):
+        """Efface une session"""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs propres au backend"""
+        return {'backend': self.name}
+
+
+class CategoryTable:
+    """
+    Table d'internement des catégories : chaque nom est stocké une seule fois
+    et les messages ne portent qu'un petit entier (0 = pas de catégorie)
+    """
+
+    def __init__(self):
+        self._names = [None]
+        self._ids = {None: 0}
+        self._lock = threading.Lock()
+
+    def intern(self, name: Optional[str]) -> int:
+        category_id = self._ids.get(name)
+        if category_id is None:
+            with self._lock:
+                category_id = self._ids.get(name)
+                if category_id is None:
+                    category_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = category_id
+        return category_id
+
+    def name(self, category_id: int) -> Optional[str]:
+        return self._names[category_id]
+
+
+categories = CategoryTable()
+
+
+class MessageRecord:
+    """Échange compact : horodatage numérique et catégorie internée"""
+
+    __slots__ = ('ts', 'user_message', 'bot_response', 'category_id')
+
+    def __init__(self, ts: float, user_message: str, bot_response: str, category_id: int):
+        self.ts = ts
+        self.user_message = user_message
+        self.bot_response = bot_response
+        self.category_id = category_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'timestamp': datetime.fromtimestamp(self.ts).isoformat(),
+            'ts': self.ts,
+            'user_message': self.user_message,
+            'bot_response': self.bot_response,
+            'category': categories.name(self.category_id),
+        }
+
+
+class SessionRecord:
+    """État d'une session en mémoire : fenêtre de messages et compteurs de sujets"""
+
+    __slots__ = ('messages', 'topics', 'created_ts', 'last_seen', 'size')
+
+    def __init__(self, max_history_length: int, created_ts: float):
+        self.messages = deque(maxlen=max_history_length)
+        self.topics = {}  # category_id -> nombre de messages dans la fenêtre
+        self.created_ts = created_ts
+        self.last_seen = time.monotonic()
+        self.size = 0
+
+
+class InProcessConversationBackend(BaseConversationBackend):
+    """
+    Stockage en mémoire du worker, borné : LRU sur le nombre de sessions et sur
+    un budget mémoire approximatif, plus une expiration après inactivité.
+    L'OrderedDict est maintenu dans l'ordre de dernière utilisation, donc les
+    sessions à évincer sont toujours en tête (éviction en O(1)).
+
+    Les compteurs de sujets de chaque session sont tenus à jour à l'ajout et à
+    la sortie d'un message de la fenêtre : le résumé se lit en O(1).
+
+    Chaque session garde ses messages dans une deque(maxlen) de MessageRecord
+    à __slots__ : l'ajout ne recopie jamais l'historique et les horodatages ISO
+    ne sont reconstruits qu'à la lecture.
+    """
+    name = 'inprocess'
+
+    # Coût fixe approximatif d'un MessageRecord (objet, float, entrée de deque)
+    RECORD_OVERHEAD = 120
+
+    def __init__(self, max_history_length: int = 10, idle_ttl: float = 3600,
+                 max_sessions: int = 10000, max_memory_bytes: int = 64 * 1024 * 1024):
+        super().__init__(max_history_length, idle_ttl)
+        self.conversations = OrderedDict()  # session_id -> SessionRecord (ordre LRU)
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self.memory_bytes = 0
+        self.evictions = {'lru': 0, 'idle': 0, 'memory': 0}
+        self._lock = threading.RLock()
+
+    def _get_conversation(self, session_id: str) -> Optional[SessionRecord]:
+        """
+        Retourne la conversation d'une session en la marquant comme récemment utilisée
+        Une session inactive depuis plus de idle_ttl est évincée
+        """
+        conversation = self.conversations.get(session_id)
+        if conversation is None:
+            return None
+        now = time.monotonic()
+        if now - conversation.last_seen > self.idle_ttl:
+            self._evict(session_id, 'idle')
+            return None
+        conversation.last_seen = now
+        self.conversations.move_to_end(session_id)
+        return conversation
+
+    def _evict(self, session_id: str, reason: str):
+        conversation = self.conversations.pop(session_id)
+        self.memory_bytes -= conversation.size
+        self.evictions[reason] += 1
+
+    def _enforce_limits(self):
+        """Évince les sessions expirées puis les moins récemment utilisées"""
+        now = time.monotonic()
+        while self.conversations:
+            oldest_id, oldest = next(iter(self.conversations.items()))
+            if now - oldest.last_seen > self.idle_ttl:
+                self._evict(oldest_id, 'idle')
+            elif len(self.conversations) > self.max_sessions:
+                self._evict(oldest_id, 'lru')
+            elif self.memory_bytes > self.max_memory_bytes and len(self.conversations) > 1:
+                self._evict(oldest_id, 'memory')
+            else:
+                break
+
+    @classmethod
+    def _message_size(cls, record: MessageRecord) -> int:
+        """Taille approximative d'un message en mémoire (en octets)"""
+        return len(record.user_message or '') + len(record.bot_response or '') + cls.RECORD_OVERHEAD
+
+    def append(self, session_id: str, message_data: Dict[str, Any]):
+        record = MessageRecord(
+            message_data['ts'],
+            message_data['user_message'],
+            message_data['bot_response'],
+            categories.intern(message_data['category']),
+        )
+        with self._lock:
+            conversation = self._get_conversation(session_id)
+            if conversation is None:
+                conversation = self.conversations[session_id] = SessionRecord(self.max_history_length, record.ts)
+
+            messages = conversation.messages
+            topics = conversation.topics
+            added_size = self._message_size(record)
+
+            # La deque étant pleine, le plus ancien message sort de la fenêtre
+            if len(messages) == messages.maxlen:
+                removed = messages[0]
+                added_size -= self._message_size(removed)
+                if removed.category_id:
+                    topics[removed.category_id] -= 1
+                    if not topics[removed.category_id]:
+                        del topics[removed.category_id]
+
+            messages.append(record)
+            if record.category_id:
+                topics[record.category_id] = topics.get(record.category_id, 0) + 1
+
+            conversation.size += added_size
+            self.memory_bytes += added_size
+            self._enforce_limits()
+
+    def load(self, session_id: str, limit: int = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conversation = self._get_conversation(session_id)
+            if conversation is None:
+                return None
+            messages = conversation.messages
+            start = max(len(messages) - limit, 0) if limit else 0
+            records = list(islice(messages, start, None))
+
+        return {
+            'messages': [record.to_dict() for record in records],
+            'created_at': datetime.fromtimestamp(conversation.created_ts).isoformat(),
+            'created_ts': conversation.created_ts,
+            'last_activity': datetime.fromtimestamp(records[-1].ts).isoformat(),
+        }
+
+    def summarize(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conversation = self._get_conversation(session_id)
+            if conversation is None:
+                return None
+            messages = conversation.messages
+            recent = []
+            for record in islice(reversed(messages), RECENT_TOPICS_LIMIT):
+                category = categories.name(record.category_id)
+                if category and category not in recent:
+                    recent.append(category)
+            return {
+                'topics': {categories.name(category_id): count for category_id, count in conversation.topics.items()},
+                'recent_topics': recent,
+                'conversation_length': len(messages),
+                'created_ts': conversation.created_ts,
+                'last_ts': messages[-1].ts,
+            }
+
+    def clear(self, session_id: str):
+        with self._lock:
+            conversation = self.conversations.pop(session_id, None)
+            if conversation is not None:
+                self.memory_bytes -= conversation.size
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': self.name,
+                'live_sessions': len(self.conversations),
+                'memory_bytes': self.memory_bytes,
+                'max_sessions': self.max_sessions,
+                'max_memory_bytes': self.max_memory_bytes,
+                'idle_ttl': self.idle_ttl,
+                'evictions': dict(self.evictions),
+            }
+
+
+class CacheConversationBackend(BaseConversationBackend):
+    """
+    Tampon circulaire dans le cache Django, partagé entre workers
+
+    Un compteur par session (cache.incr, atomique sur Redis/Memcached) attribue
+    un numéro de séquence à chaque message ; le message est écrit dans la case
+    seq % max_history_length. La lecture ne récupère que les dernières cases
+    en un seul get_many. L'expiration du cache sert d'expiration d'inactivité.
+
+    Le cache doit être partagé entre processus : LocMemCache (propre à chaque
+    worker) et DummyCache sont refusés.
+    """
+    name = 'cache'
+
+    def __init__(self, max_history_length: int = 10, idle_ttl: float = 3600,
+                 cache_alias: str = 'default', key_prefix: str = 'conversation'):
+        super().__init__(max_history_length, idle_ttl)
+        self.cache = caches[cache_alias]
+        if isinstance(self.cache, (LocMemCache, DummyCache)):
+            raise ImproperlyConfigured(
+                f"CONVERSATION_MEMORY_BACKEND=cache demande un cache partagé entre workers : "
+                f"le cache « {cache_alias} » est {type(self.cache).__name__} (définir CACHE_URL)"
+            )
+        self.key_prefix = key_prefix
+        # Une case n'est réécrite qu'au bout de max_history_length messages : elle doit
+        # survivre jusque-là à une session active (au plus idle_ttl entre deux messages)
+        self.turn_ttl = idle_ttl * max_history_length
+
+    def _key(self, session_id: str, suffix: str) -> str:
+        return f"{self.key_prefix}:{session_id}:{suffix}"
+
+    def _next_sequence(self, session_id: str) -> int:
+        seq_key = self._key(session_id, 'seq')
+        for _ in range(2):
+            self.cache.add(seq_key, 0, self.idle_ttl)
+            try:
+                return self.cache.incr(seq_key)
+            except ValueError:
+                # La clé a expiré entre add() et incr() : on réessaie une fois
+                continue
+        raise RuntimeError(f"Impossible d'allouer un numéro de séquence pour la session {session_id}")
+
+    def append(self, session_id: str, message_data: Dict[str, Any]):
+        seq = self._next_sequence(session_id)
+        slot = seq % self.max_history_length
+        self.cache.set(self._key(session_id, f'turn:{slot}'), {'seq': seq, **message_data}, self.turn_ttl)
+        self.cache.add(self._key(session_id, 'created_at'),
+                       (message_data['timestamp'], message_data['ts']), self.idle_ttl)
+        self.cache.touch(self._key(session_id, 'seq'), self.idle_ttl)
+        self.cache.touch(self._key(session_id, 'created_at'), self.idle_ttl)
+
+    def load(self, session_id: str, limit: int = None) -> Optional[Dict[str, Any]]:
+        seq = self.cache.get(self._key(session_id, 'seq'))
+        if not seq:
+            return None
+
+        count = min(limit or self.max_history_length, self.max_history_length, seq)
+        sequences = range(seq - count + 1, seq + 1)
+        keys = {self._key(session_id, f'turn:{s % self.max_history_length}'): s for s in sequences}
+        keys[self._key(session_id, 'created_at')] = None
+        values = self.cache.get_many(list(keys))
+
+        messages = []
+        for key, expected_seq in keys.items():
+            turn = values.get(key)
+            # Une case peut contenir un message plus récent écrit entre-temps
+            if expected_seq is not None and turn and turn['seq'] == expected_seq:
+                messages.append({k: v for k, v in turn.items() if k != 'seq'})
+        if not messages:
+            return None
+
+        created_at, created_ts = values.get(self._key(session_id, 'created_at')) or (
+            messages[0]['timestamp'], messages[0]['ts']
+        )
+        return {
+            'messages': messages,
+            'created_at': created_at,
+            'created_ts': created_ts,
+            'last_activity': messages[-1]['timestamp'],
+        }
+
+    def clear(self, session_id: str):
+        keys = [self._key(session_id, 'seq'), self._key(session_id, 'created_at')]
+        keys += [self._key(session_id, f'turn:{slot}') for slot in range(self.max_history_length)]
+        self.cache.delete_many(keys)
+
+
+class DatabaseConversationBackend(BaseConversationBackend):
+    """
+    Tampon circulaire en base, partagé entre workers
+
+    ConversationSession.turn_count est incrémenté par un UPDATE atomique qui
+    verrouille la ligne ; le message remplace la case turn_count % max_history_length
+    dans la même transaction. La lecture ne porte que sur les dernières cases.
+
+    Les sessions expirées ne sont supprimées qu'à leur relecture : la commande
+    purge_conversations (à planifier) supprime les autres.
+    """
+    name = 'database'
+
+    def __init__(self, max_history_length: int = 10, idle_ttl: float = 3600):
+        super().__init__(max_history_length, idle_ttl)
+        self.dropped_turns = 0
+
+    def append(self, session_id: str, message_data: Dict[str, Any]):
+        from .models import ConversationSession, ConversationTurn
+
+        now = timezone.now()
+        timestamp = datetime.fromisoformat(message_data['timestamp'])
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+        error = None
+        for _ in range(2):
+            try:
+                with transaction.atomic():
+                    updated = ConversationSession.objects.filter(session_id=session_id).update(
+                        turn_count=F('turn_count') + 1, last_activity=now
+                    )
+                    if not updated:
+                        ConversationSession.objects.create(session_id=session_id, turn_count=1, last_activity=now)
+                    session = ConversationSession.objects.get(session_id=session_id)
+                    seq = session.turn_count - 1
+                    ConversationTurn.objects.update_or_create(
+                        session=session,
+                        slot=seq % self.max_history_length,
+                        defaults={
+                            'seq': seq,
+                            'user_message': message_data['user_message'],
+                            'bot_response': message_data['bot_response'],
+                            'category': message_data['category'],
+                            'timestamp': timestamp,
+                        }
+                    )
+                return
+            except IntegrityError as e:
+                # Session créée en parallèle par un autre worker : on réessaie une fois
+                error = e
+        self.dropped_turns += 1
+        print(f"⚠️ Message non enregistré dans la mémoire de la session {session_id} : {error}")
+
+    def load(self, session_id: str, limit: int = None) -> Optional[Dict[str, Any]]:
+        from .models import ConversationSession, ConversationTurn
+
+        session = ConversationSession.objects.filter(session_id=session_id).first()
+        if session is None:
+            return None
+        if timezone.now() - session.last_activity > timedelta(seconds=self.idle_ttl):
+            session.delete()
+            return None
+
+        count = min(limit or self.max_history_length, self.max_history_length)
+        turns = list(ConversationTurn.objects.filter(session=session).order_by('-seq')[:count])
+        messages = [
+            {
+                'timestamp': turn.timestamp.isoformat(),
+                'ts': turn.timestamp.timestamp(),
+                'user_message': turn.user_message,
+                'bot_response': turn.bot_response,
+                'category': turn.category,
+            }
+            for turn in reversed(turns)
+        ]
+        return {
+            'messages': messages,
+            'created_at': session.created_at.isoformat(),
+            'created_ts': session.created_at.timestamp(),
+            'last_activity': session.last_activity.isoformat(),
+        }
+
+    def clear(self, session_id: str):
+        from .models import ConversationSession
+        ConversationSession.objects.filter(session_id=session_id).delete()
+
+    def expired_sessions(self):
+        from .models import ConversationSession
+        cutoff = timezone.now() - timedelta(seconds=self.idle_ttl)
+        return ConversationSession.objects.filter(last_activity__lt=cutoff)
+
+    def purge_expired(self, batch_size: int = 1000) -> int:
+        """Supprime par lots les sessions inactives depuis plus de idle_ttl (et leurs messages)"""
+        from .models import ConversationSession
+        purged = 0
+        while True:
+            ids = list(self.expired_sessions().order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return purged
+            with transaction.atomic():
+                ConversationSession.objects.filter(id__in=ids).delete()
+            purged += len(ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'idle_ttl': self.idle_ttl, 'dropped_turns': self.dropped_turns}
+
+
+CONVERSATION_BACKENDS = {
+    'inprocess': InProcessConversationBackend,
+    'cache': CacheConversationBackend,
+    'database': DatabaseConversationBackend,
+}
+
+
+def get_conversation_backend(name: str = None, max_history_length: int = 10) -> BaseConversationBackend:
+    """Instancie le backend configuré par CONVERSATION_MEMORY_BACKEND"""
+    name = name or getattr(settings, 'CONVERSATION_MEMORY_BACKEND', 'inprocess')
+    if name not in CONVERSATION_BACKENDS:
+        raise ValueError(f"Backend de mémoire conversationnelle inconnu : {name}")
+
+    idle_ttl = getattr(settings, 'CONVERSATION_MEMORY_IDLE_TTL', 3600)
+    if name == 'inprocess':
+        return InProcessConversationBackend(
+            max_history_length, idle_ttl,
+            max_sessions=getattr(settings, 'CONVERSATION_MEMORY_MAX_SESSIONS', 10000),
+            max_memory_bytes=getattr(settings, 'CONVERSATION_MEMORY_MAX_BYTES', 64 * 1024 * 1024),
+        )
+    if name == 'cache':
+        return CacheConversationBackend(
+            max_history_length, idle_ttl,
+            cache_alias=getattr(settings, 'CONVERSATION_MEMORY_CACHE_ALIAS', 'default'),
+        )
+    return DatabaseConversationBackend(max_history_length, idle_ttl)
@@ -3,74 +3,62 @@ Module de mémoire conversationnelle pour BiaSavia
 """
 from typing import Dict, List, Any
 import json
+import time
 from datetime import datetime
+from .conversation_backends import BaseConversationBackend, get_conversation_backend
 
 class ConversationMemory:
-    """Gestionnaire de mémoire pour les conversations du chatbot"""
+    """
+    Gestionnaire de mémoire pour les conversations du chatbot
     
-    def __init__(self):
-        self.conversations = {}  # session_id -> conversation_data
+    Le stockage est délégué à un backend (CONVERSATION_MEMORY_BACKEND) :
+    mémoire du worker, cache Django partagé ou base de données.
+    """
+    
+    def __init__(self, backend: BaseConversationBackend = None):
         self.max_history_length = 10  # Nombre max de messages à retenir
+        self.backend = backend or get_conversation_backend(max_history_length=self.max_history_length)
     
     def add_message(self, session_id: str, user_message: str, bot_response: str, category: str = None):
         """
         Ajoute un message à l'historique de conversation
         """
-        if session_id not in self.conversations:
-            self.conversations[session_id] = {
-                'messages': [],
-                'context': {},
-                'created_at': datetime.now().isoformat(),
-                'last_activity': datetime.now().isoformat()
-            }
-        
-        conversation = self.conversations[session_id]
-        
-        # Ajouter le nouveau message
         message_data = {
             'timestamp': datetime.now().isoformat(),
+            'ts': time.time(),
             'user_message': user_message,
             'bot_response': bot_response,
             'category': category
         }
-        
-        conversation['messages'].append(message_data)
-        conversation['last_activity'] = datetime.now().isoformat()
-        
-        # Limiter la taille de l'historique
-        if len(conversation['messages']) > self.max_history_length:
-            conversation['messages'] = conversation['messages'][-self.max_history_length:]
+        self.backend.append(session_id, message_data)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Compteurs de la mémoire conversationnelle (sessions actives, évictions)
+        """
+        return self.backend.get_stats()
     
     def get_conversation_history(self, session_id: str, limit: int = None) -> List[Dict]:
         """
         Récupère l'historique de conversation pour une session
         """
-        if session_id not in self.conversations:
+        conversation = self.backend.load(session_id, limit)
+        if conversation is None:
             return []
         
-        messages = self.conversations[session_id]['messages']
-        
-        if limit:
-            return messages[-limit:]
-        
-        return messages
+        return conversation['messages']
     
     def get_conversation_context(self, session_id: str) -> Dict[str, Any]:
         """
         Récupère le contexte de conversation (sujets abordés, préférences, etc.)
+        
+        Les compteurs de sujets sont tenus à jour par le backend à chaque ajout :
+        aucun parcours de l'historique n'est nécessaire ici.
         """
-        if session_id not in self.conversations:
+        summary = self.backend.summarize(session_id)
+        if summary is None:
             return {}
-        
-        conversation = self.conversations[session_id]
-        messages = conversation['messages']
-        
-        # Analyser les sujets abordés
-        topics = {}
-        for message in messages:
-            category = message.get('category')
-            if category:
-                topics[category] = topics.get(category, 0) + 1
+        topics = summary['topics']
         
         # Identifier le sujet principal
         main_topic = max(topics.keys(), key=topics.get) if topics else None
@@ -78,26 +66,19 @@ class ConversationMemory:
         context = {
             'main_topic': main_topic,
             'topics_discussed': topics,
-            'conversation_length': len(messages),
-            'last_activity': conversation.get('last_activity'),
-            'session_duration': self._calculate_session_duration(session_id)
+            'recent_topics': summary['recent_topics'],
+            'conversation_length': summary['conversation_length'],
+            'last_activity': datetime.fromtimestamp(summary['last_ts']).isoformat(),
+            'session_duration': self._calculate_session_duration(summary)
         }
         
         return context
     
-    def _calculate_session_duration(self, session_id: str) -> str:
+    def _calculate_session_duration(self, summary: Dict) -> str:
         """
-        Calcule la durée de la session
+        Calcule la durée de la session à partir des horodatages numériques
         """
-        if session_id not in self.conversations:
-            return "0 minutes"
-        
-        conversation = self.conversations[session_id]
-        created_at = datetime.fromisoformat(conversation['created_at'])
-        last_activity = datetime.fromisoformat(conversation['last_activity'])
-        
-        duration = last_activity - created_at
-        minutes = int(duration.total_seconds() / 60)
+        minutes = int((summary['last_ts'] - summary['created_ts']) / 60)
         
         return f"{minutes} minutes"
     
@@ -105,8 +86,7 @@ class ConversationMemory:
         """
         Efface l'historique d'une session
         """
-        if session_id in self.conversations:
-            del self.conversations[session_id]
+        self.backend.clear(session_id)
     
     def get_recent_topics(self, session_id: str, limit: int = 3) -> List[str]:
         """
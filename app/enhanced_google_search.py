@@ -2,8 +2,38 @@
 Module de recherche Google améliorée pour BiaSavia
 """
 from .google_search import GoogleSearchService
+from functools import lru_cache
+from urllib.parse import urlsplit
 import re
 
+# Poids de chaque critère du score de pertinence
+RELEVANCE_WEIGHTS = {
+    'keywords': 2,        # par mot-clé environnemental présent
+    'snippet_length': 1,  # extrait de plus de SNIPPET_LENGTH_THRESHOLD caractères
+    'trusted_domain': 3,  # domaine en .org, .edu ou .gov
+    'provider_match': 6,  # rang donné par le fournisseur (match_score, corpus local)
+}
+SNIPPET_LENGTH_THRESHOLD = 100
+TRUSTED_TLDS = {'org', 'edu', 'gov'}
+
+
+@lru_cache(maxsize=4096)
+def is_trusted_domain(link):
+    """
+    Domaine de premier niveau .org, .edu ou .gov, lu sur le nom d'hôte
+    (aussi sous un code pays : gov.uk, edu.au, org.br...)
+    """
+    try:
+        hostname = urlsplit(link).hostname
+    except ValueError:
+        return False
+    if not hostname:
+        return False
+    labels = hostname.rstrip('.').split('.')
+    if labels[-1] in TRUSTED_TLDS:
+        return True
+    return len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in TRUSTED_TLDS
+
 class EnhancedGoogleSearchService(GoogleSearchService):
     """Service de recherche Google amélioré avec filtrage et traitement"""
     
@@ -27,8 +57,7 @@ class EnhancedGoogleSearchService(GoogleSearchService):
         # Filtrage et scoring des résultats
         scored_results = []
         for result in results:
-            score = self._calculate_relevance_score(result)
-            result['relevance_score'] = score
+            result['relevance_score'] = self._calculate_relevance_score(result)
             scored_results.append(result)
         
         # Tri par score de pertinence
@@ -40,23 +69,33 @@ class EnhancedGoogleSearchService(GoogleSearchService):
         """
         Calcule un score de pertinence basé sur les mots-clés environnementaux
         """
-        score = 0
+        return self.relevance_breakdown(result)['total']
+    
+    def relevance_breakdown(self, result):
+        """
+        Détail du score de pertinence d'un résultat, critère par critère
+        """
         text_content = f"{result['title']} {result['snippet']}".lower()
-        
-        # Points pour les mots-clés environnementaux
-        for keyword in self.environmental_keywords:
-            if keyword in text_content:
-                score += 2
-        
-        # Points pour la longueur du snippet (plus d'info = mieux)
-        if len(result['snippet']) > 100:
-            score += 1
-        
-        # Points pour les sources fiables (domaines .org, .edu, .gov)
-        if any(domain in result['link'] for domain in ['.org', '.edu', '.gov']):
-            score += 3
-        
-        return score
+        return self._breakdown(
+            result, [keyword for keyword in self.environmental_keywords if keyword in text_content]
+        )
+    
+    @staticmethod
+    def _breakdown(result, matched_keywords):
+        breakdown = {
+            # Points pour les mots-clés environnementaux
+            'keywords': RELEVANCE_WEIGHTS['keywords'] * len(matched_keywords),
+            # Points pour la longueur du snippet (plus d'info = mieux)
+            'snippet_length': RELEVANCE_WEIGHTS['snippet_length'] if len(result['snippet']) > SNIPPET_LENGTH_THRESHOLD else 0,
+            # Points pour les sources fiables (domaines .org, .edu, .gov, lus sur le nom d'hôte)
+            'trusted_domain': RELEVANCE_WEIGHTS['trusted_domain'] if is_trusted_domain(result['link']) else 0,
+            # Points pour l'adéquation à la requête estimée par le fournisseur (absente des résultats web)
+            'provider_match': round(RELEVANCE_WEIGHTS['provider_match'] * result.get('match_score', 0)),
+        }
+        breakdown['total'] = (breakdown['keywords'] + breakdown['snippet_length']
+                              + breakdown['trusted_domain'] + breakdown['provider_match'])
+        breakdown['matched_keywords'] = matched_keywords
+        return breakdown
     
     def search_with_filters(self, query, site_filter=None, time_filter=None):
         """
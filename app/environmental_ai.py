@@ -1,9 +1,6 @@
 import os
 import numpy as np
-import tensorflow as tf
-import tensorflow_hub as hub
 from PIL import Image
-import cv2
 import logging
 from typing import Tuple, Dict, Any
 from django.conf import settings
@@ -69,6 +66,9 @@ class EnvironmentalImageClassifier:
                 
             logger.info("🚀 Chargement du modèle MobileNetV2...")
             
+            # TensorFlow Hub n'est importé qu'au chargement du modèle
+            import tensorflow_hub as hub
+            
             # Charger le modèle depuis TensorFlow Hub
             self.model = hub.load(self.model_url)
             self.is_loaded = True
@@ -115,6 +115,8 @@ class EnvironmentalImageClassifier:
             # Préprocesser l'image
             processed_image = self.preprocess_image(image_path)
             
+            import tensorflow as tf
+            
             # Prédiction
             predictions = self.model(processed_image)
             probabilities = tf.nn.softmax(predictions[0])
@@ -0,0 +1,72 @@
+"""
+Module de session HTTP partagée pour BiaSavia
+
+Une seule requests.Session par processus (les workers gunicorn forkés en
+recréent une) : les connexions TCP/TLS sont réutilisées d'une requête à
+l'autre vers un même hôte, dans un pool borné, avec nouvelles tentatives
+et délais de connexion / lecture séparés.
+"""
+import os
+import threading
+from typing import Tuple
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Erreurs serveur transitoires pour lesquelles une nouvelle tentative a du sens.
+# 429 n'en fait pas partie : un refus pour débit excessif doit remonter tout de
+# suite au disjoncteur (app/resilience.py) au lieu d'être masqué par des attentes.
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def build_session() -> requests.Session:
+    """
+    Crée une session avec un pool de connexions borné et des tentatives avec backoff
+    L'attente entre tentatives est bornée par HTTP_BACKOFF_MAX : l'en-tête Retry-After
+    est ignoré, pour qu'un serveur ne puisse pas bloquer un thread de recherche
+    au-delà de SEARCH_DEADLINE.
+    """
+    retry = Retry(
+        total=getattr(settings, 'HTTP_RETRIES', 2),
+        backoff_factor=getattr(settings, 'HTTP_BACKOFF_FACTOR', 0.3),
+        backoff_max=getattr(settings, 'HTTP_BACKOFF_MAX', 1.0),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=getattr(settings, 'HTTP_POOL_CONNECTIONS', 10),  # hôtes distincts gardés en pool
+        pool_maxsize=getattr(settings, 'HTTP_POOL_MAXSIZE', 10),  # connexions conservées par hôte
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Retourne la session du processus courant (recréée après un fork)"""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = build_session()
+                _session_pid = pid
+    return _session
+
+
+def http_timeout() -> Tuple[float, float]:
+    """Délais (connexion, lecture) en secondes"""
+    return (
+        getattr(settings, 'HTTP_CONNECT_TIMEOUT', 3.05),
+        getattr(settings, 'HTTP_READ_TIMEOUT', 10),
+    )
@@ -1,7 +1,7 @@
 """
 Module de traitement intelligent pour BiaSavia
 """
-from .nlp_processor import nlp_processor
+from .nlp_processor import MessageAnalysis, nlp_processor
 from .smart_google_search import smart_google_search_service
 from .conversation_memory import conversation_memory
 from typing import Dict, Any, List
@@ -12,13 +12,17 @@ class IntelligentProcessor:
     def __init__(self):
         self.confidence_threshold = 0.6
         
-    def process_question(self, question: str, session_id: str = None) -> Dict[str, Any]:
+    def process_question(self, question: str, session_id: str = None, remember: bool = True,
+                         analysis: MessageAnalysis = None,
+                         search_results: List[Dict] = None) -> Dict[str, Any]:
         """
         Traite une question de manière intelligente
+        remember=False laisse l'enregistrement de l'échange à l'appelant
+        analysis et search_results évitent de refaire l'analyse NLP et la
+        recherche déjà faites par l'appelant
         """
-        # Analyse de la question
-        category = nlp_processor.categorize_question(question)
-        keywords = nlp_processor.extract_keywords(question)
+        # Analyse de la question (une seule fois pour tout le pipeline)
+        analysis = analysis or nlp_processor.analyze_message(question)
         
         # Récupération du contexte de conversation
         conversation_context = {}
@@ -26,17 +30,62 @@ class IntelligentProcessor:
             conversation_context = conversation_memory.get_conversation_context(session_id)
         
         # Recherche intelligente
-        search_results = smart_google_search_service.smart_search(question)
+        if search_results is None:
+            search_results = smart_google_search_service.smart_search(question)
+        
+        result = self._build_result(question, analysis, search_results, conversation_context, session_id)
+        
+        # Sauvegarder dans la mémoire de conversation
+        if session_id and remember:
+            conversation_memory.add_message(session_id, question, result['answer'], analysis.category)
+        
+        return result
+    
+    def process_questions(self, questions: List[str], query_cache: Dict = None) -> List[Dict[str, Any]]:
+        """
+        Traite un lot de questions hors conversation (évaluation, préchauffage du cache)
+        
+        Les questions identiques (à la casse et aux espaces près) ne sont traitées
+        qu'une fois, les requêtes de recherche sont partagées entre les questions
+        du lot et la catégorisation est faite en bloc. Les résultats sont
+        retournés dans l'ordre des questions.
+        """
+        if query_cache is None:
+            query_cache = {}
+        
+        unique_questions = {}
+        for question in questions:
+            unique_questions.setdefault(' '.join(question.lower().split()), question)
+        
+        representatives = list(unique_questions.values())
+        categories = nlp_processor.categorize_questions(representatives)
+        
+        keywords = nlp_processor.extract_keywords_batch(representatives)
+        
+        results = {}
+        for (key, question), category, question_keywords in zip(unique_questions.items(), categories, keywords):
+            search_results = smart_google_search_service.smart_search(question, query_cache=query_cache)
+            analysis = MessageAnalysis(question, category, tuple(question_keywords))
+            results[key] = self._build_result(question, analysis, search_results)
+        
+        return [dict(results[' '.join(question.lower().split())]) for question in questions]
+    
+    def _build_result(self, question: str, analysis: MessageAnalysis, search_results: List[Dict],
+                      conversation_context: Dict = None, session_id: str = None) -> Dict[str, Any]:
+        """
+        Construit la réponse d'une question à partir des résultats de recherche
+        """
+        category = analysis.category
         
         # Génération du contexte de réponse
-        response_context = nlp_processor.generate_response_context(question, search_results)
+        response_context = nlp_processor.generate_response_context(question, search_results, analysis)
         
         # Extraction de la réponse
         answer = smart_google_search_service.extract_answer_from_results(search_results, question)
         
         # Amélioration de la réponse avec le contexte
         enhanced_answer = self._enhance_answer_with_context(
-            answer, category, conversation_context, response_context
+            answer, category, conversation_context or {}, response_context
         )
         
         # Suggestions de questions de suivi
@@ -47,17 +96,13 @@ class IntelligentProcessor:
         result = {
             'answer': enhanced_answer,
             'category': category,
-            'keywords': keywords,
+            'keywords': list(analysis.keywords),
             'confidence': response_context.get('confidence', 0.5),
             'sources': [result['link'] for result in search_results[:3]],
             'follow_up_suggestions': follow_up_suggestions[:3],
             'search_results': search_results[:3]
         }
         
-        # Sauvegarder dans la mémoire de conversation
-        if session_id:
-            conversation_memory.add_message(session_id, question, enhanced_answer, category)
-        
         return result
     
     def _enhance_answer_with_context(self, base_answer: str, category: str, 
@@ -102,8 +147,9 @@ class IntelligentProcessor:
         if not session_id:
             return {}
         
+        # Une seule lecture : le contexte inclut déjà les sujets récents
         context = conversation_memory.get_conversation_context(session_id)
-        recent_topics = conversation_memory.get_recent_topics(session_id)
+        recent_topics = context.get('recent_topics', [])
         
         trends = {
             'user_interests': list(context.get('topics_discussed', {}).keys()),
@@ -0,0 +1,315 @@
+"""
+Module de stockage borné de l'apprentissage du chatbot pour BiaSavia
+
+Par catégorie, la mémoire occupée ne dépend pas du trafic :
+- questions fréquentes : top-k approximatif (algorithme Space-Saving)
+- réponses réussies : échantillon uniforme de taille fixe (reservoir sampling)
+- retours utilisateurs : seuls les plus récents sont conservés
+
+L'état est sauvegardé périodiquement dans un fichier JSON (écriture atomique)
+et rechargé au premier accès, pour survivre aux redémarrages. Ces résumés se
+fusionnent : à chaque sauvegarde, un worker ajoute à l'état du fichier ce qu'il
+a appris depuis sa sauvegarde précédente, sous verrou, sans écraser les
+comptes des autres workers.
+"""
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+
+class SpaceSavingCounter:
+    """
+    Compteur des `capacity` éléments les plus fréquents d'un flux
+
+    Quand la table est pleine, un nouvel élément remplace le moins compté et
+    hérite de son compte (erreur maximale mémorisée). Tout élément réellement
+    plus fréquent que N / capacity est garanti d'être présent.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = {}  # élément -> [compte, erreur]
+
+    def add(self, item: str, increment: int = 1):
+        entry = self.counts.get(item)
+        if entry is not None:
+            entry[0] += increment
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = [increment, 0]
+            return
+        evicted = min(self.counts, key=lambda key: self.counts[key][0])
+        floor = self.counts.pop(evicted)[0]
+        self.counts[item] = [floor + increment, floor]
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        ranked = sorted(self.counts.items(), key=lambda entry: entry[1][0], reverse=True)
+        return [(item, count) for item, (count, _) in ranked[:n]]
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return self.counts
+
+    def load(self, counts: Dict[str, List[int]]):
+        """Ajoute des comptes (sauvegarde ou autre compteur) : les comptes et erreurs s'additionnent"""
+        for item, (count, error) in counts.items():
+            entry = self.counts.setdefault(item, [0, 0])
+            entry[0] += count
+            entry[1] += error
+        # Au-delà de la capacité, seuls les plus fréquents sont gardés
+        if len(self.counts) > self.capacity:
+            self.counts = dict(sorted(self.counts.items(), key=lambda entry: entry[1][0], reverse=True)[:self.capacity])
+
+
+class ReservoirSample:
+    """Échantillon uniforme de taille fixe parmi tous les éléments vus (algorithme R)"""
+
+    def __init__(self, capacity: int, rng: random.Random = None):
+        self.capacity = capacity
+        self.items = []
+        self.seen = 0
+        self.rng = rng or random.Random()
+
+    def add(self, item: Dict[str, Any]):
+        self.seen += 1
+        if len(self.items) < self.capacity:
+            self.items.append(item)
+            return
+        index = self.rng.randrange(self.seen)
+        if index < self.capacity:
+            self.items[index] = item
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'seen': self.seen, 'items': self.items}
+
+    def load(self, data: Dict[str, Any]):
+        """
+        Fusionne un autre échantillon : chaque place est tirée de l'un ou l'autre
+        au prorata des éléments vus, ce qui reste un échantillon uniforme de l'ensemble
+        """
+        ours, theirs = list(self.items), list(data.get('items', []))
+        ours_seen, theirs_seen = self.seen, data.get('seen', 0)
+        self.rng.shuffle(ours)
+        self.rng.shuffle(theirs)
+        self.seen = ours_seen + theirs_seen
+        self.items = []
+        while len(self.items) < self.capacity and (ours or theirs):
+            if theirs and (not ours or self.rng.random() * (ours_seen + theirs_seen) < theirs_seen):
+                self.items.append(theirs.pop())
+                theirs_seen = max(theirs_seen - 1, 0)
+            else:
+                self.items.append(ours.pop())
+                ours_seen = max(ours_seen - 1, 0)
+
+
+class CategoryLearning:
+    """Apprentissage borné d'une catégorie de questions"""
+
+    def __init__(self, top_questions: int, response_sample: int, feedback_size: int):
+        self.frequent_questions = SpaceSavingCounter(top_questions)
+        self.successful_responses = ReservoirSample(response_sample)
+        self.user_feedback = deque(maxlen=feedback_size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'frequent_questions': self.frequent_questions.to_dict(),
+            'successful_responses': self.successful_responses.to_dict(),
+            'user_feedback': list(self.user_feedback),
+        }
+
+    def load(self, data: Dict[str, Any]):
+        self.frequent_questions.load(data.get('frequent_questions', {}))
+        self.successful_responses.load(data.get('successful_responses', {}))
+        self.user_feedback.extend(data.get('user_feedback', []))
+
+
+class LearningStore:
+    """
+    Apprentissage par catégorie, borné en mémoire et persisté périodiquement
+
+    Chaque worker garde, en plus de sa vue, ce qu'il a appris depuis sa
+    dernière sauvegarde (_pending, borné comme la vue). persist relit le
+    fichier sous verrou (fcntl), y fusionne ces ajouts puis l'écrit : les
+    comptes des autres workers sont conservés et la vue locale les reprend.
+    Un fichier temporaire suivi de os.replace garantit qu'un lecteur ne voit
+    jamais de fichier partiellement écrit.
+
+    La sauvegarde est faite par un thread d'arrière-plan toutes les
+    persist_interval secondes (et à l'arrêt), jamais sur le fil d'une requête.
+    Un fichier illisible est mis de côté (.corrupt) avant d'être réécrit.
+    """
+
+    def __init__(self, path: Optional[str] = None, top_questions: int = 100, response_sample: int = 50,
+                 feedback_size: int = 100, persist_interval: float = 300):
+        self.path = path
+        self.top_questions = top_questions
+        self.response_sample = response_sample
+        self.feedback_size = feedback_size
+        self.persist_interval = persist_interval
+        self.categories = {}
+        self._pending = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        self._flusher = None
+
+    @classmethod
+    def from_settings(cls) -> 'LearningStore':
+        return cls(
+            path=getattr(settings, 'LEARNING_STORE_PATH', None),
+            top_questions=getattr(settings, 'LEARNING_STORE_TOP_QUESTIONS', 100),
+            response_sample=getattr(settings, 'LEARNING_STORE_RESPONSE_SAMPLE', 50),
+            feedback_size=getattr(settings, 'LEARNING_STORE_FEEDBACK_SIZE', 100),
+            persist_interval=getattr(settings, 'LEARNING_STORE_PERSIST_INTERVAL', 300),
+        )
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path:
+                return
+            atexit.register(self.persist)
+            try:
+                self.categories = self._read_stored()
+            except OSError as e:
+                print(f"⚠️ Impossible de relire l'apprentissage depuis {self.path} : {e}")
+            if self.persist_interval:
+                self._flusher = threading.Thread(target=self._flush_periodically, name='learning-store-flush', daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.persist_interval)
+            try:
+                self.persist()
+            except Exception as e:
+                print(f"⚠️ Sauvegarde périodique de l'apprentissage impossible : {e}")
+
+    def _new_category(self) -> CategoryLearning:
+        return CategoryLearning(self.top_questions, self.response_sample, self.feedback_size)
+
+    def _category(self, category: str, categories: Dict[str, CategoryLearning] = None) -> CategoryLearning:
+        categories = self.categories if categories is None else categories
+        learning = categories.get(category)
+        if learning is None:
+            learning = categories[category] = self._new_category()
+        return learning
+
+    def _learn(self, category: str, apply):
+        """Applique un ajout à la vue et aux ajouts en attente de sauvegarde"""
+        self._ensure_loaded()
+        with self._lock:
+            apply(self._category(category))
+            apply(self._category(category, self._pending))
+            self._dirty = True
+
+    def _read_stored(self, set_aside: bool = False) -> Dict[str, CategoryLearning]:
+        """
+        État sauvegardé ; un fichier illisible donne un état vide, et avec
+        set_aside (sous verrou, avant réécriture) il est renommé en .corrupt
+        Les erreurs d'accès au fichier (OSError) remontent à l'appelant
+        """
+        categories = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as store_file:
+                data = json.load(store_file)
+            for category, category_data in data.get('categories', {}).items():
+                self._category(category, categories).load(category_data)
+        except FileNotFoundError:
+            return {}
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"⚠️ Fichier d'apprentissage {self.path} illisible : {e}")
+            if set_aside:
+                corrupt_path = f"{self.path}.corrupt.{int(time.time())}"
+                os.replace(self.path, corrupt_path)
+                print(f"⚠️ Fichier illisible mis de côté : {corrupt_path}")
+            return {}
+        return categories
+
+    def record_question(self, category: str, question: str):
+        """Compte une question posée dans la catégorie"""
+        self._learn(category, lambda learning: learning.frequent_questions.add(question.lower()))
+
+    def record_success(self, category: str, response: Dict[str, Any]):
+        """Ajoute une réponse de bonne qualité à l'échantillon de la catégorie"""
+        self._learn(category, lambda learning: learning.successful_responses.add(response))
+
+    def record_feedback(self, category: str, feedback: Dict[str, Any]):
+        """Conserve un retour utilisateur (seuls les plus récents sont gardés)"""
+        self._learn(category, lambda learning: learning.user_feedback.append(feedback))
+
+    def frequent_questions(self, category: str, n: int = 10) -> List[Tuple[str, int]]:
+        self._ensure_loaded()
+        with self._lock:
+            learning = self.categories.get(category)
+            return learning.frequent_questions.top(n) if learning else []
+
+    def successful_responses(self, category: str) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        with self._lock:
+            learning = self.categories.get(category)
+            return list(learning.successful_responses.items) if learning else []
+
+    def to_dict(self, categories: Dict[str, CategoryLearning] = None) -> Dict[str, Any]:
+        with self._lock:
+            categories = self.categories if categories is None else categories
+            return {
+                'version': 1,
+                'categories': {category: learning.to_dict() for category, learning in categories.items()},
+            }
+
+    def persist(self):
+        """Fusionne dans le fichier ce qui a été appris depuis la dernière écriture"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            pending, self._pending = self._pending, {}
+            self._dirty = False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(f"{self.path}.lock", 'w') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                stored = self._read_stored(set_aside=True)
+                for category, learning in pending.items():
+                    self._category(category, stored).load(learning.to_dict())
+                temporary_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temporary_path, 'w', encoding='utf-8') as store_file:
+                    json.dump(self.to_dict(stored), store_file, ensure_ascii=False)
+                os.replace(temporary_path, self.path)
+        except OSError as e:
+            with self._lock:
+                # Ajouts remis en attente pour la prochaine sauvegarde
+                for category, learning in pending.items():
+                    self._category(category, self._pending).load(learning.to_dict())
+                self._dirty = True
+            print(f"⚠️ Impossible de sauvegarder l'apprentissage dans {self.path} : {e}")
+            return
+        with self._lock:
+            # La vue reprend l'état commun, plus ce qui a été appris pendant l'écriture
+            for category, learning in self._pending.items():
+                self._category(category, stored).load(learning.to_dict())
+            self.categories = stored
+
+
+# Instance globale du stockage d'apprentissage
+learning_store = LearningStore.from_settings()
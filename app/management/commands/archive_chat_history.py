@@ -0,0 +1,120 @@
+"""
+Archivage de l'historique du chatbot par période.
+
+Les conversations plus anciennes que la durée de rétention sont déplacées,
+par lots, dans des fichiers JSON Lines compressés (un fichier par mois ou par
+jour), puis supprimées de la base. Chaque lot est ajouté comme un membre gzip
+distinct : les fichiers restent lisibles avec ``gzip.open`` même si plusieurs
+exécutions écrivent dans la même période.
+
+Exemple (cron, heures creuses) :
+    python manage.py archive_chat_history --older-than-days 180 --bucket month
+"""
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils import timezone
+
+from app.models import ChatHistory
+
+ARCHIVED_FIELDS = ('id', 'session_id', 'user_message', 'bot_response', 'timestamp', 'category', 'source')
+
+BUCKET_FORMATS = {
+    'month': ('%Y-%m', TruncMonth),
+    'day': ('%Y-%m-%d', TruncDay),
+}
+
+
+class Command(BaseCommand):
+    help = "Archive les anciennes conversations du chatbot dans des fichiers gzip par période"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int,
+            default=getattr(settings, 'CHAT_HISTORY_RETENTION_DAYS', 180),
+            help="Archiver les conversations plus anciennes que ce nombre de jours",
+        )
+        parser.add_argument(
+            '--bucket', choices=sorted(BUCKET_FORMATS), default='month',
+            help="Granularité des fichiers d'archive",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Nombre de lignes déplacées par transaction",
+        )
+        parser.add_argument(
+            '--output-dir',
+            default=getattr(settings, 'CHAT_HISTORY_ARCHIVE_DIR', 'archives/chat_history'),
+            help="Répertoire des fichiers d'archive",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Afficher le nombre de lignes par période sans rien modifier",
+        )
+
+    def handle(self, *args, **options):
+        if options['older_than_days'] < 1:
+            raise CommandError("--older-than-days doit être supérieur ou égal à 1")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être supérieur ou égal à 1")
+
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        bucket_format, trunc = BUCKET_FORMATS[options['bucket']]
+        old_rows = ChatHistory.objects.filter(timestamp__lt=cutoff)
+
+        if options['dry_run']:
+            buckets = (
+                old_rows.annotate(bucket=trunc('timestamp'))
+                .values('bucket')
+                .annotate(count=Count('id'))
+                .order_by('bucket')
+            )
+            for row in buckets:
+                self.stdout.write(f"{row['bucket'].strftime(bucket_format)} : {row['count']} conversations")
+            return
+
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+
+        archived = 0
+        while True:
+            batch = list(
+                old_rows.order_by('timestamp', 'id').values(*ARCHIVED_FIELDS)[:options['batch_size']]
+            )
+            if not batch:
+                break
+
+            by_bucket = defaultdict(list)
+            for row in batch:
+                by_bucket[row['timestamp'].strftime(bucket_format)].append(row)
+
+            # Écrire l'archive avant de supprimer : en cas d'interruption, un lot
+            # peut être archivé deux fois mais jamais perdu.
+            for bucket, rows in by_bucket.items():
+                self._append_to_archive(output_dir, bucket, rows)
+
+            with transaction.atomic():
+                ChatHistory.objects.filter(id__in=[row['id'] for row in batch]).delete()
+
+            archived += len(batch)
+            self.stdout.write(f"{archived} conversations archivées...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {archived} conversations antérieures au {cutoff:%Y-%m-%d} archivées dans {output_dir}"
+        ))
+
+    def _append_to_archive(self, output_dir, bucket, rows):
+        """Ajoute un lot de conversations au fichier compressé de la période"""
+        path = os.path.join(output_dir, f"chat_history_{bucket}.jsonl.gz")
+        with gzip.open(path, 'at', encoding='utf-8') as archive:
+            for row in rows:
+                record = dict(row, timestamp=row['timestamp'].isoformat())
+                archive.write(json.dumps(record, ensure_ascii=False) + "\n")
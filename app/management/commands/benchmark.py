@@ -0,0 +1,665 @@
+"""
+Micro-benchmarks des chemins critiques du backend.
+
+Usage :
+    python manage.py benchmark history --size 1000000
+    python manage.py benchmark conversation_memory --size 100000
+    python manage.py benchmark simplify --size 20000
+    python manage.py benchmark nlp_categorizer --size 10000
+    python manage.py benchmark nlp_engines --size 1000
+    python manage.py benchmark http_session --iterations 500
+    python manage.py benchmark html_parser --iterations 200
+    python manage.py benchmark relevance --size 1000
+    python manage.py benchmark search_providers --iterations 200
+    python manage.py benchmark single_flight --size 50
+    python manage.py benchmark answer_extraction --size 8
+
+Chaque suite affiche des latences (médiane / p95) mesurées localement ; les
+suites qui écrivent en base travaillent dans une transaction annulée à la fin.
+"""
+import gc
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def measure(func, iterations):
+    """Exécute func plusieurs fois et retourne (médiane, p95) en millisecondes"""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+    return statistics.median(durations), p95
+
+
+def bench_history(command, size, iterations):
+    """Lectures de l'historique du chatbot sur une table de `size` lignes"""
+    from app.models import ChatHistory
+    from app.views import get_chat_history
+
+    categories = ['pollution', 'climat', 'energie', 'biodiversite', 'dechets', 'eau', 'greeting', None]
+    session_count = max(size // 20, 1)
+    batch_size = 10000
+    now = timezone.now()
+
+    with transaction.atomic():
+        command.stdout.write(f"Insertion de {size} conversations ({session_count} sessions)...")
+        for offset in range(0, size, batch_size):
+            rows = [
+                ChatHistory(
+                    session_id=f"bench-{(offset + i) % session_count}",
+                    user_message="Comment réduire la pollution ?",
+                    bot_response="Réponse de test",
+                    category=categories[(offset + i) % len(categories)],
+                )
+                for i in range(min(batch_size, size - offset))
+            ]
+            created = ChatHistory.objects.bulk_create(rows)
+            # timestamp est en auto_now_add : on étale les lots sur un an après coup
+            ChatHistory.objects.filter(id__in=[row.id for row in created]).update(
+                timestamp=now - timedelta(days=365 * offset / size)
+            )
+
+        sessions = [f"bench-{random.randrange(session_count)}" for _ in range(iterations)]
+        session_iter = iter(sessions)
+
+        queries = {
+            "historique d'une session": lambda: get_chat_history(next(session_iter), limit=50),
+            "historique global (50 derniers)": lambda: get_chat_history(limit=50),
+            "comptage par catégorie sur 30 jours": lambda: ChatHistory.objects.filter(
+                category='pollution', timestamp__gte=now - timedelta(days=30)
+            ).count(),
+            "statistiques journalières sur 30 jours": lambda: list(
+                ChatHistory.objects.filter(timestamp__gte=now - timedelta(days=30))
+                .annotate(day=TruncDate('timestamp')).values('day')
+                .annotate(count=Count('id')).order_by()
+            ),
+        }
+        for label, query in queries.items():
+            median, p95 = measure(query, iterations)
+            command.stdout.write(f"  {label:<40} médiane {median:8.2f} ms   p95 {p95:8.2f} ms")
+
+        plan = ChatHistory.objects.filter(session_id=sessions[0]).order_by('-timestamp')[:50].explain()
+        command.stdout.write(f"Plan de la requête de session :\n{plan}")
+
+        transaction.set_rollback(True)
+
+
+def bench_conversation_memory(command, size, iterations):
+    """Empreinte mémoire de `size` sessions actives pleines, ancien format contre MessageRecord"""
+    from app.conversation_backends import InProcessConversationBackend
+
+    history_length = 10
+    categories = ['pollution', 'climat', 'energie', 'biodiversite', 'dechets', 'eau', 'greeting', None]
+    # Les textes sont partagés entre les deux formats : seule la structure est mesurée
+    user_messages = [f"Question {i} sur l'environnement ?" for i in range(history_length)]
+    bot_responses = [f"Réponse {i} du chatbot BiaSavia." for i in range(history_length)]
+
+    def fill_legacy():
+        conversations = {}
+        for session in range(size):
+            messages = []
+            for turn in range(history_length):
+                timestamp = datetime.now().isoformat()
+                messages.append({
+                    'timestamp': timestamp,
+                    'user_message': user_messages[turn],
+                    'bot_response': bot_responses[turn],
+                    'category': categories[(session + turn) % len(categories)],
+                })
+            conversations[f"bench-{session}"] = {
+                'messages': messages,
+                'created_at': messages[0]['timestamp'],
+                'last_activity': messages[-1]['timestamp'],
+            }
+        return conversations
+
+    def fill_records():
+        backend = InProcessConversationBackend(
+            history_length, idle_ttl=3600, max_sessions=size, max_memory_bytes=float('inf')
+        )
+        for session in range(size):
+            for turn in range(history_length):
+                backend.append(f"bench-{session}", {
+                    'ts': time.time(),
+                    'user_message': user_messages[turn],
+                    'bot_response': bot_responses[turn],
+                    'category': categories[(session + turn) % len(categories)],
+                })
+        return backend
+
+    results = {}
+    for label, fill in (("dictionnaires + chaînes ISO", fill_legacy), ("MessageRecord + deque", fill_records)):
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        store = fill()
+        elapsed = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = (store, current)
+        command.stdout.write(
+            f"  {label:<30} {current / 1024 / 1024:8.1f} Mio   {current / size:7.0f} o/session   "
+            f"pic {peak / 1024 / 1024:8.1f} Mio   remplissage {elapsed:6.2f} s"
+        )
+
+    legacy_bytes = results["dictionnaires + chaînes ISO"][1]
+    record_bytes = results["MessageRecord + deque"][1]
+    command.stdout.write(f"Réduction : {100 * (1 - record_bytes / legacy_bytes):.1f} %")
+
+    backend = results["MessageRecord + deque"][0]
+    sessions = [f"bench-{random.randrange(size)}" for _ in range(iterations)]
+    session_iter = iter(sessions)
+    message = {'ts': time.time(), 'user_message': user_messages[0], 'bot_response': bot_responses[0],
+               'category': 'climat'}
+    operations = {
+        "ajout dans une session pleine": lambda: backend.append(next(session_iter), message),
+        "résumé d'une session": lambda: backend.summarize(sessions[0]),
+        "lecture de l'historique": lambda: backend.load(sessions[0]),
+    }
+    for label, operation in operations.items():
+        median, p95 = measure(operation, iterations)
+        command.stdout.write(f"  {label:<40} médiane {median * 1000:8.2f} µs   p95 {p95 * 1000:8.2f} µs")
+
+
+def bench_simplify(command, size, iterations):
+    """Simplification et personnalisation d'une réponse longue de `size` caractères"""
+    from app.advanced_intelligence import TECHNICAL_TERMS, advanced_intelligence
+
+    def legacy_simplify(response):
+        simplified = response
+        for term, explanation in TECHNICAL_TERMS.items():
+            if term in simplified.lower():
+                simplified = simplified.replace(term, f"{term} ({explanation})")
+        return simplified
+
+    sentences = [
+        "La biodiversité des zones humides recule chaque année.",
+        "Chaque écosystème forestier stocke du carbone dans le sol.",
+        "La photosynthèse capte le CO2 de l'atmosphère.",
+        "Les émissions carbonées du transport restent élevées.",
+        "Réduire les déchets protège les rivières et les océans.",
+    ]
+    answer = ''
+    while len(answer) < size:
+        answer += random.choice(sentences) + ' '
+    answer = answer[:size]
+
+    command.stdout.write(f"Réponse de {len(answer)} caractères")
+    cases = {
+        "simplification (remplacements successifs)": lambda: legacy_simplify(answer),
+        "simplification (regex compilée)": lambda: advanced_intelligence._simplify_response(answer),
+        "personnalisation complète (débutant)": lambda: advanced_intelligence._personalize_response(
+            {'answer': answer, 'confidence': 0.9, 'category': 'climat'}, {'expertise_level': 'beginner'},
+            "Qu'est-ce que la biodiversité ?"
+        ),
+    }
+    for label, case in cases.items():
+        median, p95 = measure(case, iterations)
+        command.stdout.write(f"  {label:<45} médiane {median:8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def bench_nlp_categorizer(command, size, iterations):
+    """Exactitude et parité du catégoriseur sur le jeu annoté, puis débit sur `size` questions"""
+    from app.nlp_processor import CATEGORIZATION_CASES_PATH, nlp_processor
+
+    def legacy_categorize(question):
+        question_lower = question.lower()
+        scores = {
+            category: sum(1 for keyword in keywords if keyword in question_lower)
+            for category, keywords in nlp_processor.environmental_keywords.items()
+        }
+        if max(scores.values()) > 0:
+            return max(scores, key=scores.get)
+        return 'general'
+
+    with open(CATEGORIZATION_CASES_PATH, encoding='utf-8') as cases_file:
+        data = json.load(cases_file)
+    cases = data['cases']
+    # Seuils de régression (vérifiés aussi par app/tests.py) : toute baisse fait échouer la suite
+    baseline = data['baseline_accuracy']
+    held_out = data['held_out_cases']
+    held_out_current = [nlp_processor.categorize_question(case['question']) for case in held_out]
+    held_out_accuracy = 100 * sum(
+        p == case['category'] for p, case in zip(held_out_current, held_out)
+    ) / len(held_out)
+    held_out_legacy = 100 * sum(
+        legacy_categorize(case['question']) == case['category'] for case in held_out
+    ) / len(held_out)
+
+    legacy = [legacy_categorize(case['question']) for case in cases]
+    current = [nlp_processor.categorize_question(case['question']) for case in cases]
+    bulk = nlp_processor.categorize_questions([case['question'] for case in cases])
+    expected = [case['category'] for case in cases]
+
+    def accuracy(predictions):
+        return 100 * sum(p == e for p, e in zip(predictions, expected)) / len(cases)
+
+    command.stdout.write(f"Jeu annoté : {len(cases)} questions")
+    command.stdout.write(f"  exactitude sous-chaînes (ancien)   {accuracy(legacy):5.1f} %")
+    command.stdout.write(f"  exactitude jetons pondérés         {accuracy(current):5.1f} %   (référence {baseline:.1f} %)")
+    command.stdout.write(
+        f"  accord ancien / nouveau            {100 * sum(a == b for a, b in zip(legacy, current)) / len(cases):5.1f} %"
+    )
+    command.stdout.write(f"  parité lot / unitaire              {'oui' if bulk == current else 'NON'}")
+    command.stdout.write(f"Jeu réservé (hors réglage) : {len(held_out)} questions")
+    command.stdout.write(f"  exactitude sous-chaînes (ancien)   {held_out_legacy:5.1f} %")
+    command.stdout.write(f"  exactitude jetons pondérés         {held_out_accuracy:5.1f} %   "
+                         f"(référence {data['held_out_baseline_accuracy']:.1f} %)")
+    for case, old, new in zip(cases, legacy, current):
+        if old != new:
+            command.stdout.write(f"    {old:>12} -> {new:<12} {case['question']}")
+
+    errors = []
+    if bulk != current:
+        errors.append(f"{sum(a != b for a, b in zip(bulk, current))} écart(s) de parité lot / unitaire")
+    if accuracy(current) < baseline:
+        errors.append(f"exactitude {accuracy(current):.1f} % inférieure à la référence {baseline:.1f} %")
+        for case, prediction in zip(cases, current):
+            if prediction != case['category']:
+                command.stdout.write(f"    attendu {case['category']:>12}, obtenu {prediction:<12} {case['question']}")
+    if held_out_accuracy < data['held_out_baseline_accuracy']:
+        errors.append(f"exactitude {held_out_accuracy:.1f} % sur le jeu réservé, inférieure à la référence "
+                      f"{data['held_out_baseline_accuracy']:.1f} %")
+    if errors:
+        raise CommandError("Catégoriseur : " + " ; ".join(errors))
+
+    questions = [random.choice(cases)['question'] for _ in range(size)]
+    timings = {
+        "sous-chaînes (ancien)": lambda: [legacy_categorize(question) for question in questions],
+        "jetons pondérés, unitaire": lambda: [nlp_processor.categorize_question(question) for question in questions],
+        "jetons pondérés, par lot": lambda: nlp_processor.categorize_questions(questions),
+    }
+    command.stdout.write(f"Débit sur {size} questions :")
+    for label, case in timings.items():
+        median, p95 = measure(case, max(1, iterations // 20))
+        command.stdout.write(f"  {label:<30} médiane {median:8.2f} ms   ({size / median * 1000:,.0f} questions/s)")
+
+
+def bench_nlp_engines(command, size, iterations):
+    """Latence des moteurs NLP (regex, spaCy) par message et par lot de `size` messages"""
+    from app.nlp_engines import RegexNLPEngine, SpacyNLPEngine
+    from app.nlp_processor import CATEGORIZATION_CASES_PATH
+    from django.conf import settings
+
+    with open(CATEGORIZATION_CASES_PATH, encoding='utf-8') as cases_file:
+        questions = [case['question'] for case in json.load(cases_file)['cases']]
+    batch = [random.choice(questions) for _ in range(size)]
+    sample = questions[0]
+
+    engines = [RegexNLPEngine()]
+    spacy_engine = SpacyNLPEngine(getattr(settings, 'SPACY_MODEL', 'fr_core_news_sm'),
+                                  getattr(settings, 'SPACY_BATCH_SIZE', 64))
+    try:
+        started = time.perf_counter()
+        spacy_engine.load_pipeline(spacy_engine.model_name)
+        command.stdout.write(f"Chargement de {spacy_engine.model_name} : {(time.perf_counter() - started) * 1000:.0f} ms "
+                             f"(composants : {', '.join(spacy_engine.nlp.pipe_names)})")
+        engines.append(spacy_engine)
+    except (ImportError, OSError) as e:
+        command.stdout.write(f"spaCy indisponible ({e}) : seul le moteur regex est mesuré")
+
+    for engine in engines:
+        command.stdout.write(f"Moteur {engine.name} : {sample!r}")
+        command.stdout.write(f"  mots-clés {engine.extract_keywords(sample)}  entités {engine.extract_entities(sample)}")
+        cases = {
+            "mots-clés, un message": lambda: engine.extract_keywords(random.choice(questions)),
+            "entités, un message": lambda: engine.extract_entities(random.choice(questions)),
+        }
+        for label, case in cases.items():
+            median, p95 = measure(case, iterations)
+            command.stdout.write(f"  {label:<35} médiane {median:8.3f} ms   p95 {p95:8.3f} ms")
+        lots = {
+            f"mots-clés, lot de {size}": lambda: engine.extract_keywords_batch(batch),
+            f"entités, lot de {size}": lambda: engine.extract_entities_batch(batch),
+        }
+        for label, case in lots.items():
+            median, _ = measure(case, max(1, iterations // 20))
+            command.stdout.write(f"  {label:<35} médiane {median:8.1f} ms   ({median * 1000 / size:.1f} µs/message)")
+
+
+class StubSearchHandler(BaseHTTPRequestHandler):
+    """
+    Serveur HTTP/1.1 local : page de résultats factice, /flaky échoue une fois sur
+    deux, /throttled refuse toujours (429 avec un long Retry-After)
+    """
+    protocol_version = 'HTTP/1.1'
+    # En-têtes et corps sont écrits séparément : sans TCP_NODELAY, le keep-alive
+    # subirait le délai d'acquittement différé (~40 ms) et fausserait la mesure
+    disable_nagle_algorithm = True
+    body = ("<html><body>" + "<div class='g'><h3>Titre</h3><a href='https://example.org'>lien</a></div>" * 5
+            + "</body></html>").encode('utf-8')
+    flaky_calls = 0
+    throttled_calls = 0
+    connections = set()
+
+    def do_GET(self):
+        StubSearchHandler.connections.add(self.client_address)
+        if self.path.startswith('/flaky'):
+            StubSearchHandler.flaky_calls += 1
+            if StubSearchHandler.flaky_calls % 2:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        if self.path.startswith('/throttled'):
+            StubSearchHandler.throttled_calls += 1
+            self.send_response(429)
+            self.send_header('Retry-After', '120')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_http_session(command, size, iterations):
+    """
+    Latence par requête vers un serveur local : connexion neuve contre session partagée
+    Échoue si les réponses diffèrent, si la session ne réutilise pas sa connexion ou
+    si la politique de tentatives n'est pas respectée (503 rejoué, 429 rendu aussitôt)
+    """
+    import requests
+    from app.http_client import build_session, http_timeout
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubSearchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    params = {'q': 'pollution de l\'air environnement', 'num': 8}
+
+    try:
+        session = build_session()
+        errors = []
+        fresh = requests.get(url, params=params, timeout=http_timeout())
+        shared = session.get(url, params=params, timeout=http_timeout())
+        if (fresh.status_code, fresh.content) != (shared.status_code, shared.content):
+            errors.append(f"réponses différentes : {fresh.status_code} sans session, {shared.status_code} avec")
+        cases = {
+            "requests.get (connexion neuve)": lambda: requests.get(url, params=params, timeout=http_timeout()),
+            "session partagée (keep-alive)": lambda: session.get(url, params=params, timeout=http_timeout()),
+        }
+        results = {}
+        for label, case in cases.items():
+            StubSearchHandler.connections = set()
+            results[label] = measure(case, iterations)
+            median, p95 = results[label]
+            command.stdout.write(f"  {label:<35} médiane {median:7.3f} ms   p95 {p95:7.3f} ms   "
+                                 f"connexions ouvertes {len(StubSearchHandler.connections)}")
+        if len(StubSearchHandler.connections) > 1:
+            errors.append(f"la session a ouvert {len(StubSearchHandler.connections)} connexions au lieu d'une")
+        saved = results["requests.get (connexion neuve)"][0] - results["session partagée (keep-alive)"][0]
+        command.stdout.write(f"Gain médian par requête : {saved:.3f} ms (sans TLS ; davantage vers un hôte HTTPS distant)")
+
+        flaky = session.get(url.replace('/search', '/flaky'), timeout=http_timeout())
+        command.stdout.write(f"Réponse 503 transitoire rejouée par la session : statut final {flaky.status_code}")
+        if flaky.status_code != 200:
+            errors.append(f"503 transitoire non rejoué (statut final {flaky.status_code})")
+
+        StubSearchHandler.throttled_calls = 0
+        started = time.perf_counter()
+        throttled = session.get(url.replace('/search', '/throttled'), timeout=http_timeout())
+        elapsed = time.perf_counter() - started
+        command.stdout.write(f"Refus 429 (Retry-After 120 s) : statut {throttled.status_code} en {elapsed * 1000:.1f} ms, "
+                             f"{StubSearchHandler.throttled_calls} requête(s)")
+        if throttled.status_code != 429 or StubSearchHandler.throttled_calls != 1:
+            errors.append(f"429 rejoué {StubSearchHandler.throttled_calls - 1} fois au lieu d'être rendu aussitôt")
+    finally:
+        server.shutdown()
+        server.server_close()
+    if errors:
+        raise CommandError("Session HTTP : " + " ; ".join(errors))
+    command.stdout.write(command.style.SUCCESS("✅ Réponses identiques, connexion réutilisée, tentatives conformes"))
+
+
+def bench_html_parser(command, size, iterations):
+    """Parité des analyseurs de résultats sur les pages enregistrées, puis temps d'analyse"""
+    from app.search_parsers import PARSERS, SEARCH_FIXTURES_DIR, available_parsers
+
+    parsers = available_parsers()
+    reference = 'bs4' if 'bs4' in parsers else 'stream'
+    missing = sorted(set(PARSERS) - set(parsers))
+    command.stdout.write(f"Analyseurs : {', '.join(parsers)} (référence {reference})"
+                         + (f" ; indisponibles : {', '.join(missing)}" if missing else ""))
+
+    fixtures = sorted(name for name in os.listdir(SEARCH_FIXTURES_DIR) if name.endswith('.html'))
+    mismatches = 0
+    for fixture in fixtures:
+        with open(os.path.join(SEARCH_FIXTURES_DIR, fixture), encoding='utf-8') as fixture_file:
+            html = fixture_file.read()
+        expected = PARSERS[reference](html, size)
+        command.stdout.write(f"{fixture} ({len(html) / 1024:.1f} Kio, {len(expected)} résultats)")
+        for name in parsers:
+            results = PARSERS[name](html, size)
+            if results != expected:
+                mismatches += 1
+                command.stdout.write(f"  ❌ {name} diffère de {reference}")
+                for got, wanted in zip(results, expected):
+                    if got != wanted:
+                        command.stdout.write(f"     {got!r}\n     attendu {wanted!r}")
+            median, p95 = measure(lambda: PARSERS[name](html, size), iterations)
+            command.stdout.write(f"  {name:<8} médiane {median:8.3f} ms   p95 {p95:8.3f} ms")
+    if mismatches:
+        raise CommandError(f"{mismatches} écart(s) de parité entre analyseurs")
+    command.stdout.write(command.style.SUCCESS("✅ Résultats identiques pour tous les analyseurs"))
+
+
+def bench_relevance(command, size, iterations):
+    """Parité et débit du score de pertinence sur `size` résultats issus des pages enregistrées"""
+    from app.enhanced_google_search import enhanced_google_search_service
+    from app.search_parsers import SEARCH_FIXTURES_DIR, parse_stream
+
+    keywords = enhanced_google_search_service.environmental_keywords
+
+    def legacy_score(result):
+        score = 0
+        text_content = f"{result['title']} {result['snippet']}".lower()
+        for keyword in keywords:
+            if keyword in text_content:
+                score += 2
+        if len(result['snippet']) > 100:
+            score += 1
+        if any(domain in result['link'] for domain in ['.org', '.edu', '.gov']):
+            score += 3
+        return score
+
+    pool = []
+    for fixture in sorted(os.listdir(SEARCH_FIXTURES_DIR)):
+        if fixture.endswith('.html'):
+            with open(os.path.join(SEARCH_FIXTURES_DIR, fixture), encoding='utf-8') as fixture_file:
+                pool.extend(parse_stream(fixture_file.read(), 20))
+    # Liens où le test de sous-chaîne se trompait sur le domaine
+    pool.extend([
+        {'title': 'Déforestation', 'snippet': 'Rapport', 'link': 'https://example.com/rapport.org.html'},
+        {'title': 'Climat', 'snippet': 'Portail', 'link': 'https://www.gov.uk/climate'},
+        {'title': 'Carbone', 'snippet': 'Dossier', 'link': 'https://www.organic.fr/carbone'},
+    ])
+    results = [dict(random.choice(pool)) for _ in range(size)]
+
+    scores = [enhanced_google_search_service._calculate_relevance_score(result) for result in pool]
+    legacy = [legacy_score(result) for result in pool]
+    command.stdout.write(f"{len(pool)} résultats distincts : {sum(a == b for a, b in zip(legacy, scores))} scores identiques")
+    for result, old, new in zip(pool, legacy, scores):
+        if old != new:
+            breakdown = enhanced_google_search_service.relevance_breakdown(result)
+            command.stdout.write(f"  {old:>3} -> {new:<3} {result['link']}  {breakdown}")
+
+    cases = {
+        "sous-chaînes (ancien)": lambda: [legacy_score(result) for result in results],
+        "détaillé, unitaire": lambda: [enhanced_google_search_service._calculate_relevance_score(result) for result in results],
+    }
+    command.stdout.write(f"Débit sur {size} résultats :")
+    for label, case in cases.items():
+        median, p95 = measure(case, max(1, iterations // 20))
+        command.stdout.write(f"  {label:<25} médiane {median:8.2f} ms   ({size / median * 1000:,.0f} résultats/s)")
+
+
+def bench_search_providers(command, size, iterations):
+    """Latence du fournisseur local (FTS5) sur le corpus d'exemple, seul puis dans smart_search"""
+    from app.management.commands.import_search_corpus import read_documents
+    from app.search_providers import LocalCorpusProvider
+    from app.smart_google_search import SmartGoogleSearchService
+
+    sample_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data',
+                               'search_corpus_sample.jsonl')
+    documents = list(read_documents(sample_path))
+    questions = [
+        "Quelles sont les causes de la pollution de l'air ?",
+        "Comment recycler le plastique ?",
+        "Pourquoi protéger la biodiversité ?",
+        "Qu'est-ce que l'effet de serre ?",
+        "Comment réduire mon empreinte carbone ?",
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        provider = LocalCorpusProvider(os.path.join(directory, 'corpus.sqlite3'))
+        # Corpus d'exemple répété `size` fois pour observer l'effet du volume
+        provider.import_documents(documents * size)
+        command.stdout.write(f"Corpus : {provider.count()} documents")
+
+        service = SmartGoogleSearchService()
+        service._provider = provider
+        for question in questions:
+            top = service.smart_search(question)
+            command.stdout.write(f"  {question:<50} -> {top[0]['title'] if top else '(aucun résultat)'}")
+
+        cases = {
+            "fournisseur local, une requête": lambda: provider.search(random.choice(questions), 8),
+            "smart_search complet (4 requêtes)": lambda: service.smart_search(random.choice(questions)),
+        }
+        for label, case in cases.items():
+            median, p95 = measure(case, iterations)
+            command.stdout.write(f"  {label:<40} médiane {median:8.3f} ms   p95 {p95:8.3f} ms")
+        service.executor.shutdown()
+
+
+def bench_single_flight(command, size, iterations):
+    """`size` requêtes simultanées pour la même question : recherches lancées et latence"""
+    from concurrent.futures import ThreadPoolExecutor
+    from app.smart_google_search import SmartGoogleSearchService
+
+    latency = 0.05
+    searches = []
+
+    def stub_enhanced_search(query, context="environnement"):
+        searches.append(query)
+        time.sleep(latency)
+        return [{'title': query, 'link': f"https://example.org/{len(searches)}", 'snippet': '', 'relevance_score': 1}]
+
+    service = SmartGoogleSearchService()
+    service.enhanced_search = stub_enhanced_search
+    question = "Comment réduire la pollution de l'air ?"
+    queries_per_search = len(service._generate_optimized_queries(question, service._analyze_question_type(question)))
+
+    cases = {
+        "sans regroupement": lambda: service._smart_search(question),
+        "single-flight": lambda: service.smart_search(question),
+    }
+    with ThreadPoolExecutor(max_workers=size) as clients:
+        for label, case in cases.items():
+            searches.clear()
+            barrier = threading.Barrier(size)
+
+            def client():
+                barrier.wait()
+                started = time.perf_counter()
+                case()
+                return (time.perf_counter() - started) * 1000
+
+            durations = sorted(clients.map(lambda _: client(), range(size)))
+            command.stdout.write(
+                f"  {label:<20} {len(searches) // queries_per_search:>4} recherches pour {size} requêtes   "
+                f"médiane {statistics.median(durations):7.1f} ms   max {durations[-1]:7.1f} ms"
+            )
+    command.stdout.write(f"Regroupements : {service.search_flight.get_stats()}")
+    service.executor.shutdown()
+
+
+def bench_answer_extraction(command, size, iterations):
+    """Résumé extractif des `size` meilleurs extraits du corpus d'exemple, face à la concaténation"""
+    from app.answer_extraction import extractive_summarizer
+    from app.management.commands.import_search_corpus import read_documents
+    from app.search_providers import LocalCorpusProvider
+
+    sample_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data',
+                               'search_corpus_sample.jsonl')
+    questions = [
+        "Quelles sont les causes de la pollution de l'air ?",
+        "Comment recycler le plastique ?",
+        "Pourquoi protéger la biodiversité ?",
+        "Qu'est-ce que l'effet de serre ?",
+        "Comment réduire mon empreinte carbone ?",
+    ]
+
+    def concatenate(results):
+        # Ancienne extraction : les deux premiers extraits substantiels, tronqués à 500 caractères
+        combined = " ".join([result['snippet'] for result in results[:3] if len(result['snippet']) > 50][:2])
+        return combined[:500] + "..." if len(combined) > 500 else combined
+
+    with tempfile.TemporaryDirectory() as directory:
+        provider = LocalCorpusProvider(os.path.join(directory, 'corpus.sqlite3'))
+        provider.import_documents(read_documents(sample_path))
+        cases_results = [(question, provider.search(question, size)) for question in questions]
+
+    for question, results in cases_results:
+        command.stdout.write(f"{question}\n  -> {extractive_summarizer.summarize(results, question) or '(aucune phrase)'}")
+
+    cases = {
+        "concaténation des extraits": lambda: concatenate(random.choice(cases_results)[1]),
+        "résumé extractif (TF-IDF + MMR)": lambda: extractive_summarizer.summarize(*random.choice(cases_results)[::-1]),
+    }
+    for label, case in cases.items():
+        median, p95 = measure(case, iterations)
+        command.stdout.write(f"  {label:<35} médiane {median:8.3f} ms   p95 {p95:8.3f} ms")
+
+
+BENCHMARKS = {
+    'history': (bench_history, 1000000),
+    'conversation_memory': (bench_conversation_memory, 100000),
+    'simplify': (bench_simplify, 20000),
+    'nlp_categorizer': (bench_nlp_categorizer, 10000),
+    'nlp_engines': (bench_nlp_engines, 1000),
+    'http_session': (bench_http_session, 1),
+    'html_parser': (bench_html_parser, 10),
+    'relevance': (bench_relevance, 1000),
+    'search_providers': (bench_search_providers, 1),
+    'single_flight': (bench_single_flight, 50),
+    'answer_extraction': (bench_answer_extraction, 8),
+}
+
+
+class Command(BaseCommand):
+    help = "Lance un micro-benchmark des chemins critiques du backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=sorted(BENCHMARKS), help="Suite de benchmark à exécuter")
+        parser.add_argument('--size', type=int, help="Taille du jeu de données (dépend de la suite)")
+        parser.add_argument('--iterations', type=int, default=200, help="Nombre de mesures par cas")
+
+    def handle(self, *args, **options):
+        bench, default_size = BENCHMARKS[options['suite']]
+        size = options['size'] or default_size
+        if size < 1 or options['iterations'] < 1:
+            raise CommandError("--size et --iterations doivent être positifs")
+        bench(self, size, options['iterations'])
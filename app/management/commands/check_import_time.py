@@ -0,0 +1,107 @@
+"""
+Vérifie le temps d'import au démarrage de Django.
+
+Lance ``python -X importtime manage.py check`` dans un sous-processus, additionne
+le temps cumulé des imports de premier niveau et échoue (code de sortie 1) si :
+- le total dépasse le budget (IMPORT_TIME_BUDGET_MS) ;
+- un module lourd censé être chargé au premier usage a été importé.
+
+Exemple (intégration continue) :
+    python manage.py check_import_time --budget-ms 800
+"""
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules chargés uniquement au premier usage (IA, NLP, recherche)
+DEFERRED_MODULES = (
+    'tensorflow',
+    'tensorflow_hub',
+    'cv2',
+    'spacy',
+    'bs4',
+    'PIL',
+    'app.simple_environmental_ai',
+    'app.environmental_ai',
+    'app.advanced_intelligence',
+    'app.intelligent_processor',
+    'app.smart_google_search',
+    'app.nlp_processor',
+)
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps d'import de manage.py et vérifie le budget de démarrage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-ms', type=float, default=getattr(settings, 'IMPORT_TIME_BUDGET_MS', 800),
+            help="Temps d'import cumulé maximal en millisecondes",
+        )
+        parser.add_argument('--target', default='check', help="Commande de gestion dont on mesure le démarrage")
+        parser.add_argument('--runs', type=int, default=3, help="Nombre de mesures (la plus rapide est retenue)")
+        parser.add_argument('--top', type=int, default=15, help="Nombre d'imports les plus lents à afficher")
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError("--runs doit être supérieur ou égal à 1")
+
+        best = None
+        for _ in range(options['runs']):
+            measure = self._measure(options['target'])
+            if best is None or measure['total_us'] < best['total_us']:
+                best = measure
+
+        total_ms = best['total_us'] / 1000
+        self.stdout.write(f"Temps d'import de 'manage.py {options['target']}' : {total_ms:.0f} ms "
+                          f"(budget {options['budget_ms']:.0f} ms, {len(best['modules'])} modules)")
+        self.stdout.write("Imports de premier niveau les plus lents :")
+        for name, cumulative in best['top_level'][:options['top']]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+        deferred = sorted(
+            name for name in best['modules']
+            if any(name == module or name.startswith(module + '.') for module in DEFERRED_MODULES)
+        )
+        errors = []
+        if deferred:
+            errors.append("modules à chargement différé importés au démarrage : " + ", ".join(deferred))
+        if total_ms > options['budget_ms']:
+            errors.append(f"budget dépassé ({total_ms:.0f} ms > {options['budget_ms']:.0f} ms)")
+        if errors:
+            raise CommandError(" ; ".join(errors))
+        self.stdout.write(self.style.SUCCESS("✅ Temps d'import dans le budget"))
+
+    def _measure(self, target):
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', manage_py, target],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, env=os.environ.copy(),
+        )
+        if completed.returncode != 0:
+            raise CommandError(f"'manage.py {target}' a échoué :\n{completed.stderr[-2000:]}")
+
+        modules = set()
+        top_level = []
+        for line in completed.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if not match:
+                continue
+            _, cumulative, indent, name = match.groups()
+            modules.add(name)
+            # Un seul espace d'indentation : import de premier niveau
+            if len(indent) == 1:
+                top_level.append((name, int(cumulative)))
+
+        top_level.sort(key=lambda entry: entry[1], reverse=True)
+        return {
+            'total_us': sum(cumulative for _, cumulative in top_level),
+            'top_level': top_level,
+            'modules': modules,
+        }
@@ -0,0 +1,66 @@
+"""
+Importe un corpus de documents environnementaux pour la recherche hors ligne.
+
+Le corpus alimente le fournisseur de recherche local (SQLite FTS5), utilisé
+avec SEARCH_PROVIDER=local ou en premier dans une chaîne comme "local,web".
+Formats acceptés : JSON Lines (un document par ligne) ou JSON (liste de
+documents, ou objet avec une clé "documents"). Chaque document a un titre
+(title), un lien (link ou url) et un contenu (content, text ou snippet).
+
+Exemple :
+    python manage.py import_search_corpus app/data/search_corpus_sample.jsonl --replace
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.search_providers import LocalCorpusProvider
+
+
+def read_documents(path):
+    """Documents du fichier, normalisés en {title, link, content}"""
+    with open(path, encoding='utf-8') as corpus_file:
+        if path.endswith('.jsonl'):
+            raw_documents = [json.loads(line) for line in corpus_file if line.strip()]
+        else:
+            data = json.load(corpus_file)
+            raw_documents = data.get('documents', []) if isinstance(data, dict) else data
+
+    for number, document in enumerate(raw_documents, start=1):
+        title = document.get('title')
+        link = document.get('link') or document.get('url') or ''
+        content = document.get('content') or document.get('text') or document.get('snippet')
+        if not title or not content:
+            raise CommandError(f"Document {number} sans titre ou sans contenu")
+        yield {'title': title, 'link': link, 'content': content}
+
+
+class Command(BaseCommand):
+    help = "Importe un corpus de documents pour le fournisseur de recherche local (FTS5)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Fichiers .json ou .jsonl à importer")
+        parser.add_argument('--replace', action='store_true', help="Vider le corpus avant l'import")
+        parser.add_argument(
+            '--corpus-path', default=getattr(settings, 'SEARCH_CORPUS_PATH', None),
+            help="Base SQLite du corpus (par défaut SEARCH_CORPUS_PATH)",
+        )
+
+    def handle(self, *args, **options):
+        if not options['corpus_path']:
+            raise CommandError("Aucune base de corpus : définir SEARCH_CORPUS_PATH ou --corpus-path")
+        provider = LocalCorpusProvider(options['corpus_path'])
+
+        imported = 0
+        for index, path in enumerate(options['paths']):
+            try:
+                documents = list(read_documents(path))
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Lecture de {path} impossible : {e}")
+            imported += provider.import_documents(documents, replace=options['replace'] and index == 0)
+            self.stdout.write(f"{path} : {len(documents)} documents")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {imported} documents importés, {provider.count()} au total dans {options['corpus_path']}"
+        ))
@@ -0,0 +1,50 @@
+"""
+Supprime les sessions expirées de la mémoire conversationnelle en base.
+
+Avec CONVERSATION_MEMORY_BACKEND=database, une session n'est supprimée que si
+elle est relue après expiration ; les sessions anonymes (une par requête sans
+session_id) ne le sont jamais. Cette commande supprime, par lots, les sessions
+inactives depuis plus de CONVERSATION_MEMORY_IDLE_TTL secondes et leurs
+messages. Elle peut tourner même si un autre backend est configuré, pour vider
+les tables après un changement de backend.
+
+Exemple (cron, toutes les heures) :
+    python manage.py purge_conversations
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.conversation_backends import DatabaseConversationBackend
+
+
+class Command(BaseCommand):
+    help = "Supprime les sessions expirées de la mémoire conversationnelle stockée en base"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--idle-ttl', type=int,
+            default=getattr(settings, 'CONVERSATION_MEMORY_IDLE_TTL', 3600),
+            help="Supprimer les sessions inactives depuis ce nombre de secondes",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Nombre de sessions supprimées par transaction",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Afficher le nombre de sessions expirées sans rien supprimer",
+        )
+
+    def handle(self, *args, **options):
+        if options['idle_ttl'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--idle-ttl et --batch-size doivent être positifs")
+
+        backend = DatabaseConversationBackend(idle_ttl=options['idle_ttl'])
+        if options['dry_run']:
+            self.stdout.write(f"{backend.expired_sessions().count()} sessions expirées")
+            return
+
+        purged = backend.purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {purged} sessions inactives depuis plus de {options['idle_ttl']} s supprimées"
+        ))
@@ -0,0 +1,90 @@
+"""
+Rejoue une tranche de l'historique du chatbot à travers le traitement par lots.
+
+Sert à évaluer le chatbot hors ligne et à mesurer le débit de
+IntelligentProcessor.process_questions (questions dédupliquées, recherches
+partagées dans un lot, catégorisation en bloc). Rien n'est écrit en base.
+
+Exemple :
+    python manage.py replay_chat_history --limit 2000 --batch-size 200 --compare
+"""
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from app.models import ChatHistory
+
+
+class Command(BaseCommand):
+    help = "Rejoue des questions de l'historique du chatbot par lots et mesure le débit"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500, help="Nombre de questions à rejouer (les plus récentes)")
+        parser.add_argument('--since-days', type=int, help="Ne rejouer que les questions des N derniers jours")
+        parser.add_argument('--category', help="Ne rejouer que les questions de cette catégorie")
+        parser.add_argument('--batch-size', type=int, default=100, help="Nombre de questions par lot")
+        parser.add_argument(
+            '--compare', action='store_true',
+            help="Rejouer aussi les questions une par une avec process_question pour comparer",
+        )
+
+    def handle(self, *args, **options):
+        from app.intelligent_processor import intelligent_processor
+        from app.smart_google_search import smart_google_search_service
+
+        if options['limit'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--limit et --batch-size doivent être positifs")
+
+        history = ChatHistory.objects.exclude(category='greeting')
+        if options['since_days']:
+            history = history.filter(timestamp__gte=timezone.now() - timedelta(days=options['since_days']))
+        if options['category']:
+            history = history.filter(category=options['category'])
+        questions = list(
+            history.order_by('-timestamp').values_list('user_message', flat=True)[:options['limit']]
+        )
+        if not questions:
+            self.stdout.write("Aucune question à rejouer.")
+            return
+
+        # Nombre de recherches qu'aurait lancées un traitement question par question
+        naive_searches = sum(
+            len(smart_google_search_service._generate_optimized_queries(
+                question, smart_google_search_service._analyze_question_type(question)
+            ))
+            for question in questions
+        )
+
+        batch_size = options['batch_size']
+        categories = Counter()
+        searches = 0
+        started = time.perf_counter()
+        for offset in range(0, len(questions), batch_size):
+            batch = questions[offset:offset + batch_size]
+            query_cache = {}
+            results = intelligent_processor.process_questions(batch, query_cache=query_cache)
+            searches += len(query_cache)
+            categories.update(result['category'] for result in results)
+            self.stdout.write(f"{offset + len(batch)}/{len(questions)} questions traitées...")
+        elapsed = time.perf_counter() - started
+
+        unique = len({' '.join(question.lower().split()) for question in questions})
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(questions)} questions ({unique} distinctes) en {elapsed:.2f} s : "
+            f"{len(questions) / elapsed:.1f} questions/s"
+        ))
+        self.stdout.write(f"Recherches lancées : {searches} (au lieu de {naive_searches} question par question)")
+        self.stdout.write("Catégories : " + ", ".join(f"{name} {count}" for name, count in categories.most_common()))
+
+        if options['compare']:
+            started = time.perf_counter()
+            for question in questions:
+                intelligent_processor.process_question(question)
+            sequential = time.perf_counter() - started
+            self.stdout.write(
+                f"Question par question : {sequential:.2f} s ({len(questions) / sequential:.1f} questions/s), "
+                f"accélération x{sequential / elapsed:.1f}"
+            )
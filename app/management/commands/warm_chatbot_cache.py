@@ -0,0 +1,106 @@
+"""
+Préchauffe le cache des réponses du chatbot avec les questions les plus fréquentes.
+
+Les questions de l'historique récent sont regroupées une fois normalisées
+(casse, ponctuation, espaces) ; les plus fréquentes sont traitées comme une
+question sans session (réponse non personnalisée) et leur réponse est rangée
+dans le cache de réponses. Les recherches lancées au passage remplissent aussi
+le cache des résultats de recherche. Les réponses de repli génériques ne sont
+pas mises en cache.
+
+Limite : une réponse préchauffée n'a pas de contexte de conversation. Elle ne
+sert que le premier message d'une session ; les messages suivants passent par
+le traitement habituel. L'index publié en fin d'exécution remplace le
+précédent : seules les questions de la dernière exécution sont servies.
+
+Exemple (cron, heures creuses) :
+    python manage.py warm_chatbot_cache --days 7 --limit 100
+"""
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from app.models import ChatHistory
+from app.response_cache import normalize_question, publish_warmed, response_cache, store_answer
+
+
+def top_questions(since, limit, min_count=1):
+    """[(question, occurrences)] les plus fréquentes depuis `since`, une formulation par question normalisée"""
+    counts = Counter()
+    wordings = {}
+    history = (
+        ChatHistory.objects.filter(timestamp__gte=since)
+        .exclude(category='greeting')
+        .order_by('-timestamp')
+        .values_list('user_message', flat=True)
+    )
+    for message in history.iterator(chunk_size=2000):
+        key = normalize_question(message)
+        if key:
+            counts[key] += 1
+            # Formulation la plus récente, rejouée telle quelle
+            wordings.setdefault(key, message)
+    return [(wordings[key], count) for key, count in counts.most_common(limit) if count >= min_count]
+
+
+class Command(BaseCommand):
+    help = (
+        "Précalcule les réponses aux questions les plus fréquentes dans le cache de réponses du chatbot. "
+        "Réponses sans contexte : elles ne servent que le premier message d'une session."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'CHATBOT_WARMUP_DAYS', 7),
+            help="Fenêtre d'historique analysée, en jours",
+        )
+        parser.add_argument(
+            '--limit', type=int, default=getattr(settings, 'CHATBOT_WARMUP_LIMIT', 100),
+            help="Nombre maximal de questions préchauffées",
+        )
+        parser.add_argument('--min-count', type=int, default=2, help="Occurrences minimales d'une question")
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Afficher les questions retenues sans calculer les réponses",
+        )
+
+    def handle(self, *args, **options):
+        from app.views import generate_chatbot_answer
+
+        if options['days'] < 1 or options['limit'] < 1 or options['min_count'] < 1:
+            raise CommandError("--days, --limit et --min-count doivent être positifs")
+
+        since = timezone.now() - timedelta(days=options['days'])
+        questions = top_questions(since, options['limit'], options['min_count'])
+        if not questions:
+            self.stdout.write("Aucune question à préchauffer.")
+            return
+
+        if options['dry_run']:
+            for question, count in questions:
+                self.stdout.write(f"{count:>6}  {question}")
+            return
+
+        keys, skipped = [], 0
+        started = time.perf_counter()
+        for index, (question, count) in enumerate(questions, start=1):
+            # Questions déjà comptées quand elles ont été posées : pas d'apprentissage
+            result = generate_chatbot_answer(question, use_cache=False, learn=False)
+            if result['source'] == 'fallback':
+                skipped += 1
+            else:
+                keys.append(store_answer(question, result))
+            self.stdout.write(
+                f"{index}/{len(questions)} [{result['source']}, {result['total_ms']} ms, {count}x] {question}"
+            )
+
+        publish_warmed(keys)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(keys)} réponses préchauffées en {time.perf_counter() - started:.1f} s "
+            f"({skipped} réponses de repli ignorées)"
+        ))
+        self.stdout.write(f"Cache de réponses : {response_cache.get_stats()}")
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_remove_usersession_user_delete_userinteraction_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chathistory',
+            index=models.Index(fields=['session_id', '-timestamp'], name='chat_session_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chathistory',
+            index=models.Index(fields=['category', 'timestamp'], name='chat_category_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chathistory',
+            index=models.Index(fields=['-timestamp'], name='chat_timestamp_idx'),
+        ),
+    ]
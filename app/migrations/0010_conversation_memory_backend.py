@@ -0,0 +1,41 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_chathistory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(max_length=100, unique=True)),
+                ('turn_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_activity', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ConversationTurn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('seq', models.PositiveIntegerField()),
+                ('user_message', models.TextField()),
+                ('bot_response', models.TextField()),
+                ('category', models.CharField(blank=True, max_length=50, null=True)),
+                ('timestamp', models.DateTimeField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turns', to='app.conversationsession')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['session', '-seq'], name='conversation_turn_seq_idx')],
+                'constraints': [models.UniqueConstraint(fields=('session', 'slot'), name='conversation_turn_slot_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-19 14:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_conversation_memory_backend'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chathistory',
+            name='source',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+    ]
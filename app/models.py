@@ -43,14 +43,57 @@ class ChatHistory(models.Model):
     user_message = models.TextField()
     bot_response = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
+    # Thème analysé de la question (pollution, climat...) ; greeting pour les salutations
     category = models.CharField(max_length=50, blank=True, null=True)
+    # Source de la réponse retenue (advanced_intelligence, google_search, fallback, cache)
+    source = models.CharField(max_length=50, blank=True, null=True)
     
     class Meta:
         ordering = ['-timestamp']
         verbose_name_plural = "Chat Histories"
+        indexes = [
+            # Historique d'une session (get_chat_history, clear_chat_history)
+            models.Index(fields=['session_id', '-timestamp'], name='chat_session_ts_idx'),
+            # Statistiques par catégorie et filtres de l'admin
+            models.Index(fields=['category', 'timestamp'], name='chat_category_ts_idx'),
+            # Historique global, statistiques journalières et archivage par période
+            models.Index(fields=['-timestamp'], name='chat_timestamp_idx'),
+        ]
     
     def __str__(self):
         return f"Chat {self.session_id} - {self.timestamp}"
+
+class ConversationSession(models.Model):
+    """Session de la mémoire conversationnelle partagée (backend database)"""
+    session_id = models.CharField(max_length=100, unique=True)
+    turn_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_activity = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Session {self.session_id} ({self.turn_count} messages)"
+
+class ConversationTurn(models.Model):
+    """Message d'une session, stocké dans un tampon circulaire de taille fixe"""
+    session = models.ForeignKey(ConversationSession, on_delete=models.CASCADE, related_name='turns')
+    slot = models.PositiveSmallIntegerField()
+    seq = models.PositiveIntegerField()
+    user_message = models.TextField()
+    bot_response = models.TextField()
+    category = models.CharField(max_length=50, blank=True, null=True)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'slot'], name='conversation_turn_slot_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['session', '-seq'], name='conversation_turn_seq_idx'),
+        ]
+
+    def __str__(self):
+        return f"Message {self.seq} de {self.session.session_id}"
+
 from django.db import models
 from django.conf import settings
 
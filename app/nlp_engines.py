@@ -0,0 +1,148 @@
+"""
+Moteurs NLP interchangeables pour BiaSavia (mots-clés et entités nommées)
+
+- regex : expressions régulières et liste de mots vides (toujours disponible)
+- spacy : pipeline français spaCy chargé une fois par processus ; les messages
+          sont traités par lots avec nlp.pipe. Sans spaCy ou sans modèle
+          installé, le moteur regex est utilisé à la place.
+
+Le moteur est choisi par le réglage NLP_ENGINE.
+"""
+import re
+import threading
+from typing import Dict, List
+
+from django.conf import settings
+
+STOP_WORDS = {
+    'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'ou', 'mais',
+    'donc', 'car', 'ce', 'cette', 'ces', 'son', 'sa', 'ses', 'mon', 'ma',
+    'mes', 'ton', 'ta', 'tes', 'notre', 'nos', 'votre', 'vos', 'leur',
+    'leurs', 'que', 'qui', 'quoi', 'dont', 'où', 'comment', 'pourquoi',
+    'quand', 'est', 'sont', 'était', 'étaient', 'sera', 'seront'
+}
+
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+LOCATION_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+ORGANIZATION_PATTERN = re.compile(r'\b[A-Z][A-Z]+\b')
+
+
+def empty_entities() -> Dict[str, List[str]]:
+    return {
+        'locations': [],
+        'organizations': [],
+        'pollutants': [],
+        'species': []
+    }
+
+
+class RegexNLPEngine:
+    """Moteur par expressions régulières, sans dépendance"""
+    name = 'regex'
+
+    def __init__(self, stop_words=STOP_WORDS):
+        self.stop_words = stop_words
+
+    def extract_keywords(self, text: str) -> List[str]:
+        words = NON_WORD_PATTERN.sub(' ', text.lower()).split()
+        return [word for word in words if word not in self.stop_words and len(word) > 2]
+
+    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+        entities = empty_entities()
+        entities['locations'] = LOCATION_PATTERN.findall(text)
+        entities['organizations'] = ORGANIZATION_PATTERN.findall(text)
+        return entities
+
+    def extract_keywords_batch(self, texts: List[str]) -> List[List[str]]:
+        return [self.extract_keywords(text) for text in texts]
+
+    def extract_entities_batch(self, texts: List[str]) -> List[Dict[str, List[str]]]:
+        return [self.extract_entities(text) for text in texts]
+
+
+class SpacyNLPEngine:
+    """
+    Moteur spaCy : le pipeline est chargé une seule fois par processus, sans
+    les composants inutiles (analyse syntaxique, lemmatisation, morphologie)
+    """
+    name = 'spacy'
+
+    # Seuls tok2vec et ner servent aux mots-clés et aux entités
+    EXCLUDED_COMPONENTS = ('parser', 'lemmatizer', 'morphologizer', 'attribute_ruler', 'senter')
+
+    LOCATION_LABELS = {'LOC', 'GPE'}
+    ORGANIZATION_LABELS = {'ORG'}
+
+    _pipelines = {}
+    _load_lock = threading.Lock()
+
+    def __init__(self, model_name: str = 'fr_core_news_sm', batch_size: int = 64):
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+    @classmethod
+    def load_pipeline(cls, model_name: str):
+        """Charge le pipeline au premier appel puis le réutilise (ImportError / OSError si indisponible)"""
+        nlp = cls._pipelines.get(model_name)
+        if nlp is not None:
+            return nlp
+        with cls._load_lock:
+            nlp = cls._pipelines.get(model_name)
+            if nlp is None:
+                import spacy
+                nlp = cls._pipelines[model_name] = spacy.load(model_name, exclude=list(cls.EXCLUDED_COMPONENTS))
+        return nlp
+
+    @property
+    def nlp(self):
+        return self.load_pipeline(self.model_name)
+
+    @staticmethod
+    def _keywords(doc) -> List[str]:
+        return [
+            token.lower_ for token in doc
+            if not token.is_stop and not token.is_punct and not token.is_space and len(token) > 2
+        ]
+
+    def _entities(self, doc) -> Dict[str, List[str]]:
+        entities = empty_entities()
+        for ent in doc.ents:
+            if ent.label_ in self.LOCATION_LABELS:
+                entities['locations'].append(ent.text)
+            elif ent.label_ in self.ORGANIZATION_LABELS:
+                entities['organizations'].append(ent.text)
+        return entities
+
+    def extract_keywords(self, text: str) -> List[str]:
+        # Le tokenizer suffit pour les mots-clés : les composants ne sont pas exécutés
+        return self._keywords(self.nlp.make_doc(text))
+
+    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+        return self._entities(self.nlp(text))
+
+    def extract_keywords_batch(self, texts: List[str]) -> List[List[str]]:
+        tokenizer = self.nlp.tokenizer
+        return [self._keywords(doc) for doc in tokenizer.pipe(texts, batch_size=self.batch_size)]
+
+    def extract_entities_batch(self, texts: List[str]) -> List[Dict[str, List[str]]]:
+        return [self._entities(doc) for doc in self.nlp.pipe(texts, batch_size=self.batch_size)]
+
+
+def get_nlp_engine(name: str = None):
+    """Instancie le moteur configuré par NLP_ENGINE, avec repli sur le moteur regex"""
+    name = name or getattr(settings, 'NLP_ENGINE', 'regex')
+    if name == 'regex':
+        return RegexNLPEngine()
+    if name != 'spacy':
+        raise ValueError(f"Moteur NLP inconnu : {name}")
+
+    engine = SpacyNLPEngine(
+        model_name=getattr(settings, 'SPACY_MODEL', 'fr_core_news_sm'),
+        batch_size=getattr(settings, 'SPACY_BATCH_SIZE', 64),
+    )
+    try:
+        engine.load_pipeline(engine.model_name)
+    except (ImportError, OSError) as e:
+        print(f"⚠️ Moteur spaCy indisponible ({e}), utilisation du moteur regex")
+        return RegexNLPEngine()
+    return engine
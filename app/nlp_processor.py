@@ -1,8 +1,50 @@
 """
 Module de traitement NLP pour BiaSavia
 """
+import os
 import re
-from typing import List, Dict, Any
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
+import numpy as np
+from django.conf import settings
+from .nlp_engines import STOP_WORDS, get_nlp_engine
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Lettres accentuées courantes en français, repliées sans passer par unicodedata
+ACCENT_TABLE = str.maketrans({
+    **{accented: plain for accented, plain in zip('àâäáãåçéèêëíìîïñóòôöõúùûüýÿ', 'aaaaaaceeeeiiiinooooouuuuyy')},
+    'œ': 'oe', 'æ': 'ae',
+})
+
+# Nombre maximal de jetons normalisés gardés en mémoire
+TOKEN_CACHE_SIZE = 50000
+
+# Questions annotées servant à vérifier l'exactitude du catégoriseur (benchmark nlp_categorizer)
+CATEGORIZATION_CASES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'nlp_categorization_cases.json')
+
+
+class MessageAnalysis:
+    """
+    Analyse d'un message, calculée une fois puis transmise à tout le pipeline
+    Immuable : elle est partagée entre requêtes par le cache LRU
+    """
+    
+    __slots__ = ('text', 'category', 'keywords')
+    
+    def __init__(self, text: str, category: str, keywords: Tuple[str, ...]):
+        object.__setattr__(self, 'text', text)
+        object.__setattr__(self, 'category', category)
+        object.__setattr__(self, 'keywords', keywords)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("MessageAnalysis est immuable")
+    
+    def __repr__(self):
+        return f"MessageAnalysis(category={self.category!r}, keywords={self.keywords!r})"
+
 
 class NLPProcessor:
     """Processeur de langage naturel pour les questions environnementales"""
@@ -19,78 +61,187 @@ class NLPProcessor:
             'dechets': ['déchets', 'recyclage', 'plastique', 'ordures']
         }
         
-        self.stop_words = {
-            'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'ou', 'mais',
-            'donc', 'car', 'ce', 'cette', 'ces', 'son', 'sa', 'ses', 'mon', 'ma',
-            'mes', 'ton', 'ta', 'tes', 'notre', 'nos', 'votre', 'vos', 'leur',
-            'leurs', 'que', 'qui', 'quoi', 'dont', 'où', 'comment', 'pourquoi',
-            'quand', 'est', 'sont', 'était', 'étaient', 'sera', 'seront'
+        # Mots de contexte (lieux, milieux) : ils indiquent un sujet moins
+        # sûrement que les autres mots-clés (poids 1 par défaut)
+        self.keyword_weights_overrides = {
+            'air': 0.5,
+            'mer': 0.5,
+            'océan': 0.5,
+            'bois': 0.5
         }
+        
+        self.stop_words = STOP_WORDS
+        
+        # Moteur de mots-clés et d'entités (NLP_ENGINE), chargé au premier usage
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        
+        self._build_keyword_tables()
+        
+        # Cache LRU des analyses, indexé par le texte normalisé
+        self.analysis_cache = OrderedDict()
+        self.analysis_cache_size = getattr(settings, 'NLP_ANALYSIS_CACHE_SIZE', 1024)
+        self._analysis_lock = threading.Lock()
+    
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = get_nlp_engine()
+        return self._engine
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Texte normalisé (casse, espaces) servant de clé aux analyses"""
+        return ' '.join(text.lower().split())
+    
+    def analyze_message(self, text: str) -> MessageAnalysis:
+        """
+        Analyse un message (catégorie, mots-clés) une seule fois
+        Les messages répétés sont servis par le cache LRU
+        """
+        key = self.normalize(text)
+        with self._analysis_lock:
+            analysis = self.analysis_cache.get(key)
+            if analysis is not None:
+                self.analysis_cache.move_to_end(key)
+                return analysis
+        
+        analysis = MessageAnalysis(text, self.categorize_question(text), tuple(self.extract_keywords(text)))
+        with self._analysis_lock:
+            self.analysis_cache[key] = analysis
+            if len(self.analysis_cache) > self.analysis_cache_size:
+                self.analysis_cache.popitem(last=False)
+        return analysis
     
     def extract_keywords(self, text: str) -> List[str]:
         """
         Extrait les mots-clés pertinents d'un texte
         """
-        # Nettoyage du texte
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', ' ', text)
-        words = text.split()
-        
-        # Filtrage des mots vides
-        keywords = [word for word in words if word not in self.stop_words and len(word) > 2]
+        return self.engine.extract_keywords(text)
+    
+    def extract_keywords_batch(self, texts: List[str]) -> List[List[str]]:
+        """
+        Extrait les mots-clés d'un lot de textes (nlp.pipe avec le moteur spaCy)
+        """
+        return self.engine.extract_keywords_batch(texts)
+    
+    def _build_keyword_tables(self):
+        """
+        Construit la table jeton (sans accents) -> mots-clés -> catégorie
+        Un mot-clé de plusieurs mots est reconnu sur une suite de jetons consécutifs
+        """
+        self.token_cache = {}
+        self.categories = list(self.environmental_keywords)
+        self.keyword_categories = []  # identifiant du mot-clé -> indice de catégorie
+        self.keyword_weights = []     # identifiant du mot-clé -> poids
+        self.token_table = {}         # premier jeton -> [(jetons suivants, identifiant du mot-clé)]
+        for category_index, category in enumerate(self.categories):
+            for keyword in self.environmental_keywords[category]:
+                keyword_id = len(self.keyword_categories)
+                self.keyword_categories.append(category_index)
+                self.keyword_weights.append(self.keyword_weights_overrides.get(keyword, 1.0))
+                tokens = self.tokenize(keyword)
+                self.token_table.setdefault(tokens[0], []).append((tuple(tokens[1:]), keyword_id))
+        self.keyword_membership = np.zeros((len(self.keyword_categories), len(self.categories)), dtype=np.float64)
+        for keyword_id, category_index in enumerate(self.keyword_categories):
+            self.keyword_membership[keyword_id, category_index] = self.keyword_weights[keyword_id]
+    
+    @staticmethod
+    def fold(text: str) -> str:
+        """Minuscules sans accents (é -> e, ô -> o...)"""
+        folded = text.lower().translate(ACCENT_TABLE)
+        if folded.isascii():
+            return folded
+        # Autres caractères accentués : décomposition Unicode complète
+        decomposed = unicodedata.normalize('NFKD', folded)
+        return ''.join(char for char in decomposed if not unicodedata.combining(char))
+    
+    def _normalize_token(self, token: str) -> str:
+        """Jeton sans accents, pluriel en -s / -x ramené au singulier"""
+        normalized = self.fold(token)
+        if len(normalized) > 3 and normalized[-1] in 'sx':
+            normalized = normalized[:-1]
+        if len(self.token_cache) >= TOKEN_CACHE_SIZE:
+            self.token_cache.clear()
+        self.token_cache[token] = normalized
+        return normalized
+    
+    def tokenize(self, text: str) -> List[str]:
+        """Découpe un texte en jetons normalisés (le vocabulaire étant réduit, ils sont mis en cache)"""
+        cache = self.token_cache
+        return [cache.get(token) or self._normalize_token(token) for token in TOKEN_PATTERN.findall(text.lower())]
+    
+    def _matched_keywords(self, question: str) -> set:
+        """Identifiants des mots-clés présents dans la question, en un seul passage"""
+        tokens = self.tokenize(question)
+        matched = set()
+        for position, token in enumerate(tokens):
+            for following, keyword_id in self.token_table.get(token, ()):
+                if not following or tuple(tokens[position + 1:position + 1 + len(following)]) == following:
+                    matched.add(keyword_id)
+        return matched
+    
+    def score_question(self, question: str) -> Dict[str, Any]:
+        """
+        Scores de la question pour chaque catégorie
+        Retourne {'category', 'scores', 'confidence'} ; la confiance est la part
+        du score total qui revient à la catégorie retenue
+        """
+        scores = dict.fromkeys(self.categories, 0.0)
+        for keyword_id in self._matched_keywords(question):
+            scores[self.categories[self.keyword_categories[keyword_id]]] += self.keyword_weights[keyword_id]
         
-        return keywords
+        total = sum(scores.values())
+        if total <= 0:
+            return {'category': 'general', 'scores': scores, 'confidence': 0.0}
+        # En cas d'égalité, la première catégorie déclarée l'emporte
+        category = max(scores, key=scores.get)
+        return {'category': category, 'scores': scores, 'confidence': scores[category] / total}
     
     def categorize_question(self, question: str) -> str:
         """
         Catégorise une question selon le domaine environnemental
         """
-        question_lower = question.lower()
+        return self.score_question(question)['category']
+    
+    def categorize_questions(self, questions: List[str]) -> List[str]:
+        """
+        Catégorise un lot de questions (même résultat que categorize_question)
         
-        scores = {}
-        for category, keywords in self.environmental_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in question_lower:
-                    score += 1
-            scores[category] = score
+        Les mots-clés reconnus de chaque question remplissent une matrice de
+        présence ; les scores de tout le lot sont obtenus par un seul produit
+        matriciel (présence des mots-clés x poids par catégorie).
+        """
+        if not questions:
+            return []
         
-        # Retourne la catégorie avec le meilleur score
-        if scores and max(scores.values()) > 0:
-            return max(scores, key=scores.get)
+        presence = np.zeros((len(questions), len(self.keyword_categories)), dtype=np.float64)
+        for row, question in enumerate(questions):
+            matched = self._matched_keywords(question)
+            if matched:
+                presence[row, list(matched)] = 1.0
         
-        return 'general'
+        scores = presence @ self.keyword_membership
+        best = scores.argmax(axis=1)
+        has_match = scores.max(axis=1) > 0
+        return [self.categories[index] if matched else 'general' for index, matched in zip(best, has_match)]
     
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
         Extrait les entités nommées du texte
         """
-        entities = {
-            'locations': [],
-            'organizations': [],
-            'pollutants': [],
-            'species': []
-        }
-        
-        # Patterns simples pour l'extraction d'entités
-        location_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        org_pattern = r'\b[A-Z][A-Z]+\b'
-        
-        # Extraction basique (à améliorer avec spaCy si disponible)
-        locations = re.findall(location_pattern, text)
-        organizations = re.findall(org_pattern, text)
-        
-        entities['locations'] = locations
-        entities['organizations'] = organizations
-        
-        return entities
+        return self.engine.extract_entities(text)
     
-    def generate_response_context(self, question: str, search_results: List[Dict]) -> Dict[str, Any]:
+    def generate_response_context(self, question: str, search_results: List[Dict],
+                                  analysis: MessageAnalysis = None) -> Dict[str, Any]:
         """
         Génère un contexte pour la réponse basé sur la question et les résultats
         """
-        category = self.categorize_question(question)
-        keywords = self.extract_keywords(question)
+        analysis = analysis or self.analyze_message(question)
+        category = analysis.category
+        keywords = list(analysis.keywords)
         
         # Analyse des résultats de recherche
         relevant_snippets = []
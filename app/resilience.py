@@ -0,0 +1,181 @@
+"""
+Module de protection des appels sortants pour BiaSavia
+
+Par domaine distant :
+- un seau à jetons limite le débit des requêtes (SEARCH_RATE_LIMIT par
+  seconde, rafales jusqu'à SEARCH_RATE_BURST) ;
+- un disjoncteur s'ouvre après SEARCH_BREAKER_FAILURES échecs consécutifs :
+  pendant SEARCH_BREAKER_RESET_TIMEOUT secondes les appels échouent
+  immédiatement (CircuitOpenError), puis une seule requête d'essai est
+  autorisée (demi-ouvert) pour décider de la refermeture.
+
+Les deux refus lèvent une OutboundUnavailableError, sans attendre le réseau,
+pour que l'appelant se replie sur le cache ou sur le corpus local.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from django.conf import settings
+
+
+class OutboundUnavailableError(Exception):
+    """Appel sortant refusé localement (débit dépassé ou disjoncteur ouvert)"""
+
+
+class RateLimitedError(OutboundUnavailableError):
+    pass
+
+
+class CircuitOpenError(OutboundUnavailableError):
+    pass
+
+
+class TokenBucket:
+    """Seau à jetons : `rate` jetons par seconde, au plus `capacity` en réserve"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Prend des jetons s'il y en a assez, sans jamais attendre"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            self.rejected += 1
+            return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            tokens = min(self.capacity, self.tokens + (time.monotonic() - self.updated) * self.rate)
+            return {'rate': self.rate, 'capacity': self.capacity, 'tokens': round(tokens, 2), 'rejected': self.rejected}
+
+
+class CircuitBreaker:
+    """Disjoncteur fermé / ouvert / demi-ouvert sur les échecs consécutifs"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.stats = {'successes': 0, 'failures': 0, 'short_circuited': 0, 'opened': 0}
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Autorise ou refuse un appel ; en demi-ouvert, un seul appel d'essai à la fois"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.stats['short_circuited'] += 1
+            return False
+
+    def cancel(self):
+        """L'appel autorisé n'a finalement pas eu lieu : l'essai en demi-ouvert reste disponible"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.stats['successes'] += 1
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                print(f"🔌 Disjoncteur {self.name} refermé")
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Exception = None):
+        with self._lock:
+            self.stats['failures'] += 1
+            self.consecutive_failures += 1
+            self.last_error = repr(error) if error is not None else None
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.stats['opened'] += 1
+                    print(f"🔌 Disjoncteur {self.name} ouvert pour {self.reset_timeout:.0f} s : {self.last_error}")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in': retry_in,
+                'last_error': self.last_error,
+                **self.stats,
+            }
+
+
+class OutboundGuard:
+    """Limiteur de débit et disjoncteur d'un domaine distant"""
+
+    def __init__(self, domain: str, rate: float, burst: float, failure_threshold: int, reset_timeout: float):
+        self.domain = domain
+        self.rate_limiter = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(domain, failure_threshold, reset_timeout)
+
+    def acquire(self):
+        """Lève une OutboundUnavailableError si l'appel ne doit pas partir"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Disjoncteur ouvert pour {self.domain}")
+        if not self.rate_limiter.try_acquire():
+            self.breaker.cancel()
+            raise RateLimitedError(f"Débit maximal atteint pour {self.domain}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'breaker': self.breaker.snapshot(), 'rate_limiter': self.rate_limiter.snapshot()}
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def get_outbound_guard(domain: str) -> OutboundGuard:
+    """Protection du domaine, créée au premier appel selon les réglages SEARCH_RATE_* et SEARCH_BREAKER_*"""
+    guard = _guards.get(domain)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(domain)
+            if guard is None:
+                guard = _guards[domain] = OutboundGuard(
+                    domain,
+                    rate=getattr(settings, 'SEARCH_RATE_LIMIT', 2.0),
+                    burst=getattr(settings, 'SEARCH_RATE_BURST', 10),
+                    failure_threshold=getattr(settings, 'SEARCH_BREAKER_FAILURES', 3),
+                    reset_timeout=getattr(settings, 'SEARCH_BREAKER_RESET_TIMEOUT', 60),
+                )
+    return guard
+
+
+def outbound_status() -> Dict[str, Any]:
+    """État de toutes les protections, par domaine (supervision)"""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {guard.domain: guard.snapshot() for guard in guards}
@@ -0,0 +1,118 @@
+"""
+Module de cache des réponses du chatbot pour BiaSavia
+
+Les réponses aux questions les plus fréquentes sont précalculées en heures
+creuses par la commande warm_chatbot_cache, puis servies telles quelles aux
+heures de pointe. La clé combine la question normalisée et la version du
+registre de réponses : toute modification de chatbot_templates.json invalide
+le cache.
+
+Les réponses préchauffées sont calculées sans contexte de conversation : elles
+ne servent que le premier message d'une session. Les messages suivants, et les
+questions non préchauffées, restent traités (et personnalisés) normalement.
+
+La commande publie l'index des clés préchauffées ; chaque processus en garde
+une copie en mémoire, relue au plus toutes les CHATBOT_RESPONSE_INDEX_REFRESH
+secondes. Une question absente de l'index ne coûte donc aucune lecture SQLite.
+"""
+import re
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+from django.conf import settings
+
+from .response_templates import response_templates
+from .tiered_cache import TieredCache
+
+# Ponctuation ignorée pour regrouper « Comment recycler ? » et « comment recycler »
+QUESTION_PUNCTUATION = re.compile(r"[^\w\s'’-]")
+
+# Contexte des réponses préchauffées : premier message d'une session
+FIRST_TURN = 'first'
+
+WARMED_INDEX_KEY = '__warmed__'
+
+
+def normalize_question(message: str) -> str:
+    """Question normalisée (casse, ponctuation, espaces) servant à regrouper et à indexer"""
+    return ' '.join(QUESTION_PUNCTUATION.sub(' ', message.lower()).split())
+
+
+def response_cache_key(message: str) -> str:
+    return f"{response_templates.get_version()}:{FIRST_TURN}:{normalize_question(message)}"
+
+
+response_cache = TieredCache(
+    'chatbot_responses',
+    path=getattr(settings, 'CHATBOT_RESPONSE_CACHE_PATH', None),
+    memory_size=getattr(settings, 'CHATBOT_RESPONSE_CACHE_MEMORY_SIZE', 512),
+    ttl=getattr(settings, 'CHATBOT_RESPONSE_CACHE_TTL', 86400),
+    negative_ttl=0,
+    # Une exécution manquée du préchauffage laisse servir la réponse précédente
+    stale_ttl=getattr(settings, 'CHATBOT_RESPONSE_CACHE_STALE_TTL', 86400),
+)
+
+
+class WarmedIndex:
+    """Copie locale de l'index des clés préchauffées, relue périodiquement"""
+
+    def __init__(self, cache: TieredCache, refresh: float = 60):
+        self.cache = cache
+        self.refresh = refresh
+        self._keys = frozenset()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def keys(self) -> FrozenSet[str]:
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.refresh:
+            with self._lock:
+                if self._loaded_at is None or now - self._loaded_at >= self.refresh:
+                    # Relu depuis SQLite : l'index est publié par un autre processus
+                    self._keys = frozenset(self.cache.reload(WARMED_INDEX_KEY) or ())
+                    self._loaded_at = now
+        return self._keys
+
+    def publish(self, keys: Iterable[str]):
+        keys = sorted(set(keys))
+        self.cache.set(WARMED_INDEX_KEY, keys)
+        with self._lock:
+            self._keys = frozenset(keys)
+            self._loaded_at = time.monotonic()
+
+
+warmed_index = WarmedIndex(response_cache, refresh=getattr(settings, 'CHATBOT_RESPONSE_INDEX_REFRESH', 60))
+
+
+def is_warmed(message: str) -> bool:
+    """Vrai si la question a une réponse préchauffée (sans accès à la base)"""
+    if not getattr(settings, 'CHATBOT_RESPONSE_CACHE_ENABLED', True):
+        return False
+    return response_cache_key(message) in warmed_index.keys()
+
+
+def get_cached_answer(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Réponse préchauffée {'response', 'category', 'sources'}, ou None
+    À n'utiliser que pour le premier message d'une session (voir FIRST_TURN)
+    """
+    cached = response_cache.get(response_cache_key(message)) if is_warmed(message) else None
+    response_cache.stats['hits' if cached is not None else 'misses'] += 1
+    return cached
+
+
+def store_answer(message: str, result: Dict[str, Any]) -> str:
+    """Range la réponse calculée sans contexte ; retourne sa clé, à publier avec publish_warmed"""
+    key = response_cache_key(message)
+    response_cache.set(key, {
+        'response': result['response'],
+        'category': result['category'],
+        'sources': result.get('sources', []),
+    })
+    return key
+
+
+def publish_warmed(keys: Iterable[str]):
+    """Remplace l'index des questions préchauffées (les autres réponses ne sont plus servies)"""
+    warmed_index.publish(keys)
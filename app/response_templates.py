@@ -0,0 +1,115 @@
+"""
+Module de registre des réponses pré-rédigées du chatbot pour BiaSavia
+"""
+import hashlib
+import json
+import os
+import threading
+from string import Formatter
+from typing import Any, Dict, Tuple
+
+DEFAULT_TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'chatbot_templates.json')
+
+
+class CompiledTemplate:
+    """
+    Réponse découpée une fois pour toutes en segments littéraux et emplacements
+
+    Le rendu suit str.format : les accolades doublées ({{, }}) deviennent
+    simples, y compris dans une réponse statique, et les conversions (!r, !s)
+    et spécifications de format ({x:>5}) sont appliquées par string.Formatter.
+    """
+
+    __slots__ = ('text', 'segments', 'metadata')
+
+    _formatter = Formatter()
+
+    def __init__(self, text: str, metadata: Dict[str, Any]):
+        self.metadata = metadata
+        # ((littéral, emplacement ou None, spécification, conversion), ...)
+        segments = tuple(self._formatter.parse(text))
+        for _, field, spec, _ in segments:
+            if field is not None and (not field or '{' in (spec or '')):
+                raise ValueError(f"Emplacement non nommé ou spécification imbriquée non prise en charge : {text!r}")
+        if any(field is not None for _, field, _, _ in segments):
+            self.text = text
+            self.segments = segments
+        else:
+            # Réponse statique : texte déjà rendu, accolades échappées comprises
+            self.text = ''.join(literal for literal, _, _, _ in segments)
+            self.segments = ()
+
+    def render(self, **slots) -> str:
+        if not self.segments:
+            return self.text
+        parts = []
+        for literal, field, spec, conversion in self.segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = self._formatter.get_field(field, (), slots)[0]
+            if conversion:
+                value = self._formatter.convert_field(value, conversion)
+            parts.append(self._formatter.format_field(value, spec) if spec else str(value))
+        return ''.join(parts)
+
+
+class ResponseTemplateRegistry:
+    """Registre des réponses chargé une seule fois depuis un fichier de données"""
+
+    def __init__(self, path: str = DEFAULT_TEMPLATES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._sections = {}
+        self._templates = {}
+        self.version = None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.path, 'rb') as templates_file:
+                raw = templates_file.read()
+            data = json.loads(raw.decode('utf-8'))
+
+            self._sections = {
+                'greetings': data.get('greetings', {}),
+                'common_questions': data.get('common_questions', {}),
+            }
+            self._templates = {
+                name: CompiledTemplate(entry['answer'], {k: v for k, v in entry.items() if k != 'answer'})
+                for name, entry in data.get('answers', {}).items()
+            }
+            # La version change dès que le contenu change : elle entre dans les
+            # clés du cache de réponses pour l'invalider
+            digest = hashlib.sha256(raw).hexdigest()[:12]
+            self.version = f"{data.get('version', 0)}-{digest}"
+            self._loaded = True
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """Retourne une section brute du fichier (greetings, common_questions)"""
+        self._ensure_loaded()
+        return self._sections[name]
+
+    def get(self, name: str) -> Tuple[str, Dict[str, Any]]:
+        """Retourne une réponse statique pré-rendue et ses métadonnées (source, catégorie)"""
+        self._ensure_loaded()
+        template = self._templates[name]
+        return template.text, template.metadata
+
+    def render(self, name: str, **slots) -> Tuple[str, Dict[str, Any]]:
+        """Remplit les emplacements d'une réponse dynamique"""
+        self._ensure_loaded()
+        template = self._templates[name]
+        return template.render(**slots), template.metadata
+
+    def get_version(self) -> str:
+        self._ensure_loaded()
+        return self.version
+
+
+# Instance globale du registre de réponses
+response_templates = ResponseTemplateRegistry()
@@ -0,0 +1,225 @@
+"""
+Module d'analyse des pages de résultats de recherche pour BiaSavia
+
+Trois analyseurs interchangeables extraient titre, lien et extrait de chaque
+bloc <div class="g"> :
+- stream : sous-classe de html.parser qui ne construit pas d'arbre (par défaut,
+           bibliothèque standard uniquement)
+- lxml   : arbre lxml et XPath (si lxml est installé)
+- bs4    : arbre BeautifulSoup complet, comportement historique de référence
+
+Le choix se fait par le réglage SEARCH_HTML_PARSER ; sans la dépendance
+demandée, l'analyseur stream est utilisé.
+"""
+import os
+from html.parser import HTMLParser
+from typing import Callable, Dict, List
+
+from django.conf import settings
+
+# Pages de résultats enregistrées servant à vérifier la parité des analyseurs
+SEARCH_FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'data', 'search_fixtures')
+
+# Contenus jamais restitués par get_text() de BeautifulSoup
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+
+def make_result(title: str, link: str, snippet: str) -> Dict[str, str]:
+    """Résultat normalisé (lien de redirection Google /url?q= résolu)"""
+    if link.startswith('/url?q='):
+        link = link.split('/url?q=')[1].split('&')[0]
+    return {
+        'title': title,
+        'link': link,
+        'snippet': snippet
+    }
+
+
+# Éléments vides : jamais ouverts sur la pile (comme dans BeautifulSoup)
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+}
+
+
+class _ResultBlock:
+    """Bloc <div class="g"> en cours de lecture"""
+    __slots__ = ('title', 'link', 'snippet')
+
+    def __init__(self):
+        self.title = None    # fragments de texte du premier <h3>
+        self.link = None     # href du premier <a>
+        self.snippet = None  # fragments du premier <span data-ved>
+
+
+class StreamingResultParser(HTMLParser):
+    """
+    Lit la page en flux et ne conserve que les champs utiles des blocs de résultats
+
+    Reproduit find_all('div', class_='g') puis les find() imbriqués : blocs
+    dans l'ordre du document (y compris imbriqués), premier <h3>, premier <a>
+    et premier <span data-ved> de chaque bloc. Seule une pile des noms de
+    balises ouvertes est tenue, fermée comme le fait BeautifulSoup (une balise
+    fermante referme aussi les balises ouvertes après elle).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self._stack = []         # (balise, bloc ouvert ou None, fragments capturés ou None)
+        self._open_blocks = []
+        self._captures = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        block = None
+        fragments = None
+        if tag == 'div':
+            classes = next((value for name, value in attrs if name == 'class'), None)
+            if classes and 'g' in classes.split():
+                block = _ResultBlock()
+                self.blocks.append(block)
+                self._open_blocks.append(block)
+        elif tag == 'a':
+            self._start_link(attrs)
+        elif tag == 'h3' and self._open_blocks:
+            fragments = self._start_capture('title')
+        elif tag == 'span' and self._open_blocks and any(name == 'data-ved' for name, _ in attrs):
+            fragments = self._start_capture('snippet')
+        elif tag in NON_TEXT_TAGS:
+            self._skip_depth += 1
+        self._stack.append((tag, block, fragments))
+
+    def _start_link(self, attrs):
+        for block in self._open_blocks:
+            if block.link is None:
+                block.link = next((value for name, value in attrs if name == 'href'), None) or ''
+
+    def _start_capture(self, field):
+        fragments = None
+        for block in self._open_blocks:
+            if getattr(block, field) is None:
+                if fragments is None:
+                    fragments = []
+                    self._captures.append(fragments)
+                setattr(block, field, fragments)
+        return fragments
+
+    def handle_endtag(self, tag):
+        if not any(name == tag for name, _, _ in self._stack):
+            return
+        while self._stack:
+            name, block, fragments = self._stack.pop()
+            if block is not None:
+                self._open_blocks.remove(block)
+            if fragments is not None:
+                self._captures.remove(fragments)
+            if name in NON_TEXT_TAGS:
+                self._skip_depth -= 1
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        for fragments in self._captures:
+            fragments.append(data)
+
+
+def parse_stream(html: str, num_results: int = 5) -> List[Dict[str, str]]:
+    parser = StreamingResultParser()
+    parser.feed(html)
+    parser.close()
+    results = []
+    for block in parser.blocks[:num_results]:
+        if block.title is not None and block.link is not None:
+            snippet = ''.join(block.snippet) if block.snippet is not None else ""
+            results.append(make_result(''.join(block.title), block.link, snippet))
+    return results
+
+
+# Nœuds texte d'un élément hors NON_TEXT_TAGS (text_content() inclurait les scripts)
+LXML_TEXT_XPATH = './/text()[not({})]'.format(
+    ' or '.join(f'ancestor::{tag}' for tag in sorted(NON_TEXT_TAGS))
+)
+
+
+def _lxml_text(element) -> str:
+    return ''.join(element.xpath(LXML_TEXT_XPATH))
+
+
+def parse_lxml(html: str, num_results: int = 5) -> List[Dict[str, str]]:
+    import lxml.html
+
+    if not html.strip():
+        return []
+    document = lxml.html.fromstring(html)
+    blocks = document.xpath("//div[contains(concat(' ', normalize-space(@class), ' '), ' g ')]")
+    results = []
+    for block in blocks[:num_results]:
+        titles = block.xpath('.//h3')
+        links = block.xpath('.//a')
+        if titles and links:
+            snippets = block.xpath('.//span[@data-ved]')
+            snippet = _lxml_text(snippets[0]) if snippets else ""
+            results.append(make_result(_lxml_text(titles[0]), links[0].get('href', ''), snippet))
+    return results
+
+
+def parse_bs4(html: str, num_results: int = 5) -> List[Dict[str, str]]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    for result in soup.find_all('div', class_='g')[:num_results]:
+        title_element = result.find('h3')
+        link_element = result.find('a')
+        snippet_element = result.find('span', {'data-ved': True})
+
+        if title_element and link_element:
+            snippet = snippet_element.get_text() if snippet_element else ""
+            results.append(make_result(title_element.get_text(), link_element.get('href', ''), snippet))
+    return results
+
+
+PARSERS = {
+    'stream': parse_stream,
+    'lxml': parse_lxml,
+    'bs4': parse_bs4,
+}
+
+# Module à importer pour chaque analyseur optionnel
+PARSER_DEPENDENCIES = {
+    'lxml': 'lxml.html',
+    'bs4': 'bs4',
+}
+
+
+def available_parsers() -> List[str]:
+    """Analyseurs utilisables dans l'environnement courant"""
+    import importlib
+
+    names = []
+    for name in PARSERS:
+        dependency = PARSER_DEPENDENCIES.get(name)
+        if dependency:
+            try:
+                importlib.import_module(dependency)
+            except ImportError:
+                continue
+        names.append(name)
+    return names
+
+
+def get_parser(name: str = None) -> Callable[[str, int], List[Dict[str, str]]]:
+    """Analyseur configuré par SEARCH_HTML_PARSER, avec repli sur l'analyseur stream"""
+    name = name or getattr(settings, 'SEARCH_HTML_PARSER', 'stream')
+    if name not in PARSERS:
+        raise ValueError(f"Analyseur HTML inconnu : {name}")
+    if name not in available_parsers():
+        print(f"⚠️ Analyseur HTML {name} indisponible, utilisation de l'analyseur stream")
+        name = 'stream'
+    return PARSERS[name]
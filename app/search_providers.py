@@ -0,0 +1,251 @@
+"""
+Module des fournisseurs de recherche pour BiaSavia
+
+- web   : page de résultats Google analysée (réseau requis), résultats en cache
+- local : recherche plein texte SQLite FTS5 (classement bm25) sur un corpus de
+          documents environnementaux importé (commande import_search_corpus)
+
+Le réglage SEARCH_PROVIDER désigne un fournisseur ou une chaîne de repli,
+par exemple "local,web" : le fournisseur suivant n'est interrogé que si le
+précédent échoue ou ne trouve rien.
+"""
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .http_client import get_http_session, http_timeout
+from .nlp_engines import STOP_WORDS
+from .resilience import OutboundUnavailableError, get_outbound_guard
+from .search_parsers import get_parser
+from .tiered_cache import TieredCache
+
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Cache des résultats web par requête normalisée
+search_cache = TieredCache(
+    'google_search',
+    path=getattr(settings, 'SEARCH_CACHE_PATH', None),
+    memory_size=getattr(settings, 'SEARCH_CACHE_MEMORY_SIZE', 1024),
+    ttl=getattr(settings, 'SEARCH_CACHE_TTL', 3600),
+    negative_ttl=getattr(settings, 'SEARCH_CACHE_NEGATIVE_TTL', 300),
+    stale_ttl=getattr(settings, 'SEARCH_CACHE_STALE_TTL', 86400),
+)
+
+QUERY_TOKEN_PATTERN = re.compile(r'\w+')
+
+# Mots ajoutés aux requêtes par les services de recherche (contexte, type de
+# question) et mots interrogatifs : utiles au moteur web, ils ne désignent
+# aucun sujet du corpus
+CONTEXT_WORDS = {
+    'environnement', 'écologie', 'définition', 'explication', 'méthode', 'guide', 'raisons',
+    'quel', 'quelle', 'quels', 'quelles', 'faut', 'peut', 'peux', 'faire'
+}
+
+
+class WebSearchProvider:
+    """
+    Recherche Google : requête HTTP sur la session partagée puis analyse de la page
+
+    Les requêtes passent par le limiteur de débit et le disjoncteur du domaine ;
+    quand ils refusent l'appel, une réponse en cache même expirée est servie,
+    sinon OutboundUnavailableError est levée sans attendre le réseau.
+    """
+    name = 'web'
+
+    def __init__(self, url: str = None, headers: Dict[str, str] = None, cache: TieredCache = search_cache):
+        self.url = url
+        self.headers = headers or {'User-Agent': USER_AGENT}
+        self.cache = cache
+        self._parse_results = None
+
+    @property
+    def parse_results(self):
+        """Analyseur de pages de résultats (SEARCH_HTML_PARSER), choisi au premier usage"""
+        if self._parse_results is None:
+            self._parse_results = get_parser()
+        return self._parse_results
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        """Résultats servis depuis le cache quand c'est possible ; une erreur réseau n'est pas mise en cache"""
+        if self.cache is None:
+            return self.fetch(query, num_results)
+        cache_key = f"{num_results}:{' '.join(query.lower().split())}"
+        try:
+            return self.cache.get_or_fetch(cache_key, lambda: self.fetch(query, num_results))
+        except OutboundUnavailableError:
+            stale = self.cache.get(cache_key, allow_expired=True)
+            if stale is not None:
+                return stale
+            raise
+
+    def fetch(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        """Interroge Google et analyse la page de résultats (lève une exception en cas d'échec)"""
+        url = self.url or GOOGLE_SEARCH_URL
+        guard = get_outbound_guard(urlsplit(url).hostname)
+        guard.acquire()
+        
+        # Envoi de la requête sur la session partagée (connexion réutilisée) ;
+        # les paramètres sont encodés par requests
+        try:
+            response = get_http_session().get(
+                url,
+                params={'q': query, 'num': num_results},
+                headers=self.headers,
+                timeout=http_timeout()
+            )
+            response.raise_for_status()
+        except Exception as e:
+            # Délai dépassé, refus (429, 403) ou erreur serveur : le domaine est en cause
+            guard.breaker.record_failure(e)
+            raise
+        guard.breaker.record_success()
+
+        # Extraction des résultats (titre, lien, extrait) par l'analyseur configuré
+        return self.parse_results(response.text, num_results)
+
+
+class LocalCorpusProvider:
+    """
+    Recherche plein texte hors ligne sur un corpus importé (SQLite FTS5)
+
+    Les accents sont ignorés (remove_diacritics) et chaque mot de la requête
+    est cherché comme préfixe (« pollution » trouve « pollutions »). Les
+    documents contenant tous les mots viennent d'abord, complétés par ceux
+    qui en contiennent au moins un ; chaque groupe est classé par bm25, le
+    titre pesant plus que le contenu.
+    """
+    name = 'local'
+
+    TITLE_WEIGHT = 2.0
+    CONTENT_WEIGHT = 1.0
+    SNIPPET_TOKENS = 40
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5('
+                ' title, link UNINDEXED, content,'
+                " tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def query_terms(query: str) -> List[str]:
+        """Mots significatifs de la requête (sans mots vides ni mots de contexte)"""
+        tokens = []
+        for token in QUERY_TOKEN_PATTERN.findall(query.lower()):
+            if len(token) > 2 and token not in STOP_WORDS and token not in tokens:
+                tokens.append(token)
+        terms = [token for token in tokens if token not in CONTEXT_WORDS]
+        # Requête faite uniquement de mots de contexte : on les garde
+        return terms or tokens
+
+    def _match(self, match_query: str, limit: int):
+        return self._connection().execute(
+            'SELECT rowid, title, link, snippet(documents, 2, \'\', \'\', \'…\', ?)'
+            ' FROM documents WHERE documents MATCH ?'
+            ' ORDER BY bm25(documents, ?, 0, ?) LIMIT ?',
+            (self.SNIPPET_TOKENS, match_query, self.TITLE_WEIGHT, self.CONTENT_WEIGHT, limit)
+        ).fetchall()
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        terms = self.query_terms(query)
+        if not terms:
+            return []
+        phrases = [f'"{term}"*' for term in terms]
+        rows = self._match(' AND '.join(phrases), num_results)
+        if len(rows) < num_results and len(terms) > 1:
+            found = {row[0] for row in rows}
+            rows += [
+                row for row in self._match(' OR '.join(phrases), num_results + len(rows))
+                if row[0] not in found
+            ][:num_results - len(rows)]
+        # Rang dans le corpus ramené entre 0 et 1, repris par le score de pertinence
+        return [
+            {'title': title, 'link': link, 'snippet': snippet, 'match_score': round(1 - index / len(rows), 3)}
+            for index, (_, title, link, snippet) in enumerate(rows)
+        ]
+
+    def import_documents(self, documents: Iterable[Dict[str, str]], replace: bool = False) -> int:
+        """Ajoute des documents (title, link, content) au corpus ; retourne le nombre importé"""
+        connection = self._connection()
+        count = 0
+        with connection:
+            if replace:
+                connection.execute('DELETE FROM documents')
+            for document in documents:
+                connection.execute(
+                    'INSERT INTO documents (title, link, content) VALUES (?, ?, ?)',
+                    (document['title'], document['link'], document['content'])
+                )
+                count += 1
+            connection.execute("INSERT INTO documents (documents) VALUES ('optimize')")
+        return count
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+
+class FallbackSearchProvider:
+    """Chaîne de fournisseurs : le suivant sert quand le précédent échoue ou ne trouve rien"""
+
+    def __init__(self, providers: List):
+        self.providers = providers
+        self.name = ','.join(provider.name for provider in providers)
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        errors = []
+        for provider in self.providers:
+            try:
+                results = provider.search(query, num_results)
+            except OutboundUnavailableError as e:
+                # Refus local (débit, disjoncteur) : repli immédiat et silencieux
+                errors.append(e)
+                continue
+            except Exception as e:
+                print(f"⚠️ Fournisseur de recherche {provider.name} en échec : {e}")
+                errors.append(e)
+                continue
+            if results:
+                return results
+        # Tous en échec : l'erreur remonte au service (qui ne la met pas en cache)
+        if len(errors) == len(self.providers):
+            raise errors[-1]
+        return []
+
+
+def build_provider(name: str):
+    if name == 'web':
+        return WebSearchProvider()
+    if name == 'local':
+        return LocalCorpusProvider(getattr(settings, 'SEARCH_CORPUS_PATH', 'search_corpus.sqlite3'))
+    raise ValueError(f"Fournisseur de recherche inconnu : {name}")
+
+
+def get_search_provider(name: str = None):
+    """Fournisseur (ou chaîne de repli) configuré par SEARCH_PROVIDER"""
+    names = [part.strip() for part in (name or getattr(settings, 'SEARCH_PROVIDER', 'web')).split(',') if part.strip()]
+    if not names:
+        raise ValueError("Aucun fournisseur de recherche configuré")
+    providers = [build_provider(provider_name) for provider_name in names]
+    if len(providers) == 1:
+        return providers[0]
+    return FallbackSearchProvider(providers)
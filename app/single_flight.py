@@ -0,0 +1,53 @@
+"""
+Module de regroupement des appels identiques en cours (single-flight) pour BiaSavia
+
+Quand plusieurs threads demandent en même temps le même calcul (même clé),
+seul le premier l'exécute ; les autres attendent son résultat, ou son
+exception. La clé est libérée dès la fin du calcul : rien n'est mis en cache.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Exécute une seule fois à la fois chaque calcul identifié par une clé"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {'executed': 0, 'shared': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Retourne fn(), calculé par le premier appelant de la clé et partagé avec les suivants"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.stats['executed'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'name': self.name, 'in_flight': self.in_flight(), **self.stats}
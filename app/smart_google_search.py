@@ -2,8 +2,12 @@
 Module de recherche Google intelligente pour BiaSavia
 """
 from .enhanced_google_search import EnhancedGoogleSearchService
+from .single_flight import SingleFlight
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from django.conf import settings
 import json
 import re
+import time
 
 class SmartGoogleSearchService(EnhancedGoogleSearchService):
     """Service de recherche Google intelligent avec IA"""
@@ -17,10 +21,38 @@ class SmartGoogleSearchService(EnhancedGoogleSearchService):
             'when': ['quand', 'when'],
             'where': ['où', 'where']
         }
+        # Pool dédié aux requêtes : distinct de celui de l'orchestrateur du chatbot,
+        # dont les tâches appellent smart_search
+        self.executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'SEARCH_FANOUT_WORKERS', 16),
+            thread_name_prefix='search-query'
+        )
+        # Recherches identiques simultanées : une seule est réellement lancée
+        self.search_flight = SingleFlight('smart_search')
     
-    def smart_search(self, user_question):
+    def smart_search(self, user_question, query_cache=None, deadline=None):
         """
         Recherche intelligente basée sur la compréhension de la question
+        
+        Les appels simultanés pour une même question (hors lots) partagent une
+        seule recherche ; chaque appelant reçoit sa propre copie des résultats.
+        """
+        if query_cache is not None:
+            return self._smart_search(user_question, query_cache, deadline)
+        flight_key = (' '.join(user_question.lower().split()), deadline)
+        results = self.search_flight.do(flight_key, lambda: self._smart_search(user_question, None, deadline))
+        return [dict(result) for result in results]
+    
+    def _smart_search(self, user_question, query_cache=None, deadline=None):
+        """
+        Recherche intelligente basée sur la compréhension de la question
+        
+        Les requêtes optimisées partent en parallèle sous une échéance commune
+        (SEARCH_DEADLINE) ; les résultats sont fusionnés à leur arrivée et la
+        recherche s'arrête dès que SEARCH_EARLY_RETURN_RESULTS résultats très
+        pertinents sont réunis.
+        query_cache (dict requête -> résultats) permet de partager les recherches
+        entre les questions d'un même lot
         """
         # Analyse du type de question
         question_type = self._analyze_question_type(user_question)
@@ -28,11 +60,55 @@ class SmartGoogleSearchService(EnhancedGoogleSearchService):
         # Génération de requêtes optimisées
         optimized_queries = self._generate_optimized_queries(user_question, question_type)
         
-        # Collecte des résultats
+        budget = deadline if deadline is not None else getattr(settings, 'SEARCH_DEADLINE', 6.0)
+        end = time.monotonic() + budget
+        enough = getattr(settings, 'SEARCH_EARLY_RETURN_RESULTS', 5)
+        high_relevance = getattr(settings, 'SEARCH_HIGH_RELEVANCE_SCORE', 5)
+        
+        # Fusion au fil de l'eau : un lien n'est compté qu'une fois
         all_results = []
+        seen_links = set()
+        relevant_count = 0
+        
+        def merge(results):
+            nonlocal relevant_count
+            for result in results:
+                all_results.append(result)
+                if result['link'] not in seen_links:
+                    seen_links.add(result['link'])
+                    if result.get('relevance_score', 0) >= high_relevance:
+                        relevant_count += 1
+        
+        # Lancement des requêtes absentes du cache de lot
+        pending = {}
         for query in optimized_queries:
-            results = self.enhanced_search(query)
-            all_results.extend(results)
+            cache_key = ' '.join(query.lower().split())
+            cached = query_cache.get(cache_key) if query_cache is not None else None
+            if cached is not None:
+                merge(cached)
+            elif cache_key not in pending.values():
+                pending[self.executor.submit(self.enhanced_search, query)] = cache_key
+        
+        # Collecte des résultats dans l'ordre d'arrivée
+        while pending and relevant_count < enough:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                cache_key = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"Erreur lors de la recherche « {cache_key} » : {e}")
+                    results = []
+                if query_cache is not None:
+                    query_cache[cache_key] = results
+                merge(results)
+        
+        # Requêtes abandonnées (échéance ou résultats suffisants)
+        for future in pending:
+            future.cancel()
         
         # Déduplication et tri
         unique_results = self._deduplicate_results(all_results)
@@ -98,7 +174,16 @@ class SmartGoogleSearchService(EnhancedGoogleSearchService):
     def extract_answer_from_results(self, results, question):
         """
         Extrait une réponse pertinente des résultats de recherche
+        Les phrases des extraits les plus proches de la question sont retenues
+        (résumé extractif) ; sans phrase en rapport avec la question, les
+        premiers extraits substantiels sont repris tels quels.
         """
+        from .answer_extraction import extractive_summarizer
+        
+        summary = extractive_summarizer.summarize(results, question)
+        if summary:
+            return summary
+        
         answer_parts = []
         
         for result in results[:3]:  # Utiliser les 3 meilleurs résultats
@@ -0,0 +1,123 @@
+"""
+Tests de non-régression du backend (python manage.py test app)
+
+Les suites de manage.py benchmark mesurent les performances ; les
+vérifications d'exactitude et de parité dont elles dépendent sont ici.
+"""
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from app.management.commands.benchmark import StubSearchHandler
+
+
+class NLPCategorizerTests(SimpleTestCase):
+    """Catégoriseur : parité lot / unitaire et exactitude sur les jeux annotés"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from app.nlp_processor import CATEGORIZATION_CASES_PATH, nlp_processor
+        cls.nlp = nlp_processor
+        with open(CATEGORIZATION_CASES_PATH, encoding='utf-8') as cases_file:
+            cls.data = json.load(cases_file)
+
+    def accuracy(self, cases):
+        predictions = [self.nlp.categorize_question(case['question']) for case in cases]
+        return 100 * sum(p == case['category'] for p, case in zip(predictions, cases)) / len(cases)
+
+    def test_batch_matches_single(self):
+        questions = [case['question'] for case in self.data['cases'] + self.data['held_out_cases']]
+        self.assertEqual(
+            self.nlp.categorize_questions(questions),
+            [self.nlp.categorize_question(question) for question in questions],
+        )
+
+    def test_tuning_accuracy(self):
+        self.assertGreaterEqual(self.accuracy(self.data['cases']), self.data['baseline_accuracy'])
+
+    def test_held_out_accuracy(self):
+        # Jeu jamais utilisé pour régler les poids : mesure la généralisation
+        self.assertGreaterEqual(self.accuracy(self.data['held_out_cases']), self.data['held_out_baseline_accuracy'])
+
+
+class HTTPSessionTests(SimpleTestCase):
+    """Session HTTP partagée : réponses, réutilisation de connexion, politique de tentatives"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubSearchHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        from app.http_client import build_session, http_timeout
+        self.session = build_session()
+        self.timeout = http_timeout()
+
+    def test_session_response_matches_plain_request(self):
+        import requests
+        url = f"{self.base_url}/search"
+        fresh = requests.get(url, params={'q': 'climat'}, timeout=self.timeout)
+        shared = self.session.get(url, params={'q': 'climat'}, timeout=self.timeout)
+        self.assertEqual((shared.status_code, shared.content), (fresh.status_code, fresh.content))
+
+    def test_session_reuses_its_connection(self):
+        StubSearchHandler.connections = set()
+        for _ in range(5):
+            self.session.get(f"{self.base_url}/search", timeout=self.timeout)
+        self.assertEqual(len(StubSearchHandler.connections), 1)
+
+    def test_transient_503_is_retried(self):
+        StubSearchHandler.flaky_calls = 0
+        response = self.session.get(f"{self.base_url}/flaky", timeout=self.timeout)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StubSearchHandler.flaky_calls, 2)
+
+    def test_429_is_returned_without_retry(self):
+        StubSearchHandler.throttled_calls = 0
+        response = self.session.get(f"{self.base_url}/throttled", timeout=self.timeout)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(StubSearchHandler.throttled_calls, 1)
+
+
+class SearchParserTests(SimpleTestCase):
+    """Analyseurs de pages de résultats : mêmes résultats que la référence sur les pages enregistrées"""
+
+    def test_parsers_agree_on_fixtures(self):
+        from app.search_parsers import PARSERS, SEARCH_FIXTURES_DIR, available_parsers
+
+        parsers = available_parsers()
+        reference = 'bs4' if 'bs4' in parsers else 'stream'
+        fixtures = sorted(name for name in os.listdir(SEARCH_FIXTURES_DIR) if name.endswith('.html'))
+        self.assertTrue(fixtures)
+        for fixture in fixtures:
+            with open(os.path.join(SEARCH_FIXTURES_DIR, fixture), encoding='utf-8') as fixture_file:
+                html = fixture_file.read()
+            expected = PARSERS[reference](html, 10)
+            for name in parsers:
+                with self.subTest(fixture=fixture, parser=name):
+                    self.assertEqual(PARSERS[name](html, 10), expected)
+
+    def test_script_and_style_text_is_skipped(self):
+        from app.search_parsers import PARSERS, available_parsers
+
+        html = ("<html><body><div class='g'><h3>Le climat<script>track(1)</script></h3>"
+                "<a href='https://example.org/climat'>lien</a>"
+                "<div class='VwiC3b'>Résumé<style>.x{}</style> du climat</div></div></body></html>")
+        for name in available_parsers():
+            with self.subTest(parser=name):
+                results = PARSERS[name](html, 5)
+                self.assertEqual(len(results), 1)
+                self.assertNotIn('track', results[0]['title'])
+                self.assertNotIn('.x', results[0]['snippet'])
@@ -0,0 +1,233 @@
+"""
+Module de cache à deux niveaux pour BiaSavia
+
+- niveau 1 : LRU en mémoire, propre au processus
+- niveau 2 : base SQLite partagée par les workers, qui survit aux redémarrages
+
+Chaque entrée a une durée de fraîcheur (ttl) puis une fenêtre de péremption
+(stale_ttl) pendant laquelle la valeur périmée est servie immédiatement et
+rafraîchie en arrière-plan (stale-while-revalidate). Les résultats vides sont
+mis en cache avec une durée plus courte (negative_ttl), sans fenêtre de
+péremption. Les valeurs doivent être sérialisables en JSON.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Entrée : (valeur, fraîche jusqu'à, servable jusqu'à) en secondes epoch
+Entry = Tuple[Any, float, float]
+
+_refresh_executor = None
+_refresh_executor_lock = threading.Lock()
+
+
+def get_refresh_executor() -> ThreadPoolExecutor:
+    """Pool partagé des rafraîchissements en arrière-plan, créé au premier besoin"""
+    global _refresh_executor
+    if _refresh_executor is None:
+        with _refresh_executor_lock:
+            if _refresh_executor is None:
+                _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+    return _refresh_executor
+
+
+class SQLiteCacheStore:
+    """Niveau persistant : une table clé-valeur par espace de noms, une connexion par thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+            self._ensure_schema(connection)
+        return connection
+
+    def _ensure_schema(self, connection: sqlite3.Connection):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                ' namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,'
+                ' fresh_until REAL NOT NULL, stale_until REAL NOT NULL,'
+                ' PRIMARY KEY (namespace, key))'
+            )
+            # Les entrées inutilisables sont purgées une fois par processus
+            connection.execute('DELETE FROM cache_entries WHERE stale_until < ?', (time.time(),))
+            self._schema_ready = True
+
+    def get(self, namespace: str, key: str) -> Optional[Entry]:
+        row = self._connection().execute(
+            'SELECT value, fresh_until, stale_until FROM cache_entries WHERE namespace = ? AND key = ?',
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, namespace: str, key: str, entry: Entry):
+        value, fresh_until, stale_until = entry
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cache_entries (namespace, key, value, fresh_until, stale_until)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            (namespace, key, json.dumps(value, ensure_ascii=False), fresh_until, stale_until)
+        )
+
+    def delete(self, namespace: str, key: str):
+        self._connection().execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (namespace, key))
+
+    def clear(self, namespace: str):
+        self._connection().execute('DELETE FROM cache_entries WHERE namespace = ?', (namespace,))
+
+
+class TieredCache:
+    """
+    Cache LRU en mémoire adossé à un niveau SQLite optionnel
+
+    get_or_fetch(key, fetch) sert la valeur fraîche si elle existe, sinon la
+    valeur périmée en planifiant un rafraîchissement, sinon appelle fetch.
+    Une exception levée par fetch n'est jamais mise en cache.
+    """
+
+    def __init__(self, namespace: str, path: Optional[str] = None, memory_size: int = 1024,
+                 ttl: float = 3600, negative_ttl: float = 300, stale_ttl: float = 86400):
+        self.namespace = namespace
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.store = SQLiteCacheStore(path) if path else None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0}
+
+    def _lookup(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if self.store is None:
+            return None
+        try:
+            entry = self.store.get(self.namespace, key)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            self.stats['errors'] += 1
+            print(f"⚠️ Lecture du cache {self.namespace} impossible : {e}")
+            return None
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: Entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        if value:
+            entry = (value, now + self.ttl, now + self.ttl + self.stale_ttl)
+        else:
+            # Cache négatif : court, sans valeur périmée à servir
+            entry = (value, now + self.negative_ttl, now + self.negative_ttl)
+        self._remember(key, entry)
+        if self.store is not None:
+            try:
+                self.store.set(self.namespace, key, entry)
+            except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+                self.stats['errors'] += 1
+                print(f"⚠️ Écriture du cache {self.namespace} impossible : {e}")
+
+    def get(self, key: str, default: Any = None, allow_expired: bool = False) -> Any:
+        """
+        Valeur encore servable (fraîche ou périmée), sans rafraîchissement
+        allow_expired rend aussi une valeur hors délai encore conservée (mode dégradé)
+        """
+        entry = self._lookup(key)
+        if entry is None or (entry[2] <= time.time() and not allow_expired):
+            return default
+        return entry[0]
+
+    def reload(self, key: str, default: Any = None) -> Any:
+        """Comme get, en relisant le niveau SQLite (valeur écrite par un autre processus)"""
+        if self.store is not None:
+            with self._lock:
+                self._memory.pop(key, None)
+        return self.get(key, default)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        entry = self._lookup(key)
+        now = time.time()
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self.stats['hits'] += 1
+                return value
+            if now < stale_until:
+                self.stats['stale_hits'] += 1
+                self._schedule_refresh(key, fetch)
+                return value
+
+        self.stats['misses'] += 1
+        value = fetch()
+        self.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], Any]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        get_refresh_executor().submit(self._refresh, key, fetch)
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]):
+        try:
+            value = fetch()
+            if value or self.get(key) is None:
+                # Un échec ponctuel ne remplace pas une valeur périmée encore utile
+                self.set(key, value)
+            self.stats['refreshes'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"⚠️ Rafraîchissement du cache {self.namespace} impossible pour « {key} » : {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.store is not None:
+            self.store.delete(self.namespace, key)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.store is not None:
+            self.store.clear(self.namespace)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            memory_entries = len(self._memory)
+        return {'namespace': self.namespace, 'memory_entries': memory_entries, **self.stats}
@@ -4,7 +4,7 @@ from .views import (
     RegisterView, UserProfileView, PasswordResetView, PasswordResetConfirmView,
     LikePostView, PostListCreateAPIView, PostRetrieveUpdateDestroyAPIView, ImageUploadView,
     CommentListCreateView, CommentDeleteView, LikeCommentView, ReplyToCommentView, CommentRepliesView,
-    chatbot_view
+    chatbot_view, search_status_view
 )
 from .ai_views import classify_image, classify_batch, ai_status, initialize_ai
 
@@ -22,6 +22,7 @@ urlpatterns = [
     path('api/password-reset-confirm/<uidb64>/<token>/', PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
 
     path('chatbot/', chatbot_view, name='chatbot'),
+    path('api/search/status/', search_status_view, name='search-status'),
 
     path('posts/', PostListCreateAPIView.as_view(), name='post-list-create'),
     path('posts/<int:pk>/', PostRetrieveUpdateDestroyAPIView.as_view(), name='post-detail'),
@@ -1,17 +1,21 @@
 from rest_framework import generics, permissions, status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
 from django.contrib.auth.tokens import default_token_generator, PasswordResetTokenGenerator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.conf import settings
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
 import json
 import re
+import time
 import uuid
 from datetime import datetime
 
@@ -28,7 +32,10 @@ from .models import EnvironmentalData, ChatHistory, Post, Comment
 # from .enhanced_google_search import enhanced_google_search_service
 # from .smart_google_search import smart_google_search_service
 # from .nlp_processor import nlp_processor
-# from .conversation_memory import conversation_memory
+from .conversation_memory import conversation_memory
+from .chatbot_orchestrator import AnswerSource, ChatbotOrchestrator
+from .response_templates import response_templates
+from .response_cache import get_cached_answer, is_warmed, response_cache
 # from .intelligent_processor import intelligent_processor
 # from .advanced_intelligence import advanced_intelligence
 
@@ -53,21 +60,6 @@ class PostRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 User = get_user_model()
 
-# Salutations et messages d'accueil
-GREETINGS = {
-    "bonjour": "Bonjour ! 🌱 Je suis Bia Safiya, votre assistant environnemental. Comment puis-je vous aider aujourd'hui ?",
-    "salut": "Salut ! 🌿 Ravi de vous rencontrer. Je suis spécialisé dans les questions environnementales. Que souhaitez-vous savoir ?",
-    "hello": "Hello ! 🌍 Bienvenue ! Je suis là pour répondre à vos questions sur l'environnement.",
-    "coucou": "Coucou ! 🌱 Enchanté de faire votre connaissance ! Je suis votre guide environnemental.",
-    "hi": "Hi ! 🌿 Welcome ! I'm here to help you with environmental questions.",
-    "hey": "Hey ! 🌍 Salut ! Je suis Bia Safiya, votre assistant vert !",
-    "bonsoir": "Bonsoir ! 🌱 Comment puis-je vous aider ce soir ?",
-    "bonne journée": "Bonne journée à vous aussi ! 🌿 N'hésitez pas si vous avez des questions environnementales !",
-    "merci": "De rien ! 🌱 C'est un plaisir de vous aider. N'hésitez pas si vous avez d'autres questions !",
-    "au revoir": "Au revoir ! 🌿 Merci d'avoir utilisé Bia Safiya. À bientôt !",
-    "bye": "Bye ! 🌍 Take care and keep being eco-friendly !",
-    "à bientôt": "À bientôt ! 🌱 N'oubliez pas de prendre soin de notre planète !"
-}
 
 # ...existing code...
 
@@ -151,21 +143,8 @@ def add_message(session_id, message, response, analysis):
 
 User = get_user_model()
 
-# Salutations et messages d'accueil
-GREETINGS = {
-    "bonjour": "Bonjour ! 🌱 Je suis Bia Safiya, votre assistant environnemental. Comment puis-je vous aider aujourd'hui ?",
-    "salut": "Salut ! 🌿 Ravi de vous rencontrer. Je suis spécialisé dans les questions environnementales. Que souhaitez-vous savoir ?",
-    "hello": "Hello ! 🌍 Bienvenue ! Je suis là pour répondre à vos questions sur l'environnement.",
-    "coucou": "Coucou ! 🌱 Enchanté de faire votre connaissance ! Je suis votre guide environnemental.",
-    "hi": "Hi ! 🌿 Welcome ! I'm here to help you with environmental questions.",
-    "hey": "Hey ! 🌍 Salut ! Je suis Bia Safiya, votre assistant vert !",
-    "bonsoir": "Bonsoir ! 🌱 Comment puis-je vous aider ce soir ?",
-    "bonne journée": "Bonne journée à vous aussi ! 🌿 N'hésitez pas si vous avez des questions environnementales !",
-    "merci": "De rien ! 🌱 C'est un plaisir de vous aider. N'hésitez pas si vous avez d'autres questions !",
-    "au revoir": "Au revoir ! 🌿 Merci d'avoir utilisé Bia Safiya. À bientôt !",
-    "bye": "Bye ! 🌍 Take care and keep being eco-friendly !",
-    "à bientôt": "À bientôt ! 🌱 N'oubliez pas de prendre soin de notre planète !"
-}
+# Salutations et messages d'accueil (app/data/chatbot_templates.json)
+GREETINGS = response_templates.section('greetings')
 
 # Mots-clés environnementaux étendus
 ENVIRONMENT_KEYWORDS = [
@@ -176,195 +155,8 @@ ENVIRONMENT_KEYWORDS = [
     "vert", "green", "écologie", "environnemental", "durabilité", "sustainable"
 ]
 
-# Questions communes et leurs réponses
-COMMON_QUESTIONS = {
-    "comment faire pour defendre l'environnement": {
-        "answer": """🌿 Voici comment défendre l'environnement au quotidien :
-
-🏠 **À la maison :**
-• Éteindre les lumières et appareils inutilisés
-• Utiliser des ampoules LED économiques
-• Réduire le chauffage et la climatisation
-• Installer des panneaux solaires si possible
-
-🚗 **Transport :**
-• Privilégier les transports en commun, vélo, marche
-• Covoiturage pour les trajets longs
-• Choisir des véhicules électriques ou hybrides
-
-🛒 **Consommation :**
-• Acheter local et de saison
-• Réduire les emballages plastiques
-• Choisir des produits durables
-• Réparer plutôt que jeter
-
-♻️ **Déchets :**
-• Trier et recycler systématiquement
-• Composter les déchets organiques
-• Réduire les déchets à la source
-
-💧 **Eau :**
-• Prendre des douches courtes
-• Récupérer l'eau de pluie
-• Réparer les fuites
-
-Chaque petit geste compte pour préserver notre planète ! 🌍""",
-        "source": "Guide des bonnes pratiques environnementales"
-    },
-    
-    "comment reduire la pollution": {
-        "answer": """🌿 Voici comment réduire la pollution au quotidien :
-
-🚗 **Transport :**
-• Utiliser les transports en commun
-• Privilégier le vélo et la marche
-• Covoiturage pour les trajets
-• Choisir des véhicules moins polluants
-
-🏠 **Énergie :**
-• Utiliser des énergies renouvelables
-• Éteindre les appareils en veille
-• Isoler sa maison
-• Installer des panneaux solaires
-
-🛒 **Consommation :**
-• Acheter des produits locaux
-• Éviter les emballages plastiques
-• Choisir des produits écologiques
-• Réduire la consommation de viande
-
-♻️ **Déchets :**
-• Trier et recycler
-• Composter les déchets organiques
-• Acheter en vrac
-• Réutiliser et réparer
-
-💧 **Eau :**
-• Éviter les produits polluants
-• Ne pas jeter de déchets dans l'eau
-• Utiliser des produits d'entretien écologiques
-
-Chaque action compte pour un air et une eau plus propres ! 🌱""",
-        "source": "Programme des Nations Unies pour l'Environnement"
-    },
-    
-    "pourquoi recycler": {
-        "answer": """🌿 Le recyclage est essentiel pour plusieurs raisons :
-
-♻️ **Économie des ressources :**
-• Évite l'extraction de nouvelles matières premières
-• Réduit la consommation d'énergie
-• Préserve les ressources naturelles
-
-🌍 **Protection de l'environnement :**
-• Réduit la pollution de l'air et de l'eau
-• Diminue les émissions de CO2
-• Évite l'enfouissement des déchets
-
-💰 **Avantages économiques :**
-• Crée des emplois dans l'économie circulaire
-• Réduit les coûts de gestion des déchets
-• Génère de nouvelles matières premières
-
-📊 **Impact concret :**
-• Recycler 1 tonne de papier = 17 arbres sauvés
-• Recycler 1 tonne d'aluminium = 95% d'énergie économisée
-• Recycler 1 tonne de verre = 1 tonne de CO2 évitée
-
-🔄 **Comment bien recycler :**
-• Trier correctement (papier, verre, plastique, métal)
-• Nettoyer les emballages
-• Respecter les consignes locales
-• Éviter les erreurs de tri
-
-Le recyclage, c'est un geste simple mais puissant ! 💪""",
-        "source": "ADEME (Agence de l'Environnement et de la Maîtrise de l'Énergie)"
-    },
-    "que je dois savoir sur co2": {
-        "answer": """🌿 Voici ce que vous devez savoir sur le CO2 :
-
-📊 **Qu'est-ce que le CO2 ?**
-• Dioxyde de carbone - gaz à effet de serre naturel
-• Essentiel pour la photosynthèse des plantes
-• Présent dans l'atmosphère depuis des millions d'années
-
-📈 **Problème actuel :**
-• Concentration atmosphérique : 420 ppm (vs 280 ppm avant 1850)
-• Augmentation de 50% depuis l'ère industrielle
-• Principal responsable du réchauffement climatique
-
-🌍 **Sources principales :**
-• Combustion des énergies fossiles (pétrole, charbon, gaz)
-• Déforestation et changement d'usage des sols
-• Industries (ciment, acier, chimie)
-• Transport routier et aérien
-
-🌡️ **Effets sur le climat :**
-• Réchauffement global de la planète
-• Fonte des glaces et montée des océans
-• Modification des précipitations
-• Multiplication des événements extrêmes
-
-📊 **Chiffres clés :**
-• 40 milliards de tonnes de CO2 émises par an
-• 1 tonne de CO2 = 5000 km en voiture
-• 1 arbre absorbe 22 kg de CO2 par an
-
-💡 **Solutions individuelles :**
-• Réduire sa consommation d'énergie
-• Privilégier les transports doux
-• Acheter local et de saison
-• Planter des arbres
-
-Le CO2, c'est le défi climatique du siècle ! 🌱""",
-        "source": "GIEC (Groupe d'experts intergouvernemental sur l'évolution du climat)"
-    },
-    
-    "comment lutter contre le co2": {
-        "answer": """🌿 Voici comment lutter contre le CO2 au quotidien :
-
-🚗 **Transport (40% des émissions) :**
-• Marcher ou faire du vélo pour les courts trajets
-• Utiliser les transports en commun
-• Covoiturage pour les trajets longs
-• Choisir des véhicules électriques ou hybrides
-• Éviter l'avion pour les trajets courts
-
-🏠 **Énergie domestique (25% des émissions) :**
-• Isoler sa maison (toit, murs, fenêtres)
-• Utiliser des ampoules LED
-• Éteindre les appareils en veille
-• Installer des panneaux solaires
-• Réduire le chauffage de 1°C
-
-🛒 **Consommation (20% des émissions) :**
-• Acheter local et de saison
-• Réduire la consommation de viande
-• Éviter les produits sur-emballés
-• Choisir des produits durables
-• Réparer plutôt que jeter
-
-♻️ **Déchets (5% des émissions) :**
-• Trier et recycler systématiquement
-• Composter les déchets organiques
-• Acheter en vrac
-• Réutiliser les objets
-
-🌱 **Actions positives :**
-• Planter des arbres (1 arbre = 22 kg CO2/an)
-• Soutenir les projets de reforestation
-• Participer à des actions de nettoyage
-• Sensibiliser son entourage
-
-📊 **Impact concret :**
-• Réduire sa consommation de viande = -500 kg CO2/an
-• Prendre le vélo au lieu de la voiture = -2 tonnes CO2/an
-• Isoler sa maison = -1 tonne CO2/an
-
-Chaque geste compte pour réduire notre empreinte carbone ! 💪""",
-        "source": "ADEME - Guide de l'éco-citoyen"
-    }
-}
+# Questions communes et leurs réponses (app/data/chatbot_templates.json)
+COMMON_QUESTIONS = response_templates.section('common_questions')
 
 def extract_keywords(message):
     """Extrait les mots-clés pertinents du message"""
@@ -395,6 +187,12 @@ def extract_keywords(message):
     
     return keywords
 
+def with_context(contextual_response, response):
+    """Préfixe la réponse par la réponse contextuelle éventuelle"""
+    if contextual_response:
+        return f"{contextual_response}\n\n{response}"
+    return response
+
 def find_best_response(message, keywords, session_id=None):
     """Trouve la meilleure réponse basée sur le message et les mots-clés"""
     
@@ -420,8 +218,7 @@ def find_best_response(message, keywords, session_id=None):
             if google_response:
                 print(f"🧠 Google Search intelligent utilisé pour: {message}")
                 # Ajouter la réponse contextuelle si elle existe
-                if contextual_response:
-                    google_response = contextual_response + "\n\n" + str(google_response)
+                google_response = with_context(contextual_response, google_response)
                 return google_response, "Recherche Google intelligente avec compréhension des questions"
         except Exception as e:
             print(f"Erreur Google Search intelligent: {e}")
@@ -430,8 +227,7 @@ def find_best_response(message, keywords, session_id=None):
                 google_response = enhanced_google_search_service.search_environmental_info(message)
                 if google_response:
                     print(f"🔍 Google Search amélioré utilisé pour: {message}")
-                    if contextual_response:
-                        google_response = contextual_response + "\n\n" + google_response
+                    google_response = with_context(contextual_response, google_response)
                     return google_response, "Recherche Google améliorée avec 3 réponses structurées"
             except Exception as e2:
                 print(f"Erreur Google Search amélioré: {e2}")
@@ -440,8 +236,7 @@ def find_best_response(message, keywords, session_id=None):
                     google_response = google_search_service.search_environmental_info(message)
                     if google_response:
                         print(f"🔍 Google Search fallback utilisé pour: {message}")
-                        if contextual_response:
-                            google_response = contextual_response + "\n\n" + google_response
+                        google_response = with_context(contextual_response, google_response)
                         return google_response, "Recherche Google spécialisée environnement"
                 except Exception as e3:
                     print(f"Erreur Google Search fallback: {e3}")
@@ -457,8 +252,7 @@ def find_best_response(message, keywords, session_id=None):
         smart_response = nlp_processor.generate_smart_response(nlp_analysis, message)
         print(f"🧠 Réponse intelligente générée pour: {message}")
         # Ajouter la réponse contextuelle si elle existe
-        if contextual_response:
-            smart_response = contextual_response + "\n\n" + smart_response
+        smart_response = with_context(contextual_response, smart_response)
         return smart_response, "Analyse NLP intelligente"
     
     # 3. Vérifier les questions communes avec correspondance exacte
@@ -467,8 +261,7 @@ def find_best_response(message, keywords, session_id=None):
             print(f"📚 Question commune utilisée pour: {message}")
             final_response = response["answer"]
             # Ajouter la réponse contextuelle si elle existe
-            if contextual_response:
-                final_response = contextual_response + "\n\n" + final_response
+            final_response = with_context(contextual_response, final_response)
             return final_response, response["source"]
     
     # 4. Recherche intelligente basée sur le type de question
@@ -476,81 +269,38 @@ def find_best_response(message, keywords, session_id=None):
         # Questions de définition
         if "co2" in message_lower or "dioxyde" in message_lower:
             final_response = COMMON_QUESTIONS["que je dois savoir sur co2"]["answer"]
-            if contextual_response:
-                final_response = contextual_response + "\n\n" + final_response
+            final_response = with_context(contextual_response, final_response)
             return final_response, COMMON_QUESTIONS["que je dois savoir sur co2"]["source"]
         elif "pollution" in message_lower:
-            final_response = """🌿 La pollution est la dégradation de l'environnement par des substances nocives :
-
-🌍 **Types de pollution :**
-• Pollution de l'air (gaz d'échappement, industries)
-• Pollution de l'eau (déchets, produits chimiques)
-• Pollution des sols (pesticides, déchets)
-• Pollution sonore (trafic, industries)
-
-📊 **Chiffres alarmants :**
-• 9 millions de décès par an liés à la pollution
-• 8 millions de tonnes de plastique dans l'océan
-• 91% de la population respire un air pollué
-
-💡 **Solutions :**
-• Réduire les émissions de CO2
-• Trier et recycler les déchets
-• Utiliser des transports propres
-• Choisir des produits écologiques
-
-La pollution, c'est l'affaire de tous ! 🌱"""
-            if contextual_response:
-                final_response = contextual_response + "\n\n" + final_response
-            return final_response, "Organisation Mondiale de la Santé"
+            final_response, metadata = response_templates.get("pollution_definition")
+            final_response = with_context(contextual_response, final_response)
+            return final_response, metadata["source"]
     
     elif "comment lutter" in message_lower or "comment combattre" in message_lower or "comment réduire" in message_lower:
         # Questions d'action
         if "co2" in message_lower or "carbone" in message_lower:
             final_response = COMMON_QUESTIONS["comment lutter contre le co2"]["answer"]
-            if contextual_response:
-                final_response = contextual_response + "\n\n" + final_response
+            final_response = with_context(contextual_response, final_response)
             return final_response, COMMON_QUESTIONS["comment lutter contre le co2"]["source"]
         elif "pollution" in message_lower:
             final_response = COMMON_QUESTIONS["comment reduire la pollution"]["answer"]
-            if contextual_response:
-                final_response = contextual_response + "\n\n" + final_response
+            final_response = with_context(contextual_response, final_response)
             return final_response, COMMON_QUESTIONS["comment reduire la pollution"]["source"]
         else:
             final_response = COMMON_QUESTIONS["comment faire pour defendre l'environnement"]["answer"]
-            if contextual_response:
-                final_response = contextual_response + "\n\n" + final_response
+            final_response = with_context(contextual_response, final_response)
             return final_response, COMMON_QUESTIONS["comment faire pour defendre l'environnement"]["source"]
     
     elif "pourquoi" in message_lower:
         # Questions d'explication
         if "recycler" in message_lower or "recyclage" in message_lower:
             final_response = COMMON_QUESTIONS["pourquoi recycler"]["answer"]
-            if contextual_response:
-                final_response = contextual_response + "\n\n" + final_response
+            final_response = with_context(contextual_response, final_response)
             return final_response, COMMON_QUESTIONS["pourquoi recycler"]["source"]
         else:
-            final_response = """🌿 Voici pourquoi c'est important :
-
-🌍 **Pour la planète :**
-• Préserver les écosystèmes
-• Maintenir la biodiversité
-• Lutter contre le changement climatique
-
-👥 **Pour les humains :**
-• Améliorer la qualité de l'air
-• Assurer la sécurité alimentaire
-• Préserver la santé publique
-
-🔮 **Pour l'avenir :**
-• Transmettre un monde viable
-• Créer une société durable
-• Garantir les ressources futures
-
-💡 **Chaque action compte, même la plus petite !**"""
-            if contextual_response:
-                final_response = contextual_response + "\n\n" + final_response
-            return final_response, "Guide environnemental"
+            final_response, metadata = response_templates.get("why_it_matters")
+            final_response = with_context(contextual_response, final_response)
+            return final_response, metadata["source"]
     
     # 5. Chercher dans la base de données avec un algorithme amélioré
     best_match = None
@@ -583,21 +333,23 @@ La pollution, c'est l'affaire de tous ! 🌱"""
     
     if best_match and best_score >= 2:
         print(f"🗄️ Base de données utilisée pour: {message}")
-        final_response = f"🌿 {best_match.answer}\n\n📚 Source: {best_match.source}"
-        if contextual_response:
-            final_response = contextual_response + "\n\n" + final_response
+        final_response, _ = response_templates.render(
+            "database_answer", answer=best_match.answer, source=best_match.source
+        )
+        final_response = with_context(contextual_response, final_response)
         return final_response, best_match.source
     
     return None, None
 
-def save_chat_history(session_id, user_message, bot_response, category=None):
-    """Sauvegarde une conversation dans l'historique"""
+def save_chat_history(session_id, user_message, bot_response, category=None, source=None):
+    """Sauvegarde une conversation dans l'historique (category : thème, source : origine de la réponse)"""
     try:
         ChatHistory.objects.create(
             session_id=session_id,
             user_message=user_message,
             bot_response=bot_response,
-            category=category
+            category=category,
+            source=source
         )
         return True
     except Exception as e:
@@ -641,6 +393,194 @@ def clear_chat_history(session_id=None):
         print(f"Erreur lors de l'effacement de l'historique: {e}")
         return False
 
+def find_greeting_response(message):
+    """Retourne la réponse de salutation correspondant au message, s'il y en a une"""
+    message_clean = re.sub(r'[^\w\s]', '', message.lower())
+    for greeting, response in GREETINGS.items():
+        if greeting in message_clean or message_clean in greeting:
+            return response
+    return None
+
+# Marqueurs des réponses trop génériques pour être retenues
+GENERIC_ANSWER_MARKERS = (
+    "pour vous aider au mieux",
+    "pour vous donner une réponse",
+    "je n'ai pas trouvé d'informations pertinentes",
+)
+
+def is_generic_answer(response):
+    """Indique si une réponse est vide ou générique"""
+    response_lower = (response or "").lower()
+    return not response_lower or any(marker in response_lower for marker in GENERIC_ANSWER_MARKERS)
+
+# Sources de réponse du chatbot (imports différés : la pile de recherche est lourde)
+# L'analyse et la recherche sont faites une seule fois par generate_chatbot_answer ;
+# la catégorie retournée est le thème analysé, le nom de la source est ajouté à part
+def answer_from_advanced_intelligence(message, session_id=None, analysis=None, search_results=None, learn=True):
+    """Source : système d'intelligence avancée (processeur intelligent et personnalisation)"""
+    from .advanced_intelligence import advanced_intelligence
+    result = advanced_intelligence.generate_intelligent_response(
+        message, session_id, remember=False, analysis=analysis, search_results=search_results, learn=learn
+    )
+    response = result.get('personalized_response', '')
+    if is_generic_answer(result.get('answer')):
+        return None
+    return {'response': response, 'category': analysis.category, 'sources': result.get('sources', [])}
+
+def answer_from_google_search(message, session_id=None, analysis=None, search_results=None, learn=True):
+    """Source : extraits de la recherche bruts, si l'intelligence avancée échoue"""
+    from .smart_google_search import smart_google_search_service
+    response = smart_google_search_service.extract_answer_from_results(search_results, message)
+    if is_generic_answer(response) or len(response) <= 100:
+        return None
+    return {
+        'response': response,
+        'category': analysis.category,
+        'sources': [result['link'] for result in search_results[:3]],
+    }
+
+def template_answer(message, analysis=None, search_results=None, learn=True):
+    """Réponse générique mais intelligente et claire, toujours disponible"""
+    if "comment" in message or "que faire" in message:
+        response, metadata = response_templates.get("fallback_action")
+    elif "pourquoi" in message:
+        response, metadata = response_templates.get("fallback_explanation")
+    else:
+        response, metadata = response_templates.render("fallback_general", message=message)
+    return {'response': response, 'category': analysis.category if analysis else metadata['category']}
+
+chatbot_orchestrator = ChatbotOrchestrator(
+    sources=[
+        AnswerSource('advanced_intelligence', 0, answer_from_advanced_intelligence),
+        AnswerSource('google_search', 1, answer_from_google_search),
+    ],
+    fallback=template_answer,
+)
+
+def search_once(message, budget):
+    """
+    Recherche partagée par toutes les sources, bornée par l'échéance du chatbot
+    Retourne (résultats, latence pour le diagnostic)
+    """
+    from .smart_google_search import smart_google_search_service
+    started = time.perf_counter()
+    # Sans échéance explicite, la recherche reste regroupable avec les autres appels (single-flight)
+    deadline = budget if budget < getattr(settings, 'SEARCH_DEADLINE', 6.0) else None
+    try:
+        results = smart_google_search_service.smart_search(message, deadline=deadline)
+        latency = {'status': 'answered' if results else 'empty'}
+    except Exception as e:
+        print(f"❌ Erreur de la recherche : {e}")
+        results = []
+        latency = {'status': 'error', 'error': str(e)}
+    latency['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return results, latency
+
+def generate_chatbot_answer(message, session_id=None, use_cache=True, learn=True):
+    """
+    Construit la réponse du chatbot à une question (hors salutations)
+    Les questions préchauffées (warm_chatbot_cache) posées en premier message d'une session
+    sont servies par le cache de réponses ;
+    sinon la réponse se fait en deux étapes sous l'échéance CHATBOT_RESPONSE_DEADLINE :
+    la recherche, séquentielle et la plus lente, puis les sources de réponse interrogées
+    en parallèle sur ses résultats (pool saturé : réponse de repli immédiate)
+    learn=False n'alimente pas l'apprentissage (préchauffage : questions rejouées)
+    Retourne {'response', 'category', 'sources', 'source', 'latencies', 'total_ms'}
+    """
+    # L'index des questions préchauffées est en mémoire : l'historique de la session
+    # n'est consulté que pour elles, la réponse en cache étant sans contexte
+    if use_cache and is_warmed(message) and not (
+        session_id and conversation_memory.get_conversation_history(session_id, limit=1)
+    ):
+        started = time.perf_counter()
+        cached = get_cached_answer(message)
+        if cached is not None:
+            total_ms = round((time.perf_counter() - started) * 1000, 1)
+            print(f"⚡ Réponse préchauffée servie ({total_ms} ms)")
+            return {**cached, 'source': 'cache', 'latencies': {}, 'total_ms': total_ms}
+    
+    from .nlp_processor import nlp_processor
+    started = time.perf_counter()
+    budget = getattr(settings, 'CHATBOT_RESPONSE_DEADLINE', 8.0)
+    # Analyse NLP et recherche faites une seule fois et partagées par toutes les sources
+    analysis = nlp_processor.analyze_message(message)
+    search_results, search_latency = search_once(message, budget)
+    remaining = max(0.0, budget - (time.perf_counter() - started))
+    result = chatbot_orchestrator.answer(
+        message, session_id, deadline=remaining, analysis=analysis, search_results=search_results, learn=learn
+    )
+    result['latencies'] = {'search': search_latency, **result['latencies']}
+    result['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"🧠 Source retenue : {result['source']} ({result['total_ms']} ms)")
+    return result
+
+def record_chat_exchange(session_id, message, response, category, source=None):
+    """
+    Sauvegarde l'échange dans l'historique et la mémoire conversationnelle
+    category est le thème analysé : il alimente les sujets de la mémoire et les suggestions
+    """
+    save_chat_history(session_id, message, response, category, source)
+    if category != "greeting":
+        conversation_memory.add_message(session_id, message, response, category)
+
+def format_stream_event(event, payload, stream_format):
+    """Sérialise un événement de streaming au format SSE ou NDJSON"""
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    return json.dumps({"event": event, **payload}, ensure_ascii=False) + "\n"
+
+def stream_chatbot_events(message, session_id, stream_format):
+    """
+    Générateur d'événements pour le mode streaming du chatbot :
+    session (immédiat), answer, sources, follow_ups, puis done
+    L'événement answer porte la réponse complète en une fois (pas de fragments
+    partiels) : le streaming ne fait gagner que l'envoi anticipé de la session
+    et des en-têtes, puis des suggestions calculées après la réponse.
+    """
+    # Envoyé avant tout traitement : le client reçoit les en-têtes et la
+    # session sans attendre la réponse
+    yield format_stream_event("session", {"session_id": session_id}, stream_format)
+    
+    try:
+        response = find_greeting_response(message)
+        category = "greeting"
+        source = None
+        sources = []
+        if response is None:
+            result = generate_chatbot_answer(message, session_id)
+            response, category, sources = result["response"], result["category"], result["sources"]
+            source = result["source"]
+        
+        yield format_stream_event("answer", {"response": response, "category": category}, stream_format)
+        
+        # Enrichissements envoyés après la réponse principale
+        record_chat_exchange(session_id, message, response, category, source)
+        if sources:
+            yield format_stream_event("sources", {"sources": sources}, stream_format)
+        if category != "greeting":
+            suggestions = conversation_memory.suggest_follow_up_questions(session_id)
+            yield format_stream_event("follow_ups", {"suggestions": suggestions}, stream_format)
+    except Exception as e:
+        print(f"Erreur pendant le streaming: {e}")  # Debug log
+        yield format_stream_event("error", {"response": "Erreur serveur interne."}, stream_format)
+    
+    yield format_stream_event("done", {}, stream_format)
+
+def get_stream_format(request, data):
+    """
+    Détermine si le client demande une réponse en streaming
+    Le champ "stream" du corps, même à false, l'emporte sur le paramètre d'URL
+    Retourne "sse", "ndjson" ou None
+    """
+    stream = data["stream"] if "stream" in data else request.GET.get("stream")
+    if not stream or str(stream).lower() in ("0", "false", "no"):
+        return None
+    if str(stream).lower() in ("sse", "ndjson"):
+        return str(stream).lower()
+    if "text/event-stream" in request.headers.get("Accept", ""):
+        return "sse"
+    return "ndjson"
+
 @csrf_exempt
 def chatbot_view(request):
     if request.method == "POST":
@@ -651,153 +591,41 @@ def chatbot_view(request):
             
             print(f"Message reçu: {message}")  # Debug log
 
+            # Mode streaming (SSE ou NDJSON) : la réponse est envoyée par événements
+            stream_format = get_stream_format(request, data)
+            if stream_format:
+                response = StreamingHttpResponse(
+                    stream_chatbot_events(message, session_id, stream_format),
+                    content_type="text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+                )
+                response["Cache-Control"] = "no-cache"
+                response["X-Accel-Buffering"] = "no"  # Désactive le buffering des proxys (nginx)
+                return response
+
             # 1. Vérifier les salutations en premier
-            message_clean = re.sub(r'[^\w\s]', '', message.lower())
-            for greeting, response in GREETINGS.items():
-                if greeting in message_clean or message_clean in greeting:
-                    # Sauvegarder l'historique
-                    save_chat_history(session_id, message, response, "greeting")
-                    return JsonResponse({"response": response, "session_id": session_id})
-
-            # 2. UTILISER LE SYSTÈME D'INTELLIGENCE AVANCÉE
-            print(f"🧠 Utilisation du système d'intelligence avancée...")
-            
-            # Analyser la question avec le nouveau système
-            analysis = advanced_intelligence.analyze_question(message)
-            print(f"📊 Analyse : {analysis}")
-            
-            # Générer une réponse intelligente
-            final_response = advanced_intelligence.generate_smart_response(message)
-            category = "advanced_intelligence"
-            
-            # Si la réponse est générique, essayer les autres systèmes
-            if "Pour vous aider au mieux" in final_response or "Pour vous donner une réponse" in final_response:
-                # Essayer le processeur intelligent existant
-                intelligent_response = intelligent_processor.generate_intelligent_response(message)
-                if intelligent_response:
-                    final_response = intelligent_response
-                    category = "intelligent_environmental"
-                else:
-                    # Essayer la recherche Google intelligente
-                    try:
-                        google_response = smart_google_search_service.search_environmental_info(message)
-                        if google_response and len(google_response) > 100:
-                            final_response = google_response
-                            category = "google_search"
-                        else:
-                            # Réponse générique mais intelligente et claire
-                            if "comment" in message or "que faire" in message:
-                                final_response = """🌿 **Voici des actions concrètes pour agir :**
-
-1️⃣ **À LA MAISON**
-   ✅ Éteindre les lumières inutiles
-   ✅ Prendre des douches courtes (5 minutes max)
-   ✅ Trier ses déchets (4 poubelles)
-   ✅ Baisser le chauffage de 1°C
-   ✅ Utiliser des produits écologiques
-
-2️⃣ **DANS LES TRANSPORTS**
-   ✅ Marcher pour les trajets < 1 km
-   ✅ Prendre le vélo pour les trajets < 5 km
-   ✅ Utiliser les transports en commun
-   ✅ Faire du covoiturage
-   ✅ Choisir une voiture électrique si possible
-
-3️⃣ **DANS LA CONSOMMATION**
-   ✅ Acheter local et de saison
-   ✅ Éviter les emballages plastiques
-   ✅ Choisir des produits durables
-   ✅ Réparer au lieu de jeter
-   ✅ Acheter d'occasion
-
-4️⃣ **DANS LA VIE QUOTIDIENNE**
-   ✅ Participer à des actions de nettoyage
-   ✅ Planter des arbres
-   ✅ Sensibiliser son entourage
-   ✅ Soutenir des associations
-   ✅ Voter pour des politiques vertes
-
-💡 **Conseil :** Commencez par 1 action simple, puis ajoutez-en d'autres progressivement !
-
-🌱 **Impact :** Chaque petit geste compte pour préserver notre planète !"""
-                                category = "action"
-                            elif "pourquoi" in message:
-                                final_response = """🌿 **Voici pourquoi c'est important :**
-
-🌍 **Pour la planète :**
-   • Préserver les écosystèmes
-   • Maintenir la biodiversité
-   • Lutter contre le changement climatique
-   • Protéger les ressources naturelles
-
-👥 **Pour les humains :**
-   • Améliorer la qualité de l'air
-   • Assurer la sécurité alimentaire
-   • Préserver la santé publique
-   • Créer un monde plus juste
-
-🔮 **Pour l'avenir :**
-   • Transmettre un monde viable
-   • Créer une société durable
-   • Garantir les ressources futures
-   • Donner l'exemple aux générations suivantes
-
-💡 **En résumé :** Protéger l'environnement, c'est protéger notre santé, notre alimentation et notre avenir !"""
-                                category = "explanation"
-                            else:
-                                final_response = f"""🌿 **Informations sur « {message} » :**
-
-Cette question touche à un sujet environnemental important. Voici ce que je peux vous dire :
-
-📋 **Contexte général :**
-   • Tous les sujets environnementaux sont liés
-   • Chaque action a des conséquences
-   • Nous faisons partie de l'écosystème
-
-💡 **Pour aller plus loin :**
-   • Posez des questions plus spécifiques
-   • Demandez des exemples concrets
-   • Interrogez-moi sur les solutions pratiques
-   • Demandez des chiffres et des données
-
-🌱 **Mon rôle :** Je suis là pour vous informer, vous guider et vous encourager !
-
-💬 **Exemples de questions :**
-   • "Comment réduire la pollution ?"
-   • "Pourquoi recycler est important ?"
-   • "Qu'est-ce que le développement durable ?"
-   • "Comment protéger la biodiversité ?" """
-                                category = "general"
-                    except Exception as e:
-                        print(f"❌ Erreur lors de la recherche Google : {e}")
-                        final_response = """🌿 **Je suis là pour vous aider !**
-
-💡 **Pour vous donner une réponse précise, pourriez-vous reformuler votre question ?**
-
-Par exemple :
-• "Qu'est-ce que la pollution plastique ?"
-• "Comment réduire mes déchets ?"
-• "Pourquoi recycler est important ?"
-• "Statistiques déchets France 2024"
-
-🌱 **Je peux vous aider sur :**
-• Définitions et concepts
-• Solutions pratiques
-• Statistiques et données
-• Conseils d'action
-
-N'hésitez pas à poser votre question ! 🌍"""
-                        category = "help"
-
-            # Sauvegarder l'historique
-            save_chat_history(session_id, message, final_response, category)
-            
-            # Ajouter à la mémoire conversationnelle
-            nlp_analysis = nlp_processor.analyze_message(message)
-            conversation_memory.add_message(session_id, message, final_response, nlp_analysis)
+            greeting_response = find_greeting_response(message)
+            if greeting_response:
+                # Sauvegarder l'historique
+                record_chat_exchange(session_id, message, greeting_response, "greeting")
+                return JsonResponse({"response": greeting_response, "session_id": session_id})
+
+            result = generate_chatbot_answer(message, session_id)
+            final_response = result["response"]
+
+            # Sauvegarder l'historique et la mémoire conversationnelle
+            record_chat_exchange(session_id, message, final_response, result["category"], result["source"])
+
+            payload = {"response": final_response, "session_id": session_id}
+            if settings.DEBUG:
+                # Détail des latences par source pour le diagnostic
+                payload["debug"] = {
+                    "source": result["source"],
+                    "latencies": result["latencies"],
+                    "total_ms": result["total_ms"],
+                }
 
             print(f"Réponse envoyée: {final_response[:100]}...")  # Debug log
-            return JsonResponse({"response": final_response, "session_id": session_id})
+            return JsonResponse(payload)
         except json.JSONDecodeError as e:
             print(f"Erreur JSON: {e}")  # Debug log
             return JsonResponse({"response": "Erreur : requête invalide."}, status=400)
@@ -807,6 +635,35 @@ N'hésitez pas à poser votre question ! 🌍"""
 
     return JsonResponse({"response": "Méthode non autorisée."}, status=405)
 
+class IsStaffOrDebug(permissions.BasePermission):
+    """Réservé aux comptes staff, ou à tous en mode DEBUG (comme le détail des latences)"""
+
+    def has_permission(self, request, view):
+        return settings.DEBUG or bool(request.user and request.user.is_staff)
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication, SessionAuthentication])
+@permission_classes([IsStaffOrDebug])
+def search_status_view(request):
+    """
+    Supervision de la recherche : disjoncteurs et limiteurs par domaine,
+    cache des résultats, recherches regroupées, cache des réponses
+    préchauffées, pool des sources et mémoire conversationnelle (staff ou DEBUG uniquement)
+    """
+    from .resilience import outbound_status
+    from .search_providers import search_cache
+    from .smart_google_search import smart_google_search_service
+    return Response({
+        "success": True,
+        "provider": smart_google_search_service.provider.name,
+        "outbound": outbound_status(),
+        "cache": search_cache.get_stats(),
+        "single_flight": smart_google_search_service.search_flight.get_stats(),
+        "response_cache": response_cache.get_stats(),
+        "orchestrator": chatbot_orchestrator.get_stats(),
+        "conversation_memory": conversation_memory.get_stats(),
+    })
+
 @csrf_exempt
 def chat_history_view(request):
     """Vue pour récupérer l'historique des conversations"""
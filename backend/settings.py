@@ -92,6 +92,17 @@ DATABASES = {
     "default": dj_database_url.config(default="sqlite:///db.sqlite3")
 }
 
+# Cache partagé entre workers si CACHE_URL est défini (redis://..., paquet redis requis),
+# sinon cache en mémoire propre à chaque processus
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["CACHE_URL"],
+    } if os.environ.get("CACHE_URL") else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -204,3 +215,84 @@ GOOGLE_SEARCH_ENABLED = os.environ.get('GOOGLE_SEARCH_ENABLED', 'True').lower()
 # Media files configuration
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Archivage de l'historique du chatbot (commande archive_chat_history)
+CHAT_HISTORY_ARCHIVE_DIR = os.environ.get('CHAT_HISTORY_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archives', 'chat_history'))
+CHAT_HISTORY_RETENTION_DAYS = int(os.environ.get('CHAT_HISTORY_RETENTION_DAYS', '180'))
+
+# Orchestration des sources de réponse du chatbot
+# Échéance totale (recherche comprise) : à garder supérieure à SEARCH_DEADLINE
+CHATBOT_RESPONSE_DEADLINE = float(os.environ.get('CHATBOT_RESPONSE_DEADLINE', '8.0'))  # secondes
+# Requêtes chatbot traitées en même temps par processus (threads gunicorn)
+CHATBOT_CONCURRENT_REQUESTS = int(os.environ.get('CHATBOT_CONCURRENT_REQUESTS', '4'))
+CHATBOT_SOURCE_WORKERS = int(os.environ.get('CHATBOT_SOURCE_WORKERS', '0'))  # 0 : une place par source et par requête
+
+# Mémoire conversationnelle du chatbot (par worker)
+CONVERSATION_MEMORY_MAX_SESSIONS = int(os.environ.get('CONVERSATION_MEMORY_MAX_SESSIONS', '10000'))
+CONVERSATION_MEMORY_IDLE_TTL = int(os.environ.get('CONVERSATION_MEMORY_IDLE_TTL', '3600'))  # secondes
+CONVERSATION_MEMORY_MAX_BYTES = int(os.environ.get('CONVERSATION_MEMORY_MAX_BYTES', str(64 * 1024 * 1024)))
+# inprocess (par worker), cache (cache Django partagé, CACHE_URL requis) ou database (tampon circulaire en base)
+CONVERSATION_MEMORY_BACKEND = os.environ.get('CONVERSATION_MEMORY_BACKEND', 'inprocess')
+CONVERSATION_MEMORY_CACHE_ALIAS = os.environ.get('CONVERSATION_MEMORY_CACHE_ALIAS', 'default')
+
+# Apprentissage du chatbot (questions fréquentes, réponses réussies), borné par catégorie
+LEARNING_STORE_PATH = os.environ.get('LEARNING_STORE_PATH', os.path.join(BASE_DIR, 'var', 'learning_store.json'))
+LEARNING_STORE_TOP_QUESTIONS = int(os.environ.get('LEARNING_STORE_TOP_QUESTIONS', '100'))
+LEARNING_STORE_RESPONSE_SAMPLE = int(os.environ.get('LEARNING_STORE_RESPONSE_SAMPLE', '50'))
+LEARNING_STORE_FEEDBACK_SIZE = int(os.environ.get('LEARNING_STORE_FEEDBACK_SIZE', '100'))
+LEARNING_STORE_PERSIST_INTERVAL = int(os.environ.get('LEARNING_STORE_PERSIST_INTERVAL', '300'))  # secondes
+
+# Analyse NLP des messages (cache LRU par texte normalisé)
+NLP_ANALYSIS_CACHE_SIZE = int(os.environ.get('NLP_ANALYSIS_CACHE_SIZE', '1024'))
+# regex (par défaut) ou spacy (nécessite le modèle : python -m spacy download fr_core_news_sm)
+NLP_ENGINE = os.environ.get('NLP_ENGINE', 'regex')
+SPACY_MODEL = os.environ.get('SPACY_MODEL', 'fr_core_news_sm')
+SPACY_BATCH_SIZE = int(os.environ.get('SPACY_BATCH_SIZE', '64'))
+
+# Budget du temps d'import au démarrage (commande check_import_time)
+IMPORT_TIME_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', '800'))
+
+# Session HTTP partagée des recherches web (app/http_client.py)
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '3.05'))  # secondes
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', '10'))  # secondes
+HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', '2'))
+HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', '0.3'))
+HTTP_BACKOFF_MAX = float(os.environ.get('HTTP_BACKOFF_MAX', '1.0'))  # secondes, attente maximale entre tentatives
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '10'))
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '10'))
+
+# Requêtes optimisées de la recherche intelligente, lancées en parallèle
+SEARCH_FANOUT_WORKERS = int(os.environ.get('SEARCH_FANOUT_WORKERS', '16'))
+SEARCH_DEADLINE = float(os.environ.get('SEARCH_DEADLINE', '6.0'))  # secondes, pour toutes les requêtes
+SEARCH_EARLY_RETURN_RESULTS = int(os.environ.get('SEARCH_EARLY_RETURN_RESULTS', '5'))
+SEARCH_HIGH_RELEVANCE_SCORE = int(os.environ.get('SEARCH_HIGH_RELEVANCE_SCORE', '5'))
+
+# Cache des résultats de recherche : LRU en mémoire + SQLite persistant (vide pour désactiver SQLite)
+SEARCH_CACHE_PATH = os.environ.get('SEARCH_CACHE_PATH', os.path.join(BASE_DIR, 'var', 'search_cache.sqlite3'))
+SEARCH_CACHE_MEMORY_SIZE = int(os.environ.get('SEARCH_CACHE_MEMORY_SIZE', '1024'))
+SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL', '3600'))  # secondes de fraîcheur
+SEARCH_CACHE_NEGATIVE_TTL = int(os.environ.get('SEARCH_CACHE_NEGATIVE_TTL', '300'))  # résultats vides
+SEARCH_CACHE_STALE_TTL = int(os.environ.get('SEARCH_CACHE_STALE_TTL', '86400'))  # servis périmés puis rafraîchis
+# Analyse des pages de résultats : stream (html.parser, par défaut), lxml ou bs4
+SEARCH_HTML_PARSER = os.environ.get('SEARCH_HTML_PARSER', 'stream')
+# Fournisseur de recherche : web (Google), local (corpus FTS5 importé) ou chaîne de repli, ex. "local,web"
+SEARCH_PROVIDER = os.environ.get('SEARCH_PROVIDER', 'web')
+SEARCH_CORPUS_PATH = os.environ.get('SEARCH_CORPUS_PATH', os.path.join(BASE_DIR, 'var', 'search_corpus.sqlite3'))
+# Protection des appels sortants, par domaine : seau à jetons et disjoncteur
+SEARCH_RATE_LIMIT = float(os.environ.get('SEARCH_RATE_LIMIT', '2.0'))  # requêtes par seconde
+SEARCH_RATE_BURST = int(os.environ.get('SEARCH_RATE_BURST', '10'))
+SEARCH_BREAKER_FAILURES = int(os.environ.get('SEARCH_BREAKER_FAILURES', '3'))  # échecs consécutifs avant ouverture
+SEARCH_BREAKER_RESET_TIMEOUT = float(os.environ.get('SEARCH_BREAKER_RESET_TIMEOUT', '60'))  # secondes
+# Réponse extraite des résultats de recherche (résumé extractif, app/answer_extraction.py)
+ANSWER_MAX_SENTENCES = int(os.environ.get('ANSWER_MAX_SENTENCES', '3'))
+ANSWER_MAX_CHARS = int(os.environ.get('ANSWER_MAX_CHARS', '500'))
+ANSWER_DIVERSITY = float(os.environ.get('ANSWER_DIVERSITY', '0.3'))  # poids de la redondance (MMR)
+# Cache des réponses préchauffées du chatbot (commande warm_chatbot_cache, à planifier en heures creuses)
+CHATBOT_RESPONSE_CACHE_ENABLED = os.environ.get('CHATBOT_RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+CHATBOT_RESPONSE_CACHE_PATH = os.environ.get('CHATBOT_RESPONSE_CACHE_PATH', SEARCH_CACHE_PATH)
+CHATBOT_RESPONSE_CACHE_MEMORY_SIZE = int(os.environ.get('CHATBOT_RESPONSE_CACHE_MEMORY_SIZE', '512'))
+CHATBOT_RESPONSE_CACHE_TTL = int(os.environ.get('CHATBOT_RESPONSE_CACHE_TTL', '86400'))  # secondes, un préchauffage par jour
+CHATBOT_RESPONSE_CACHE_STALE_TTL = int(os.environ.get('CHATBOT_RESPONSE_CACHE_STALE_TTL', '86400'))
+CHATBOT_WARMUP_DAYS = int(os.environ.get('CHATBOT_WARMUP_DAYS', '7'))  # fenêtre d'historique analysée
+CHATBOT_WARMUP_LIMIT = int(os.environ.get('CHATBOT_WARMUP_LIMIT', '100'))  # questions préchauffées
+CHATBOT_RESPONSE_INDEX_REFRESH = int(os.environ.get('CHATBOT_RESPONSE_INDEX_REFRESH', '60'))  # secondes entre relectures de l'index